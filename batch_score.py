@@ -0,0 +1,200 @@
+"""
+Find the smiling photos in an existing image archive.
+
+Walks a directory, scores every image with the same face and smile cascades and
+parameters as test.main(), and streams one result per image to a JSONL or CSV file.
+Images are spread over a pool of worker processes (each loads its own cascades once),
+so throughput scales with the number of CPU cores. Re-running with the same output
+file skips images that were already scored, so an interrupted run can be resumed.
+
+Usage:
+    python batch_score.py photos/ --output smiles.jsonl
+    python batch_score.py photos/ --output smiles.csv --format csv --workers 8
+"""
+# Import required libraries
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import time
+
+import cv2
+
+from detection import FACE_BACKEND, detect_faces_and_smiles, init_worker, worker_cascades
+from face_detectors import BACKENDS
+from frame_sources import IMAGE_EXTENSIONS
+
+CSV_FIELDS = ["path", "width", "height", "faces", "smiles", "smiling", "boxes", "error"]
+
+
+def find_images(directory):
+    """Yield the paths of all images under directory, in a stable order."""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for file_name in sorted(files):
+            if file_name.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.join(root, file_name)
+
+
+def score_image(path):
+    """
+    Detect faces and smiles in one image file.
+
+    Args:
+        path: Path of the image
+
+    Returns:
+        dict: path, image size, face boxes with their smile counts, totals and any error
+    """
+    result = {"path": path, "width": 0, "height": 0, "faces": 0, "smiles": 0,
+              "smiling": False, "boxes": [], "error": ""}
+    # Each worker process loaded its own cascade pair once, in init_worker()
+    face_cascade, smile_cascade = worker_cascades()
+    if face_cascade is None:
+        result["error"] = "Unable to load the detector models"
+        return result
+
+    image = cv2.imread(path)
+    if image is None:
+        result["error"] = "Unreadable image"
+        return result
+
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    detections = detect_faces_and_smiles(face_cascade, smile_cascade, gray)
+    result["height"], result["width"] = gray.shape[:2]
+    result["faces"] = len(detections)
+    result["smiles"] = sum(len(smiles) for _, smiles in detections)
+    result["smiling"] = result["smiles"] > 0
+    result["boxes"] = [[x, y, w, h, len(smiles)] for (x, y, w, h), smiles in detections]
+    return result
+
+
+def load_done_paths(output_path, output_format):
+    """
+    Read the paths that an earlier run already wrote to the output file.
+
+    Args:
+        output_path: The results file
+        output_format: "jsonl" or "csv"
+
+    Returns:
+        set: Image paths to skip
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, newline="") as f:
+        if output_format == "csv":
+            for row in csv.DictReader(f):
+                # A row cut short by the interruption is missing its last fields
+                # (None); score that image again
+                if row.get("path") and all(row.get(field) is not None for field in CSV_FIELDS):
+                    done.add(row["path"])
+        else:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["path"])
+                except (ValueError, KeyError):
+                    continue  # A line cut short by the interruption; score it again
+    return done
+
+
+class ResultWriter:
+    """Append results to a JSONL or CSV file, flushing after every line."""
+
+    def __init__(self, output_path, output_format):
+        self.output_format = output_format
+        is_new = not os.path.exists(output_path) or os.path.getsize(output_path) == 0
+        self._file = open(output_path, "a", newline="")
+        if not is_new:
+            # Make sure a line cut short by an interruption does not swallow the next one
+            with open(output_path, "rb") as existing:
+                existing.seek(-1, os.SEEK_END)
+                if existing.read(1) != b"\n":
+                    self._file.write("\n")
+        if output_format == "csv":
+            self._csv = csv.DictWriter(self._file, fieldnames=CSV_FIELDS)
+            if is_new:
+                self._csv.writeheader()
+
+    def write(self, result):
+        if self.output_format == "csv":
+            row = dict(result)
+            row["boxes"] = ";".join(",".join(str(v) for v in box) for box in result["boxes"])
+            self._csv.writerow(row)
+        else:
+            self._file.write(json.dumps(result) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def score_archive(directory, output_path, output_format="jsonl", workers=None, resume=True,
+                  face_backend=FACE_BACKEND):
+    """
+    Score every image under directory and stream the results to output_path.
+
+    Args:
+        directory: Root of the photo archive
+        output_path: JSONL or CSV file to append results to
+        output_format: "jsonl" or "csv"
+        workers: Number of worker processes (default: one per CPU core)
+        resume: Skip images already present in output_path
+        face_backend: Face detector to use: "haar", "lbp" or "yunet"
+
+    Returns:
+        dict: Counts of scored, smiling, failed and skipped images, and images per second
+    """
+    done = load_done_paths(output_path, output_format) if resume else set()
+    if not resume and os.path.exists(output_path):
+        os.remove(output_path)
+    paths = [p for p in find_images(directory) if p not in done]
+    workers = workers or os.cpu_count() or 1
+    print(f"Scoring {len(paths)} images with {workers} workers ({len(done)} already done)")
+
+    stats = {"scored": 0, "smiling": 0, "failed": 0, "skipped": len(done), "images_per_second": 0.0}
+    writer = ResultWriter(output_path, output_format)
+    start = time.perf_counter()
+    try:
+        with multiprocessing.Pool(workers, initializer=init_worker, initargs=(face_backend,)) as pool:
+            # imap_unordered streams results back as soon as any worker finishes
+            for result in pool.imap_unordered(score_image, paths, chunksize=8):
+                writer.write(result)
+                stats["scored"] += 1
+                stats["smiling"] += 1 if result["smiling"] else 0
+                stats["failed"] += 1 if result["error"] else 0
+                if stats["scored"] % 500 == 0:
+                    print(f"  {stats['scored']}/{len(paths)} images scored")
+    except KeyboardInterrupt:
+        print("\nInterrupted - run again with the same output file to resume")
+    finally:
+        writer.close()
+
+    seconds = time.perf_counter() - start
+    stats["images_per_second"] = stats["scored"] / seconds if seconds > 0 else 0.0
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find smiling photos in an image archive.")
+    parser.add_argument("directory", help="folder to scan (searched recursively)")
+    parser.add_argument("--output", default="smiles.jsonl", help="results file (default: smiles.jsonl)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default=None,
+                        help="output format (default: from the output file extension)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--no-resume", action="store_true", help="start over instead of skipping done images")
+    parser.add_argument("--face-detector", choices=list(BACKENDS), default=FACE_BACKEND,
+                        help=f"face detector backend (default: {FACE_BACKEND})")
+    args = parser.parse_args()
+
+    output_format = args.format or ("csv" if args.output.lower().endswith(".csv") else "jsonl")
+    stats = score_archive(args.directory, args.output, output_format, args.workers, not args.no_resume,
+                         args.face_detector)
+    print(f"Done: {stats['scored']} scored, {stats['smiling']} smiling, {stats['failed']} failed, "
+          f"{stats['skipped']} skipped ({stats['images_per_second']:.1f} images/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Headless benchmark for the face + smile detection pipeline.
+
+Replays frames from any frame source (camera, video file, image folder or synthetic
+frames) through the same detection steps as test.main(), without opening a window,
+and reports frames per second, per-stage latency percentiles and detection counts.
+
+Usage:
+    python benchmark.py --source clip.mp4
+    python benchmark.py --source synthetic:300 --detect-width 320 --track-every 10
+    python benchmark.py --source selfies/ --json
+"""
+# Import required libraries
+import argparse
+import json
+import time
+
+import cv2
+import numpy as np
+
+from detection import DETECTION_WIDTH, FACE_BACKEND, load_cascades, load_detection_config, detect_faces, detect_smiles_for_faces, detection_scale
+from face_detectors import BACKENDS
+from frame_sources import open_source
+from tracking import FaceTracker, SEARCH_MARGIN
+
+STAGES = ["read", "gray", "faces", "smiles"]
+
+
+def percentiles(samples_ms):
+    """Return p50/p95/p99 and mean of a list of millisecond timings."""
+    if not samples_ms:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0}
+    p50, p95, p99 = np.percentile(samples_ms, [50, 95, 99])
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99), "mean": float(np.mean(samples_ms))}
+
+
+def run_benchmark(source="synthetic", max_frames=None, frame_size=(640, 480),
+                  detection_width=DETECTION_WIDTH, keyframe_interval=1, search_margin=SEARCH_MARGIN,
+                  face_backend=FACE_BACKEND, config=None):
+    """
+    Replay a frame source through the detector and measure it.
+
+    Args:
+        source: Frame source description, see frame_sources.open_source()
+        max_frames: Stop after this many frames (None = until the source ends)
+        frame_size: (width, height) for cameras and synthetic frames
+        detection_width: Width to detect faces at, or None for native resolution
+        keyframe_interval: Full-frame face detection every N frames (1 = every frame)
+        search_margin: Tracker search window margin between keyframes
+        face_backend: Face detector: "haar", "lbp" or "yunet"
+        config: DetectionConfig (ROI, face sizes, cascade settings); None = defaults
+
+    Returns:
+        dict: Results with "frames", "seconds", "fps", "stages" (latency percentiles
+            in ms per stage) and "detections" (counts), or None if loading failed
+    """
+    face_cascade, smile_cascade = load_cascades(face_backend, config)
+    if face_cascade is None:
+        print("Error: Unable to load the detector models. Please check your OpenCV installation.")
+        return None
+
+    cap = open_source(source, frame_size)
+    if not cap.isOpened():
+        print(f"Error: Unable to open frame source {source!r}")
+        return None
+
+    tracker = None
+    if keyframe_interval > 1:
+        tracker = FaceTracker(face_cascade, keyframe_interval, search_margin, detection_width, config)
+
+    timings = {stage: [] for stage in STAGES}
+    counts = {"frames_with_face": 0, "faces": 0, "frames_with_smile": 0, "smiles": 0}
+    frames = 0
+    start = time.perf_counter()
+    try:
+        while max_frames is None or frames < max_frames:
+            # Time each step of the loop separately
+            t0 = time.perf_counter()
+            ret, frame = cap.read()
+            t1 = time.perf_counter()
+            if not ret:
+                break
+            gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            t2 = time.perf_counter()
+            if tracker is not None:
+                faces = tracker.update(gray_frame)
+            else:
+                faces = detect_faces(face_cascade, gray_frame,
+                                     detection_scale(gray_frame.shape[1], detection_width), config)
+            t3 = time.perf_counter()
+            detections = detect_smiles_for_faces(smile_cascade, gray_frame, faces, config=config)
+            t4 = time.perf_counter()
+
+            for stage, seconds in zip(STAGES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3)):
+                timings[stage].append(1000.0 * seconds)
+
+            frames += 1
+            smiles = sum(len(s) for _, s in detections)
+            counts["faces"] += len(detections)
+            counts["smiles"] += smiles
+            counts["frames_with_face"] += 1 if detections else 0
+            counts["frames_with_smile"] += 1 if smiles else 0
+    finally:
+        cap.release()
+
+    seconds = time.perf_counter() - start
+    return {
+        "source": str(source),
+        "face_detector": face_backend,
+        "frames": frames,
+        "seconds": seconds,
+        "fps": frames / seconds if seconds > 0 else 0.0,
+        "stages": {stage: percentiles(samples) for stage, samples in timings.items()},
+        "detections": counts,
+    }
+
+
+def print_report(results):
+    """Print benchmark results as a small table."""
+    print(f"Source: {results['source']} (face detector: {results['face_detector']})")
+    print(f"Frames: {results['frames']} in {results['seconds']:.2f}s ({results['fps']:.1f} fps)")
+    print(f"{'stage':<8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+    for stage, stats in results["stages"].items():
+        print(f"{stage:<8} {stats['p50']:8.2f} {stats['p95']:8.2f} {stats['p99']:8.2f} {stats['mean']:8.2f}")
+    counts = results["detections"]
+    print(f"Faces: {counts['faces']} in {counts['frames_with_face']} frames, "
+          f"smiles: {counts['smiles']} in {counts['frames_with_smile']} frames")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay frames through the smile detector without a window.")
+    parser.add_argument("--source", default="synthetic",
+                        help="camera index, video file, image folder or synthetic[:N] (default: synthetic)")
+    parser.add_argument("--frames", type=int, default=None, help="stop after this many frames")
+    parser.add_argument("--resolution", default="640x480", metavar="WxH",
+                        help="camera / synthetic frame size (default: 640x480)")
+    parser.add_argument("--detect-width", type=int, default=DETECTION_WIDTH, metavar="PIXELS",
+                        help="detect faces on a copy shrunk to this width")
+    parser.add_argument("--track-every", type=int, default=1, metavar="N",
+                        help="full-frame face detection only every N frames")
+    parser.add_argument("--search-margin", type=float, default=SEARCH_MARGIN,
+                        help="tracker search window margin between keyframes")
+    parser.add_argument("--face-detector", choices=list(BACKENDS), default=FACE_BACKEND,
+                        help=f"face detector backend (default: {FACE_BACKEND})")
+    parser.add_argument("--config", default=None, metavar="FILE",
+                        help="detection settings file (see calibrate_detection.py)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    detection_config = None
+    if args.config:
+        try:
+            detection_config = load_detection_config(args.config)
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot use detection settings {args.config}: {e}")
+    frame_width, frame_height = (int(v) for v in args.resolution.lower().split("x"))
+    results = run_benchmark(args.source, args.frames, (frame_width, frame_height),
+                            args.detect_width, args.track_every, args.search_margin,
+                            args.face_detector, detection_config)
+    if results is None:
+        return 1
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,93 @@
+"""
+Benchmark: one smile cascade call per face vs. one batched call per frame.
+
+Builds synthetic frames with 1, 4 and 16 copies of the sample face in a grid
+(big enough for the smile cascade to find the smile),
+finds the faces once, and then times the smile stage per face (detect_smiles())
+and batched (detect_smiles_batched()), plus the whole detection pass for each.
+Also reports how many faces smile per face / batched and how many get the same
+smile / no smile answer both ways.
+
+Usage:
+    python benchmarks/bench_batched_smiles.py [--repeats 20]
+"""
+# Import required libraries
+import argparse
+import math
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Make the project modules importable when run from the benchmarks folder
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from detection import load_cascades, detect_faces, detect_smiles, detect_smiles_batched
+
+SAMPLE_WIDTH = 700  # face.jpg is shrunk to this width: the face is then ~240 px and its smile is found
+CELL_SIZE = 320     # Pixels per face in the synthetic grid
+
+
+def make_frame(face_count):
+    """Tile the face of the sample photo into a square grid with face_count cells."""
+    photo = cv2.imread(os.path.join(ROOT, "face.jpg"), cv2.IMREAD_GRAYSCALE)
+    height = photo.shape[0] * SAMPLE_WIDTH // photo.shape[1]
+    photo = cv2.resize(photo, (SAMPLE_WIDTH, height), interpolation=cv2.INTER_AREA)
+    # Cut a CELL_SIZE square around the middle of the face
+    left = min(max(0, SAMPLE_WIDTH // 2 + 76 - CELL_SIZE // 2), SAMPLE_WIDTH - CELL_SIZE)
+    top = min(max(0, 200 - CELL_SIZE // 2), height - CELL_SIZE)
+    cell = photo[top:top + CELL_SIZE, left:left + CELL_SIZE]
+
+    columns = math.ceil(math.sqrt(face_count))
+    rows = math.ceil(face_count / columns)
+    frame = np.empty((rows * CELL_SIZE, columns * CELL_SIZE), np.uint8)
+    for row in range(rows):
+        for column in range(columns):
+            frame[row * CELL_SIZE:(row + 1) * CELL_SIZE, column * CELL_SIZE:(column + 1) * CELL_SIZE] = cell
+    return frame
+
+
+def time_ms(function, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return 1000 * (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    face_cascade, smile_cascade = load_cascades()
+    if face_cascade is None:
+        print("Error: Unable to load Haar cascade files.")
+        return
+
+    print(f"{'faces':>5} {'frame':>9} {'found':>5} {'smiles/face':>12} {'batched':>8} "
+          f"{'frame/face':>11} {'batched':>8} {'smiling':>8} {'agree':>6}")
+    for face_count in (1, 4, 16):
+        gray = make_frame(face_count)
+        faces = detect_faces(face_cascade, gray)
+
+        per_face = [detect_smiles(smile_cascade, gray, face) for face in faces]
+        batched = detect_smiles_batched(smile_cascade, gray, faces)
+        smiling = (sum(len(s) > 0 for s in per_face), sum(len(s) > 0 for s in batched))
+        agree = sum((len(a) > 0) == (len(b) > 0) for a, b in zip(per_face, batched))
+
+        smiles_per_face_ms = time_ms(lambda: [detect_smiles(smile_cascade, gray, f) for f in faces], args.repeats)
+        smiles_batched_ms = time_ms(lambda: detect_smiles_batched(smile_cascade, gray, faces), args.repeats)
+        face_ms = time_ms(lambda: detect_faces(face_cascade, gray), max(1, args.repeats // 4))
+
+        print(f"{face_count:>5} {gray.shape[1]:>4}x{gray.shape[0]:<4} {len(faces):>5} "
+              f"{smiles_per_face_ms:>10.2f}ms {smiles_batched_ms:>6.2f}ms "
+              f"{face_ms + smiles_per_face_ms:>9.1f}ms {face_ms + smiles_batched_ms:>6.1f}ms "
+              f"{smiling[0]:>4}/{smiling[1]:<3} {agree:>3}/{len(faces)}")
+    print(f"(OpenCV threads: {cv2.getNumThreads()})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark: cost and memory of keeping the best-frame ring buffer.
+
+Pushes synthetic camera frames (with a face and a smile) into a BestFrameBuffer and
+reports the time per push and best() call, and how much memory was allocated
+after the buffer was set up (it should stay at zero as frames keep coming).
+
+Usage:
+    python benchmarks/bench_best_frame.py [--frames 900] [--window 8] [--resolution 640x480]
+"""
+# Import required libraries
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+# Make the project modules importable when run from the benchmarks folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from best_frame import BestFrameBuffer
+from frame_sources import SyntheticSource
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=900, help="frames to push (900 = 30 s at 30 fps)")
+    parser.add_argument("--window", type=int, default=8)
+    parser.add_argument("--resolution", default="640x480", metavar="WxH")
+    args = parser.parse_args()
+    frame_size = tuple(int(v) for v in args.resolution.lower().split("x"))
+
+    _, frame = SyntheticSource(frame_count=1, frame_size=frame_size).read()
+    detections = [((200, 120, 220, 220), [(40, 90, 80, 40)])]
+    buffer = BestFrameBuffer(args.window)
+    # Warm up: allocates the ring and fills Python's tuple free list (up to 2000 each)
+    for _ in range(3000):
+        buffer.push(frame, detections)
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    for _ in range(args.frames):
+        buffer.push(frame, detections)
+    push_seconds = time.perf_counter() - start
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(100):
+        buffer.best()
+    best_seconds = (time.perf_counter() - start) / 100
+
+    ring_bytes = args.window * frame.nbytes
+    print(f"{args.frames} frames ({frame_size[0]}x{frame_size[1]}), window of {args.window}")
+    print(f"ring buffer: {ring_bytes / 1024 / 1024:.1f} MiB, allocated once")
+    print(f"push: {1000 * push_seconds / args.frames:.3f} ms/frame, best(): {1000 * best_seconds:.3f} ms")
+    print(f"memory after setup: {after - before} bytes retained, {peak - before} bytes peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: sustained burst capture throughput and dropped frames.
+
+Feeds synthetic frames at a fixed camera rate into a BurstRecorder and starts a new
+burst as soon as the previous one has finished and the ring is full again (the worst case: someone smiling
+non-stop with no save interval). Reports how many frames per second the background
+writer sustains, how many burst frames had to be dropped, and that every file name
+was unique.
+
+Usage:
+    python benchmarks/bench_burst.py [--fps 30] [--seconds 10] [--burst 8] [--resolution 640x480]
+"""
+# Import required libraries
+import argparse
+import functools
+import os
+import sys
+import tempfile
+import time
+
+# Make the project modules importable when run from the benchmarks folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from burst import BurstRecorder
+from frame_sources import SyntheticSource
+from selfie_writer import SelfieWriter
+from capture import save_selfie
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fps", type=float, default=30, help="camera frame rate to simulate")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--burst", type=int, default=8, help="frames per burst")
+    parser.add_argument("--resolution", default="640x480", metavar="WxH")
+    args = parser.parse_args()
+    frame_size = tuple(int(v) for v in args.resolution.lower().split("x"))
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = SyntheticSource(frame_count=1, frame_size=frame_size)
+        _, frame = source.read()
+        writer = SelfieWriter(functools.partial(save_selfie), max_pending=max(8, 2 * args.burst))
+        burst = BurstRecorder(writer, directory, args.burst)
+
+        frame_time = 1.0 / args.fps
+        frames = 0
+        start = time.perf_counter()
+        next_frame = start
+        buffered = 0
+        while time.perf_counter() - start < args.seconds:
+            if not burst.in_burst():
+                buffered += 1  # This frame goes into the ring
+            burst.feed(frame)
+            if buffered >= burst.frames_before:
+                burst.trigger()  # Ring full: start the next burst right away
+                buffered = 0
+            frames += 1
+            next_frame += frame_time
+            time.sleep(max(0.0, next_frame - time.perf_counter()))
+        capture_seconds = time.perf_counter() - start
+        writer.close()
+        total_seconds = time.perf_counter() - start
+
+        files = len([f for f in os.listdir(directory) if f.endswith(".png")])
+        print(f"{frames} frames at {args.fps:g} fps ({frame_size[0]}x{frame_size[1]}), bursts of {args.burst}")
+        print(burst.describe())
+        print(f"written: {writer.saved} files ({files} unique names), "
+              f"{writer.saved / total_seconds:.1f} frames/s sustained, "
+              f"{100 * burst.dropped / max(1, burst.captured + burst.dropped):.1f}% dropped")
+        print(f"flush after capture stopped: {total_seconds - capture_seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
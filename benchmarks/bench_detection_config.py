@@ -0,0 +1,97 @@
+"""
+Benchmark: full-frame face detection vs. a calibrated ROI and face size limits.
+
+Builds a 1280x720 kiosk-like grayscale clip: background.jpg with the sample face
+standing in one spot and swaying a little. Calibrates on the first half of the
+clip with calibrate_detection.calibrate(), then runs face + smile detection over
+the second half with the default settings and with the calibrated ones, and
+reports the time per frame and how many of the default faces are still found.
+
+Usage:
+    python benchmarks/bench_detection_config.py [--frames 200] [--resolution 1280x720]
+"""
+# Import required libraries
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Make the project modules importable when run from the benchmarks folder
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from calibrate_detection import calibrate, count_matches
+from detection import DEFAULT_CONFIG, load_cascades, detect_faces_and_smiles
+
+
+def make_clip(frame_count, frame_size):
+    """Static noisy background with the sample face swaying in the middle."""
+    width, height = frame_size
+    background = cv2.imread(os.path.join(ROOT, "background.jpg"), cv2.IMREAD_GRAYSCALE)
+    background = cv2.resize(background, frame_size, interpolation=cv2.INTER_AREA)
+    face = cv2.imread(os.path.join(ROOT, "face.jpg"), cv2.IMREAD_GRAYSCALE)
+    face_width = width // 2
+    face = cv2.resize(face, (face_width, int(face.shape[0] * face_width / face.shape[1])))
+    rng = np.random.default_rng(0)
+    noise = [rng.integers(-4, 5, background.shape, dtype=np.int16) for _ in range(8)]
+
+    frames = []
+    for i in range(frame_count):
+        frame = np.clip(background + noise[i % len(noise)], 0, 255).astype(np.uint8)
+        x = int((width - face.shape[1]) / 2 + width / 20 * np.sin(i / 20.0))
+        y = int((height - face.shape[0]) / 2 + height / 30 * np.cos(i / 25.0))
+        frame[y:y + face.shape[0], x:x + face.shape[1]] = face
+        frames.append(frame)
+    return frames
+
+
+def run(frames, face_detector, smile_cascade, config):
+    """Return (face boxes per frame, smiles found, ms per frame)."""
+    found, smiles = [], 0
+    start = time.perf_counter()
+    for gray in frames:
+        detections = detect_faces_and_smiles(face_detector, smile_cascade, gray, config=config)
+        found.append([face for face, _ in detections])
+        smiles += sum(len(face_smiles) for _, face_smiles in detections)
+    return found, smiles, 1000 * (time.perf_counter() - start) / max(1, len(frames))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=200, help="clip length (half calibrates, half measures)")
+    parser.add_argument("--resolution", default="1280x720", metavar="WxH")
+    args = parser.parse_args()
+
+    face_detector, smile_cascade = load_cascades()
+    if face_detector is None:
+        print("Error: Unable to load the detector models.")
+        return
+    frame_size = tuple(int(v) for v in args.resolution.lower().split("x"))
+    frames = make_clip(args.frames, frame_size)
+    calibration, measured = frames[:len(frames) // 2], frames[len(frames) // 2:]
+    print(f"{len(calibration)} calibration + {len(measured)} measured frames at {frame_size[0]}x{frame_size[1]} "
+          f"(OpenCV threads: {cv2.getNumThreads()})")
+
+    faces = []
+    for gray in calibration:
+        faces.extend(face for face, _ in detect_faces_and_smiles(face_detector, smile_cascade, gray))
+    config = calibrate(faces, frame_size[::-1])
+    if config is None:
+        print(f"Error: Only {len(faces)} faces found in the calibration frames")
+        return
+    print(config.describe())
+
+    reference, default_smiles, default_ms = run(measured, face_detector, smile_cascade, DEFAULT_CONFIG)
+    found, smiles, config_ms = run(measured, face_detector, smile_cascade, config)
+    total = sum(len(frame_faces) for frame_faces in reference)
+    print(f"default:    {default_ms:7.2f} ms/frame, {total} faces, {default_smiles} smiles")
+    print(f"calibrated: {config_ms:7.2f} ms/frame, {count_matches(found, reference)}/{total} faces still found, "
+          f"{smiles} smiles")
+    print(f"speedup: {default_ms / config_ms:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
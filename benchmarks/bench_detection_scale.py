@@ -0,0 +1,55 @@
+"""
+Benchmark: face + smile detection at native resolution vs. on a downscaled copy.
+
+Runs detect_faces_and_smiles() on the sample face at 640x480 and 1280x720, with
+faces detected at full resolution and at 320 pixels wide, and reports the time per
+frame and the boxes found (which should agree).
+
+Usage:
+    python benchmarks/bench_detection_scale.py
+"""
+# Import required libraries
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Make the project modules importable when run from the benchmarks folder
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from detection import load_cascades, detect_faces_and_smiles
+
+REPEATS = 30
+
+
+def make_frame(width, height):
+    """Place the sample face in the middle of a gray frame of the given size."""
+    face = cv2.imread(os.path.join(ROOT, "face.jpg"), cv2.IMREAD_GRAYSCALE)
+    face_w = int(width * 0.75)
+    face_h = int(face.shape[0] * face_w / face.shape[1])
+    face = cv2.resize(face, (face_w, face_h))
+    frame = np.full((height, width), 90, np.uint8)
+    top, left = (height - face_h) // 2, (width - face_w) // 2
+    frame[top:top + face_h, left:left + face_w] = face
+    return frame
+
+
+def main():
+    face_cascade, smile_cascade = load_cascades()
+    print(f"{'resolution':>10}  {'detect width':>12}  {'ms/frame':>9}  detections")
+    for width, height in ((640, 480), (1280, 720)):
+        frame = make_frame(width, height)
+        for detection_width in (None, 320):
+            start = time.perf_counter()
+            for _ in range(REPEATS):
+                detections = detect_faces_and_smiles(face_cascade, smile_cascade, frame, detection_width)
+            ms = 1000 * (time.perf_counter() - start) / REPEATS
+            summary = ", ".join(f"face {face} smiles {len(smiles)}" for face, smiles in detections)
+            print(f"{width}x{height:<5}  {str(detection_width or 'native'):>12}  {ms:9.1f}  {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark: face detector backends (face_detectors.py) on the same clip.
+
+Reads the frames of a clip once, then runs detect_faces() with every backend
+whose model file is available and reports its speed and how well its faces agree
+with the first backend (matched by box overlap), plus how many frames get the
+same smile / no smile answer when the smile cascade runs on each backend's faces.
+
+Usage:
+    python benchmarks/bench_face_backends.py [--source clip.mp4] [--backends haar lbp yunet]
+"""
+# Import required libraries
+import argparse
+import os
+import sys
+import time
+
+import cv2
+
+# Make the project modules importable when run from the benchmarks folder
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from detection import DETECTION_WIDTH, load_cascades, detect_faces, detect_smiles_for_faces, detection_scale
+from face_detectors import BACKENDS
+from frame_sources import open_source
+from smile_filter import box_iou
+
+MATCH_IOU = 0.5  # Two boxes are the same face if they overlap at least this much
+
+
+def read_frames(source, max_frames):
+    """Read up to max_frames grayscale frames from a frame source."""
+    cap = open_source(source)
+    frames = []
+    try:
+        while len(frames) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+    finally:
+        cap.release()
+    return frames
+
+
+def count_matches(faces, reference):
+    """Count the faces that overlap a reference face (each reference face is used once)."""
+    unused = list(reference)
+    matched = 0
+    for face in faces:
+        best = max(unused, key=lambda ref: box_iou(face, ref), default=None)
+        if best is not None and box_iou(face, best) >= MATCH_IOU:
+            unused.remove(best)
+            matched += 1
+    return matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--source", default="synthetic",
+                        help="video file, image folder or synthetic[:N] (default: synthetic)")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=list(BACKENDS),
+                        help="backends to compare; the first one is the reference (default: all)")
+    parser.add_argument("--detect-width", type=int, default=DETECTION_WIDTH, metavar="PIXELS")
+    args = parser.parse_args()
+
+    frames = read_frames(args.source, args.frames)
+    if not frames:
+        print(f"Error: No frames read from {args.source!r}")
+        return
+    print(f"{len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]} from {args.source}, "
+          f"OpenCV threads: {cv2.getNumThreads()}")
+    print(f"{'backend':<8} {'ms/frame':>9} {'fps':>7} {'faces':>6} {'matched':>8} {'recall':>7} "
+          f"{'precision':>9} {'smile agree':>12}")
+
+    reference = None  # (faces per frame, smiling per frame) of the first backend that loaded
+    for backend in args.backends:
+        face_detector, smile_cascade = load_cascades(backend)
+        if face_detector is None:
+            print(f"{backend:<8} (model not available)")
+            continue
+
+        found = []
+        start = time.perf_counter()
+        for gray in frames:
+            found.append(detect_faces(face_detector, gray, detection_scale(gray.shape[1], args.detect_width)))
+        ms = 1000 * (time.perf_counter() - start) / len(frames)
+        smiling = [any(smiles for _, smiles in detect_smiles_for_faces(smile_cascade, gray, faces))
+                   for gray, faces in zip(frames, found)]
+
+        if reference is None:
+            reference = (found, smiling)
+        faces = sum(len(f) for f in found)
+        reference_faces = sum(len(f) for f in reference[0])
+        matched = sum(count_matches(f, ref) for f, ref in zip(found, reference[0]))
+        agree = sum(a == b for a, b in zip(smiling, reference[1]))
+        recall = matched / reference_faces if reference_faces else 1.0
+        precision = matched / faces if faces else 1.0
+        print(f"{backend:<8} {ms:>9.2f} {1000 / ms:>7.1f} {faces:>6} {matched:>8} {recall:>7.2f} "
+              f"{precision:>9.2f} {agree:>6}/{len(frames):<5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark: allocating a new frame every read vs. reusing preallocated buffers.
+
+Replays a long clip (by default a 640x480 MJPG video written from synthetic frames
+to a temporary folder) through the first two steps of the test.main() loop:
+
+    allocate   ret, frame = cap.read()       gray = cv2.cvtColor(frame, ...)
+    reuse      ret, frame = cap.read(frame)  gray = cv2.cvtColor(frame, ..., dst=gray)
+
+and reports the time per frame and the process memory (RSS) sampled during the
+run: with reused buffers it should stay flat.
+
+Usage:
+    python benchmarks/bench_frame_buffers.py [--frames 3000] [--source clip.mp4] [--resolution 1280x720]
+"""
+# Import required libraries
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+# Make the project modules importable when run from the benchmarks folder
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from frame_sources import SyntheticSource
+
+RSS_EVERY = 100  # Sample the memory every this many frames
+
+
+def rss_mb():
+    """Current resident memory of this process in MB (Linux), or the peak elsewhere."""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def write_clip(path, frame_count, frame_size):
+    """Write synthetic frames to an MJPG video file."""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, frame_size)
+    source = SyntheticSource(frame_count, frame_size)
+    frame = None
+    while True:
+        ret, frame = source.read(frame)
+        if not ret:
+            break
+        writer.write(frame)
+    writer.release()
+
+
+def replay(path, reuse):
+    """Read and convert every frame of a clip; return (frames, ms per frame, RSS samples)."""
+    cap = cv2.VideoCapture(path)
+    frame = gray = None
+    frames = 0
+    samples = []
+    start = time.perf_counter()
+    while True:
+        if reuse:
+            ret, frame = cap.read(frame)
+        else:
+            ret, frame = cap.read()
+        if not ret:
+            break
+        if reuse:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+        else:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        frames += 1
+        if frames % RSS_EVERY == 0:
+            samples.append(rss_mb())
+    seconds = time.perf_counter() - start
+    cap.release()
+    return frames, 1000 * seconds / max(1, frames), samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=3000, help="length of the generated clip")
+    parser.add_argument("--resolution", default="640x480", metavar="WxH", help="generated clip size")
+    parser.add_argument("--source", default=None, help="replay this video file instead")
+    parser.add_argument("--rounds", type=int, default=2, help="replays per mode (alternating)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = args.source
+        if path is None:
+            frame_size = tuple(int(v) for v in args.resolution.lower().split("x"))
+            path = os.path.join(work_dir, "clip.avi")
+            write_clip(path, args.frames, frame_size)
+
+        print(f"{'mode':<9} {'frames':>6} {'ms/frame':>9} {'RSS first':>10} {'last':>8} {'max':>8}")
+        results = {"allocate": [], "reuse": []}
+        for _ in range(args.rounds):
+            for mode in results:
+                frames, ms, samples = replay(path, mode == "reuse")
+                results[mode].append(ms)
+                if samples:
+                    print(f"{mode:<9} {frames:>6} {ms:>9.3f} {samples[0]:>8.1f}MB {samples[-1]:>6.1f}MB "
+                          f"{max(samples):>6.1f}MB")
+        allocate_ms, reuse_ms = np.median(results["allocate"]), np.median(results["reuse"])
+        print(f"median: allocate {allocate_ms:.3f} ms/frame, reuse {reuse_ms:.3f} ms/frame "
+              f"(reuse takes {100 * reuse_ms / allocate_ms:.1f}% of the allocate time)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: headless mode (test.py --headless) vs. the windowed loop on the same input.
+
+Runs test.main() over the same frames once without a window and, if this machine
+can open one, once with it, and reports the loop fps of both (from the loop
+metrics). Both runs work in a temporary folder, so no selfies end up in the
+project. Where no window can be opened (no display, or an opencv-python-headless
+build), the per-frame cost headless mode skips is measured on its own instead:
+drawing the annotations and the status text.
+
+Usage:
+    python benchmarks/bench_headless.py [--source clip.mp4] [--frames 300]
+"""
+# Import required libraries
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+
+# Make the project modules importable when run from the benchmarks folder
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import test
+from capture import draw_status_overlay
+from frame_sources import open_source
+from overlay import Overlay
+from selfie_counter import SelfieCounter
+
+
+def window_available():
+    """Return True if OpenCV can open a window here."""
+    try:
+        cv2.namedWindow("bench_headless")
+        cv2.destroyWindow("bench_headless")
+        return True
+    except cv2.error:
+        return False
+
+
+def run_loop(source, headless):
+    """Run test.main() over a source and return its final loop metrics."""
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        try:
+            metrics_path = os.path.join(work_dir, "metrics.json")
+            test.main(source=source, headless=headless, metrics_json=metrics_path)
+            with open(metrics_path) as file:
+                return json.load(file)
+        finally:
+            os.chdir(previous_dir)
+
+
+def time_drawing(source, frame_count):
+    """Milliseconds per frame spent on what headless mode skips: the overlay and status text."""
+    cap = open_source(source)
+    frames = []
+    while len(frames) < frame_count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+
+    face = (200, 150, 220, 220)
+    counter = SelfieCounter([])
+    start = time.perf_counter()
+    for frame in frames:
+        # The same items draw_detections_and_capture() adds for one face, plus the status text
+        overlay = Overlay()
+        overlay.rectangle(face[:2], (face[0] + face[2], face[1] + face[3]), (0, 255, 0), 2)
+        overlay.text('Face', (face[0], face[1] - 10), 0.6, (0, 255, 0), 2)
+        overlay.text('Please smile!', (face[0], face[1] + face[3] + 30), 0.6, (255, 255, 0), 2)
+        overlay.draw(frame)
+        draw_status_overlay(frame, counter=counter)
+    return 1000 * (time.perf_counter() - start) / max(1, len(frames))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--source", default=None,
+                        help="video file or image folder (default: synthetic frames)")
+    parser.add_argument("--frames", type=int, default=300, help="synthetic frames to generate")
+    args = parser.parse_args()
+    source = os.path.abspath(args.source) if args.source else f"synthetic:{args.frames}"
+
+    headless = run_loop(source, headless=True)
+    print(f"headless: {headless['fps']:.1f} fps over {headless['counters']['frames']} frames")
+
+    if window_available():
+        windowed = run_loop(source, headless=False)
+        print(f"windowed: {windowed['fps']:.1f} fps over {windowed['counters']['frames']} frames")
+        if windowed["fps"] > 0:
+            print(f"headless is {headless['fps'] / windowed['fps']:.2f}x the windowed fps")
+    else:
+        draw_ms = time_drawing(source, min(args.frames, 100))
+        print(f"windowed: not available here (no display / headless OpenCV build, "
+              f"OpenCV threads: {cv2.getNumThreads()})")
+        print(f"skipped drawing alone: {draw_ms:.2f} ms/frame; imshow/waitKey come on top")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark: cost of the loop instrumentation (metrics.py) and of per-face logging.
+
+Times LoopMetrics.record() / frame_done() against the old per-face print() (to a
+throwaway stream, so the terminal speed does not count) and a logger.debug() call
+that is switched off, which is what the loop now does by default.
+
+Usage:
+    python benchmarks/bench_metrics.py [--calls 200000]
+"""
+# Import required libraries
+import argparse
+import io
+import logging
+import os
+import sys
+import time
+
+# Make the project modules importable when run from the benchmarks folder
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from metrics import LoopMetrics
+
+
+def time_us(function, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return 1e6 * (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args()
+
+    metrics = LoopMetrics()
+    sink = io.StringIO()
+    logger = logging.getLogger("bench_metrics")
+    logger.setLevel(logging.INFO)
+    x, y, smiles = 320, 240, 0
+
+    def old_print():
+        print(f"Face detected at ({x},{y}), Smiles found: {smiles}", end="", file=sink)
+        print(" -> No smile", file=sink)
+        sink.seek(0)
+
+    results = [
+        ("metrics.record()", time_us(lambda: metrics.record("faces", 0.03), args.calls)),
+        ("metrics.frame_done()", time_us(metrics.frame_done, args.calls)),
+        ("per-face print()", time_us(old_print, args.calls)),
+        ("per-face logger.debug() (off)",
+         time_us(lambda: logger.debug("Face detected at (%d,%d), Smiles found: %d -> %s", x, y, smiles, "No smile"),
+                 args.calls)),
+        ("metrics.snapshot()", time_us(metrics.snapshot, max(1, args.calls // 1000))),
+    ]
+    for name, us in results:
+        print(f"{name:<32} {us:8.2f} us/call")
+    # One frame records 7 stages and finishes once
+    per_frame = 7 * results[0][1] + results[1][1]
+    print(f"Instrumentation per frame: {per_frame:.1f} us ({per_frame / 333:.2f}% of a 33 ms frame)")
+
+
+if __name__ == "__main__":
+    main()
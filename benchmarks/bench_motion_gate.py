@@ -0,0 +1,92 @@
+"""
+Benchmark: face + smile detection with and without the motion gate (motion_gate.py).
+
+Builds a 640x480 grayscale clip: an empty, static scene (background.jpg with a
+little sensor noise) followed by the sample face sliding in and moving around.
+Runs detection over it every frame, then through MotionGate, and reports CPU time,
+how many frames were detected / skipped / idle, and how many frames after the face
+appeared it was first found.
+
+Usage:
+    python benchmarks/bench_motion_gate.py [--idle-frames 300] [--active-frames 150]
+"""
+# Import required libraries
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Make the project modules importable when run from the benchmarks folder
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from detection import load_cascades, detect_faces_and_smiles
+from motion_gate import MotionGate
+
+
+def make_clip(idle_frames, active_frames):
+    """Static noisy background, then the sample face entering and moving."""
+    background = cv2.imread(os.path.join(ROOT, "background.jpg"), cv2.IMREAD_GRAYSCALE)
+    background = cv2.resize(background, (640, 480), interpolation=cv2.INTER_AREA)
+    face = cv2.resize(cv2.imread(os.path.join(ROOT, "face.jpg"), cv2.IMREAD_GRAYSCALE), (480, 275))
+    rng = np.random.default_rng(0)
+    noise = [rng.integers(-4, 5, background.shape, dtype=np.int16) for _ in range(8)]
+
+    frames = []
+    for i in range(idle_frames + active_frames):
+        frame = np.clip(background + noise[i % len(noise)], 0, 255).astype(np.uint8)
+        if i >= idle_frames:
+            offset_x = int(80 + 60 * np.sin((i - idle_frames) / 25.0))
+            frame[100:375, offset_x:offset_x + 480] = face[:, :min(480, 640 - offset_x)]
+        frames.append(frame)
+    return frames
+
+
+def run(frames, face_cascade, smile_cascade, gate=None):
+    """Return (CPU seconds, frames with a face, index of the first frame with a face)."""
+    found, first = 0, None
+    start = time.process_time()
+    for i, gray in enumerate(frames):
+        if gate is not None and not gate.should_detect(gray):
+            continue
+        detect_start = time.perf_counter()
+        detections = detect_faces_and_smiles(face_cascade, smile_cascade, gray)
+        if gate is not None:
+            gate.detection_done(len(detections), time.perf_counter() - detect_start)
+        if detections:
+            found += 1
+            first = i if first is None else first
+    return time.process_time() - start, found, first
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--idle-frames", type=int, default=300)
+    parser.add_argument("--active-frames", type=int, default=150)
+    args = parser.parse_args()
+
+    face_cascade, smile_cascade = load_cascades()
+    if face_cascade is None:
+        print("Error: Unable to load the detector models.")
+        return
+    frames = make_clip(args.idle_frames, args.active_frames)
+    print(f"{args.idle_frames} empty frames, then {args.active_frames} with a face "
+          f"(OpenCV threads: {cv2.getNumThreads()})")
+
+    cpu, found, first = run(frames, face_cascade, smile_cascade)
+    print(f"every frame: {cpu:6.2f}s CPU, {len(frames)} detections, face in {found} frames, "
+          f"first found {first - args.idle_frames} frames after it appeared")
+
+    gate = MotionGate()
+    gated_cpu, found, first = run(frames, face_cascade, smile_cascade, gate)
+    print(f"motion gate: {gated_cpu:6.2f}s CPU, {gate.detected} detections, face in {found} frames, "
+          f"first found {first - args.idle_frames} frames after it appeared")
+    print(gate.describe())
+    print(f"CPU saved: {100 * (1 - gated_cpu / cpu):.0f}%")
+
+
+if __name__ == "__main__":
+    main()
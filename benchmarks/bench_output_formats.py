@@ -0,0 +1,59 @@
+"""
+Benchmark: encode time and file size of each selfie output format.
+
+Encodes the same camera-sized frame with every output format (see output_formats.py)
+and reports the time per image and the bytes per image. Synthetic frames are very
+smooth and compress far better than real photos; pass --image with a real selfie
+for realistic sizes.
+
+Usage:
+    python benchmarks/bench_output_formats.py [--image photo.jpg] [--repeat 20] [--resolution 640x480]
+"""
+# Import required libraries
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+
+# Make the project modules importable when run from the benchmarks folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frame_sources import SyntheticSource
+from output_formats import parse_output_format
+
+FORMATS = ["png", "png:0", "png:1", "png:3", "png:9", "jpeg:95", "jpeg:85", "jpeg:70",
+           "webp:90", "webp:75", "webp:101", "npy"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--image", help="photo to encode (default: a synthetic frame)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--resolution", default="640x480", metavar="WxH")
+    args = parser.parse_args()
+    frame_size = tuple(int(v) for v in args.resolution.lower().split("x"))
+
+    if args.image:
+        frame = cv2.resize(cv2.imread(args.image), frame_size, interpolation=cv2.INTER_AREA)
+    else:
+        _, frame = SyntheticSource(frame_count=1, frame_size=frame_size).read()
+
+    print(f"{frame_size[0]}x{frame_size[1]} {'photo' if args.image else 'synthetic'} frame, "
+          f"{args.repeat} encodes per format")
+    print(f"{'format':<10} {'ms/image':>9} {'KiB/image':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for text in FORMATS:
+            output_format = parse_output_format(text)
+            path = os.path.join(directory, "selfie" + output_format.extension)
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                output_format.write(path, frame)
+            seconds = (time.perf_counter() - start) / args.repeat
+            print(f"{text:<10} {1000 * seconds:>9.2f} {os.path.getsize(path) / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark: per-frame cost of the "Selfies saved" counter.
+
+Compares the old count_selfies() (full directory listing every frame) with the
+SelfieCounter used by the video loop, for directories holding 10, 10k and 100k
+selfies.
+
+Usage:
+    python benchmarks/bench_selfie_counter.py
+"""
+# Import required libraries
+import os
+import sys
+import tempfile
+import time
+
+# Make the project modules importable when run from the benchmarks folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selfie_counter import SelfieCounter
+from capture import count_selfies
+
+DIRECTORY_SIZES = [10, 10_000, 100_000]
+
+
+def time_per_call(function, repeats):
+    """Return the average time of one call to function(), in microseconds."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return 1e6 * (time.perf_counter() - start) / repeats
+
+
+def fill_directory(directory, count):
+    """Create count empty selfie files in directory."""
+    for i in range(count):
+        open(os.path.join(directory, f"selfie_{i:08d}.png"), "wb").close()
+
+
+def main():
+    print(f"{'files':>8}  {'count_selfies':>14}  {'counter.count':>14}  {'refresh_if_changed':>19}")
+    for size in DIRECTORY_SIZES:
+        with tempfile.TemporaryDirectory() as directory:
+            fill_directory(directory, size)
+            repeats = max(5, 100_000 // size)  # Fewer repeats for the slow, large cases
+
+            counter = SelfieCounter([directory])
+            assert counter.count() == count_selfies(directory) == size
+
+            listing_us = time_per_call(lambda: count_selfies(directory), repeats)
+            cached_us = time_per_call(counter.count, 10_000)
+            stat_us = time_per_call(counter.refresh_if_changed, 10_000)
+            print(f"{size:>8}  {listing_us:>11.1f} us  {cached_us:>11.2f} us  {stat_us:>16.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark: building viewer thumbnails from full photos vs. loading them from the cache.
+
+Saves synthetic 640x480 PNG selfies, then times how long it takes to produce all of
+their 150x150 thumbnails by decoding and resizing the photos (what the viewer did
+before), and by loading the thumbnails that ThumbnailCache wrote at capture time.
+
+Usage:
+    python benchmarks/bench_thumbnail_cache.py [--photos 300]
+"""
+# Import required libraries
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+from PIL import Image
+
+# Make the project modules importable when run from the benchmarks folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frame_sources import SyntheticSource
+from thumbnail_cache import ThumbnailCache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--photos", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ThumbnailCache(os.path.join(directory, ".thumbnails"))
+        source = SyntheticSource(args.photos)
+        paths = []
+        for i in range(args.photos):
+            _, frame = source.read()
+            path = os.path.join(directory, f"selfie_{i:06d}.png")
+            cv2.imwrite(path, frame)
+            cache.store_frame(path, frame)  # What save_selfie() does at capture time
+            paths.append(path)
+
+        start = time.perf_counter()
+        for path in paths:
+            Image.open(path).convert("RGB").resize((150, 150), Image.Resampling.LANCZOS)
+        decode_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for path in paths:
+            cache.load(path)
+        cached_seconds = time.perf_counter() - start
+
+        cache_bytes = sum(os.path.getsize(os.path.join(cache.cache_dir, f)) for f in os.listdir(cache.cache_dir))
+        print(f"{args.photos} photos")
+        print(f"decode + resize full PNGs: {decode_seconds:.2f}s ({1000 * decode_seconds / args.photos:.2f} ms/photo)")
+        print(f"load cached thumbnails:    {cached_seconds:.2f}s ({1000 * cached_seconds / args.photos:.2f} ms/photo)")
+        print(f"cache size: {cache_bytes / 1024:.0f} KiB ({cache_bytes / args.photos / 1024:.1f} KiB/photo), "
+              f"{cache.hits} hits")
+
+
+if __name__ == "__main__":
+    main()
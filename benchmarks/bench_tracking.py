@@ -0,0 +1,70 @@
+"""
+Benchmark: full-frame face detection every frame vs. track-then-detect.
+
+Replays a synthetic 640x480 clip (face.jpg drifting across the frame) through
+detect_faces() and through FaceTracker at a few keyframe intervals, and reports
+the achieved frames per second.
+
+Usage:
+    python benchmarks/bench_tracking.py [--frames 200]
+"""
+# Import required libraries
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Make the project modules importable when run from the benchmarks folder
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from detection import load_cascades, detect_faces
+from tracking import FaceTracker, SEARCH_MARGIN
+
+
+def make_clip(frame_count):
+    """Build grayscale 640x480 frames with the sample face moving slowly."""
+    face = cv2.imread(os.path.join(ROOT, "face.jpg"), cv2.IMREAD_GRAYSCALE)
+    face = cv2.resize(face, (480, 275))
+    frames = []
+    for i in range(frame_count):
+        frame = np.full((480, 640), 90, np.uint8)
+        offset_x = int(80 + 60 * np.sin(i / 25.0))  # Gentle side-to-side motion
+        offset_y = int(100 + 20 * np.cos(i / 30.0))
+        frame[offset_y:offset_y + 275, offset_x:offset_x + 480] = face[:, :min(480, 640 - offset_x)]
+        frames.append(frame)
+    return frames
+
+
+def run(frames, find_faces):
+    """Return (fps, frames with a face) for a face-finding function."""
+    found = 0
+    start = time.perf_counter()
+    for frame in frames:
+        if find_faces(frame):
+            found += 1
+    return len(frames) / (time.perf_counter() - start), found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    face_cascade, _ = load_cascades()
+    frames = make_clip(args.frames)
+
+    fps, found = run(frames, lambda gray: detect_faces(face_cascade, gray))
+    print(f"{'full frame every frame':<28} {fps:7.1f} fps  face in {found}/{len(frames)} frames")
+    for interval in (5, 10, 30):
+        tracker = FaceTracker(face_cascade, keyframe_interval=interval, search_margin=SEARCH_MARGIN)
+        fps, found = run(frames, tracker.update)
+        print(f"{'track, keyframe every ' + str(interval):<28} {fps:7.1f} fps  face in {found}/{len(frames)} frames  "
+              f"({tracker.full_detections} full scans)")
+
+
+if __name__ == "__main__":
+    main()
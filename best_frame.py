@@ -0,0 +1,102 @@
+# Import required libraries
+import time  # Capture timestamps
+
+import cv2
+import numpy as np
+
+BEST_FRAME_WINDOW = 8  # Frames kept (about a quarter of a second at 30 fps)
+SHARPNESS_SIZE = 64    # Faces are shrunk to this many pixels square before measuring sharpness
+
+
+class BestFrameBuffer:
+    """
+    Remember the last few raw camera frames and pick the best one on a smile.
+
+    Saving whichever frame is current when a smile is detected often gives a blurry
+    or half-blinking selfie. Instead, every clean frame is copied into a ring buffer
+    together with its face box, smile count and a sharpness score, and the capture
+    picks the sharpest smiling frame of the window.
+
+    All storage is allocated once (when the first frame arrives) and reused, so
+    memory stays flat however long the camera runs.
+    """
+
+    def __init__(self, size=BEST_FRAME_WINDOW):
+        """
+        Args:
+            size: Number of recent frames to keep
+        """
+        self.size = max(1, size)
+        self._frames = None                    # (size, height, width, 3) array, made on first push
+        self._times = np.zeros(self.size)      # Capture time of each slot
+        self._smiles = np.zeros(self.size, np.int32)
+        self._sharpness = np.zeros(self.size)
+        self._faces = [None] * self.size       # Face box (x, y, w, h) of each slot
+        self._next = 0
+        self._filled = 0
+        # Scratch buffers for the sharpness measure
+        self._patch = np.empty((SHARPNESS_SIZE, SHARPNESS_SIZE, 3), np.uint8)
+        self._gray = np.empty((SHARPNESS_SIZE, SHARPNESS_SIZE), np.uint8)
+        self._edges = np.empty((SHARPNESS_SIZE, SHARPNESS_SIZE), np.int16)
+
+    def push(self, frame, detections, capture_time=None):
+        """
+        Copy a clean frame (before anything is drawn on it) into the buffer.
+
+        Args:
+            frame: The BGR frame (numpy array)
+            detections: List of (face, smiles) pairs found in this frame
+            capture_time: When the frame was captured (time.time() value); defaults to now
+        """
+        if self._frames is None or self._frames[0].shape != frame.shape:
+            # First frame (or the resolution changed): allocate the whole ring once
+            self._frames = np.empty((self.size,) + frame.shape, frame.dtype)
+            self._filled = 0
+        slot = self._next
+        np.copyto(self._frames[slot], frame)
+        self._times[slot] = time.time() if capture_time is None else capture_time
+
+        # Score the largest smiling face (or the largest face if nobody smiles)
+        face, smiles = None, 0
+        for box, box_smiles in detections:
+            if face is None or (len(box_smiles) > 0, box[2] * box[3]) > (smiles > 0, face[2] * face[3]):
+                face, smiles = tuple(map(int, box)), len(box_smiles)
+        self._faces[slot] = face
+        self._smiles[slot] = smiles
+        self._sharpness[slot] = self._measure_sharpness(frame, face) if face is not None else 0.0
+
+        self._next = (slot + 1) % self.size
+        self._filled = min(self._filled + 1, self.size)
+
+    def best(self):
+        """
+        Pick the best frame of the window: the sharpest one with a smile, or the sharpest
+        one overall if no frame has a smile.
+
+        Returns:
+            tuple: (frame, capture_time, metadata) where frame is a view into the buffer
+                (copy it before the next push) and metadata holds "face" and "smiles";
+                None if the buffer is empty
+        """
+        if self._filled == 0:
+            return None
+        slots = [(self._next - 1 - i) % self.size for i in range(self._filled)]  # Newest first
+        best = max(slots, key=lambda s: (self._smiles[s] > 0, self._sharpness[s]))
+        metadata = {"face": self._faces[best], "smiles": int(self._smiles[best])}
+        return self._frames[best], float(self._times[best]), metadata
+
+    def clear(self):
+        """Forget the buffered frames (e.g. after a capture)."""
+        self._filled = 0
+
+    def _measure_sharpness(self, frame, face):
+        """Variance of the Laplacian of the face, shrunk to a fixed size: higher is sharper."""
+        x, y, w, h = face
+        roi = frame[max(0, y):y + h, max(0, x):x + w]
+        if roi.size == 0:
+            return 0.0
+        cv2.resize(roi, (SHARPNESS_SIZE, SHARPNESS_SIZE), dst=self._patch, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._patch, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        cv2.Laplacian(self._gray, cv2.CV_16S, dst=self._edges)
+        _, stddev = cv2.meanStdDev(self._edges)
+        return float(stddev[0, 0]) ** 2
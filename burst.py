@@ -0,0 +1,114 @@
+# Import required libraries
+import time  # Capture timestamps
+
+import numpy as np
+
+
+class BurstRecorder:
+    """
+    Save a burst of consecutive frames around each smile.
+
+    The camera loop feeds every clean frame to feed(). The last few frames are kept
+    in a small ring of reusable buffers, so a smile can save the frames just before
+    it too. trigger() hands those frames to the SelfieWriter and the next ones follow
+    as they arrive, at full camera rate. Writing happens on the writer's background
+    thread; if its queue is full a frame is dropped (and counted) rather than
+    stalling the camera.
+    """
+
+    def __init__(self, writer, directory="selfies", burst_size=5, frames_before=None):
+        """
+        Args:
+            writer: SelfieWriter that saves the burst frames in the background
+            directory: Directory where the burst frames are saved
+            burst_size: Number of frames saved per burst (at least 1)
+            frames_before: How many of them come from before and including the smile
+                frame (default: half the burst, rounded up)
+        """
+        self.writer = writer
+        self.directory = directory
+        self.burst_size = max(1, burst_size)
+        if frames_before is None:
+            frames_before = (self.burst_size + 1) // 2
+        self.frames_before = min(max(1, frames_before), self.burst_size)
+        self.frames_after = self.burst_size - self.frames_before
+        self.bursts = 0    # Bursts started
+        self.captured = 0  # Frames handed to the writer
+        self.dropped = 0   # Frames the writer had no room for
+
+        self._slots = [None] * self.frames_before  # Ring of frame buffers
+        self._times = [0.0] * self.frames_before   # Capture time of each slot
+        self._next_slot = 0
+        self._filled = 0
+        self._remaining = 0  # Frames still to save for the current burst
+        self._metadata = None
+
+    def feed(self, frame, capture_time=None):
+        """
+        Give the recorder the next clean camera frame (before anything is drawn on it).
+
+        Args:
+            frame: The BGR frame (numpy array)
+            capture_time: When it was captured (time.time() value); defaults to now
+        """
+        if capture_time is None:
+            capture_time = time.time()
+        if self._remaining > 0:
+            # Inside a burst: this frame is saved right away
+            self._remaining -= 1
+            self._submit(frame, capture_time, copy=True)
+            return
+
+        # Copy into the ring, reusing the slot's buffer when it has the right size
+        slot = self._slots[self._next_slot]
+        if slot is None or slot.shape != frame.shape or slot.dtype != frame.dtype:
+            self._slots[self._next_slot] = frame.copy()
+        else:
+            np.copyto(slot, frame)
+        self._times[self._next_slot] = capture_time
+        self._next_slot = (self._next_slot + 1) % self.frames_before
+        self._filled = min(self._filled + 1, self.frames_before)
+
+    def trigger(self, metadata=None):
+        """
+        Start a burst: save the buffered frames (ending with the latest one fed) and
+        the next frames_after frames.
+
+        Args:
+            metadata: Optional dict passed to the save function for every frame
+
+        Returns:
+            bool: True if a burst started, False if one is still in progress or no
+                frame has been fed yet
+        """
+        if self._remaining > 0 or self._filled == 0:
+            return False
+        self._metadata = metadata
+        self.bursts += 1
+        # Oldest buffered frame first, so the files are written in capture order
+        first = (self._next_slot - self._filled) % self.frames_before
+        for i in range(self._filled):
+            position = (first + i) % self.frames_before
+            # The writer takes over this buffer; the ring allocates a new one next time
+            self._submit(self._slots[position], self._times[position], copy=False)
+            self._slots[position] = None
+        self._filled = 0
+        self._remaining = self.frames_after
+        return True
+
+    def in_burst(self):
+        """Return True while frames after a smile are still being saved."""
+        return self._remaining > 0
+
+    def describe(self):
+        """Return a one-line summary of the burst statistics."""
+        return (f"Burst capture: {self.bursts} bursts, {self.captured} frames queued, "
+                f"{self.dropped} dropped")
+
+    def _submit(self, frame, capture_time, copy):
+        # Never wait for the writer: the camera loop must keep its frame rate
+        if self.writer.submit(frame, self.directory, timeout=0, metadata=self._metadata,
+                              capture_time=capture_time, copy=copy):
+            self.captured += 1
+        else:
+            self.dropped += 1
@@ -0,0 +1,193 @@
+"""
+Learn detection settings for a fixed camera from a recorded session.
+
+On a kiosk the camera does not move, so faces always appear in the same part of
+the frame at about the same size. This tool runs the normal full-frame face
+detection over a recording, looks at where the faces were and how big they
+were, and writes a settings file with:
+
+    roi            the part of the frame that held (almost) every face, plus a margin
+    face_min_size  a little below the smallest usual face
+    face_max_size  a little above the largest usual face
+
+It then reads the recording a second time with the new settings and prints the
+time per frame before and after, and how many of the original faces are still
+found. Frames are never kept in memory (only the face boxes), so long sessions are
+fine; the source must be a recording, since a live camera cannot be replayed.
+
+Usage:
+    python calibrate_detection.py --source session.mp4 --output detection.json
+    python test.py --config detection.json
+"""
+# Import required libraries
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from detection import DEFAULT_CONFIG, FACE_BACKEND, load_cascades, detect_faces
+from face_detectors import BACKENDS
+from frame_sources import is_live_source, open_source
+from smile_filter import box_iou
+
+CALIBRATION_PERCENTILE = 2  # Ignore the most extreme 2% of faces on each side (false detections)
+ROI_MARGIN = 0.5            # Extra space around the faces, as a fraction of the usual face size
+SIZE_MARGIN = 0.25          # Face size limits are widened by this fraction
+MIN_CALIBRATION_FACES = 10  # Fewer faces than this is not enough to learn from
+MATCH_IOU = 0.5             # A face is "still found" if a new box overlaps it this much
+
+
+def read_session(source, max_frames=None, every=1):
+    """
+    Read grayscale frames from a recording, one at a time.
+
+    Each frame is read and converted into the same two buffers, so the frame
+    yielded last is overwritten by the next one: use it before asking for more.
+
+    Args:
+        source: Frame source (see frame_sources.open_source())
+        max_frames: Stop after this many frames (None = the whole recording)
+        every: Use only every N-th frame
+
+    Yields:
+        numpy array: The next grayscale frame
+    """
+    cap = open_source(source)
+    frame = gray = None
+    used = index = 0
+    try:
+        while max_frames is None or used < max_frames:
+            ret, frame = cap.read(frame)
+            if not ret:
+                break
+            if index % every == 0:
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+                used += 1
+                yield gray
+            index += 1
+    finally:
+        cap.release()
+
+
+def find_faces(face_detector, frames, config):
+    """
+    Run face detection over every frame.
+
+    Args:
+        face_detector: Loaded face detector from load_cascades()
+        frames: Grayscale frames (any iterable, e.g. read_session())
+        config: DetectionConfig to detect with
+
+    Returns:
+        tuple: (faces per frame, ms of detection per frame, shape of the frames)
+    """
+    found = []
+    seconds = 0.0
+    shape = None
+    for gray in frames:
+        start = time.perf_counter()
+        found.append(detect_faces(face_detector, gray, config=config))
+        seconds += time.perf_counter() - start
+        shape = gray.shape
+    return found, 1000 * seconds / max(1, len(found)), shape
+
+
+def calibrate(faces, frame_shape, base_config=DEFAULT_CONFIG, roi_margin=ROI_MARGIN, size_margin=SIZE_MARGIN):
+    """
+    Work out a region of interest and face size limits from detected faces.
+
+    Args:
+        faces: Face boxes (x, y, w, h) from the whole recording
+        frame_shape: Shape of the frames (height, width, ...)
+        base_config: Settings to start from (the cascade settings are kept)
+        roi_margin: Extra space around the faces, as a fraction of the usual face size
+        size_margin: How much to widen the face size limits
+
+    Returns:
+        DetectionConfig, or None if there are fewer than MIN_CALIBRATION_FACES faces
+    """
+    if len(faces) < MIN_CALIBRATION_FACES:
+        return None
+    boxes = np.array(faces, dtype=float)
+    low, high = CALIBRATION_PERCENTILE, 100 - CALIBRATION_PERCENTILE
+    sizes = np.maximum(boxes[:, 2], boxes[:, 3])
+    min_size, max_size = np.percentile(sizes, [low, high])
+    pad = roi_margin * np.median(sizes)
+
+    # The box that holds (almost) every face, grown by the margin and clipped to the frame
+    frame_height, frame_width = frame_shape[:2]
+    left = max(0, int(np.percentile(boxes[:, 0], low) - pad))
+    top = max(0, int(np.percentile(boxes[:, 1], low) - pad))
+    right = min(frame_width, int(np.percentile(boxes[:, 0] + boxes[:, 2], high) + pad))
+    bottom = min(frame_height, int(np.percentile(boxes[:, 1] + boxes[:, 3], high) + pad))
+
+    face_min = max(1, int(min_size * (1 - size_margin)))
+    face_max = int(max_size * (1 + size_margin))
+    return base_config.copy(roi=(left, top, right - left, bottom - top),
+                            face_min_size=(face_min, face_min), face_max_size=(face_max, face_max))
+
+
+def count_matches(found, reference):
+    """Count the reference faces that still have a matching box (per frame)."""
+    matched = 0
+    for faces, reference_faces in zip(found, reference):
+        for ref in reference_faces:
+            if any(box_iou(face, ref) >= MATCH_IOU for face in faces):
+                matched += 1
+    return matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Learn a detection ROI and face sizes from a recorded session.")
+    parser.add_argument("--source", required=True, help="video file or image folder recorded at the kiosk")
+    parser.add_argument("--output", default="detection.json", help="settings file to write (default: detection.json)")
+    parser.add_argument("--frames", type=int, default=None, help="use at most this many frames")
+    parser.add_argument("--every", type=int, default=1, metavar="N", help="use every N-th frame (default: 1)")
+    parser.add_argument("--margin", type=float, default=ROI_MARGIN,
+                        help=f"space around the faces, as a fraction of the face size (default: {ROI_MARGIN})")
+    parser.add_argument("--face-detector", choices=list(BACKENDS), default=FACE_BACKEND)
+    args = parser.parse_args()
+
+    if is_live_source(args.source):
+        parser.error("--source must be a recording (video file or image folder); record the camera first")
+    face_detector, _ = load_cascades(args.face_detector)
+    if face_detector is None:
+        print("Error: Unable to load the detector models.")
+        return 1
+    every = max(1, args.every)
+
+    # STEP 1: FULL-FRAME DETECTION WITH THE DEFAULT SETTINGS
+    # Only the face boxes are kept; the frames themselves are read again in step 3
+    reference, full_ms, frame_shape = find_faces(face_detector, read_session(args.source, args.frames, every),
+                                                 DEFAULT_CONFIG)
+    if not reference:
+        print(f"Error: No frames read from {args.source!r}")
+        return 1
+    all_faces = [face for faces in reference for face in faces]
+    print(f"{len(reference)} frames, {len(all_faces)} faces found with the default settings")
+
+    # STEP 2: LEARN WHERE THE FACES ARE AND HOW BIG THEY ARE
+    config = calibrate(all_faces, frame_shape, roi_margin=args.margin)
+    if config is None:
+        print(f"Error: Need at least {MIN_CALIBRATION_FACES} faces to calibrate; record a longer session")
+        return 1
+    print(config.describe())
+
+    # STEP 3: CHECK THE NEW SETTINGS ON THE SAME FRAMES (READ AGAIN FROM THE SOURCE)
+    found, roi_ms, _ = find_faces(face_detector, read_session(args.source, args.frames, every), config)
+    if len(found) != len(reference):
+        print(f"Warning: the source gave {len(found)} frames the second time, not {len(reference)}")
+    matched = count_matches(found, reference)
+    # No frames (or no measurable time) the second time means there is no speed-up to report
+    speedup = f" ({full_ms / roi_ms:.1f}x faster)" if roi_ms > 0 else ""
+    print(f"Face detection: {full_ms:.1f} ms/frame -> {roi_ms:.1f} ms/frame{speedup}, "
+          f"{matched}/{len(all_faces)} faces still found")
+
+    config.save(args.output)
+    print(f"Settings written to {args.output}; use them with: python test.py --config {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
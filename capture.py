@@ -0,0 +1,379 @@
+"""
+Capturing and saving selfies: the steps shared by every place that runs the detector.
+
+test.py (the OpenCV window and headless service), detector_service.py (the Tk
+launcher) and multi_camera.py all turn detections into selfies with the same
+helpers: draw_detections_and_capture() decides when a smile becomes a selfie and
+draws the feedback, and save_selfie() writes the file (and updates the selfie
+counter, thumbnail cache and index).
+"""
+# Import required libraries
+import cv2         # OpenCV for drawing and the live counter text
+import time        # For timestamps and timing control
+import os          # Operating system interface for file/directory operations
+import threading   # Several threads may pick selfie file names at the same time
+import logging     # Per-face detection messages (shown with --log-level DEBUG)
+
+from detection import DEFAULT_CONFIG, mouth_region, face_crop_region
+from selfie_counter import is_selfie_file
+from overlay import Overlay
+from output_formats import parse_output_format
+
+logger = logging.getLogger(__name__)
+
+# File names handed out but not written yet (guarded by _name_lock), so two saves
+# in the same millisecond never pick the same name
+_name_lock = threading.Lock()
+_reserved_paths = set()
+
+
+def draw_detections_and_capture(frame, detections, state, selfie_dir="selfies", overlay=None):
+    """
+    Draw feedback for every detected face and auto-capture a selfie on a smile.
+    
+    Selfies are saved before anything is drawn, so they never contain the annotations.
+    
+    Args:
+        frame: The color video frame (saved as the selfie, then drawn on)
+        detections: List of (face, smiles) pairs from detect_faces_and_smiles()
+        state: Dict with "last_saved_time" and "save_interval"; last_saved_time is updated.
+            Each face followed by the smile filter has its own save_interval cooldown
+            (kept in "face_saved_times"), and at most one selfie is saved per frame,
+            or one crop per smiling face with "crop_faces". If it also holds a "writer" (SelfieWriter), selfies are saved in the background,
+            and a "counter" (SelfieCounter) / "thumbnails" (ThumbnailCache) / "index"
+            (SelfieIndex) are updated by synchronous saves, written in "output_format"
+            (OutputFormat). A "burst" (BurstRecorder) saves a whole burst of frames
+            instead of the current one, "best_frames" (BestFrameBuffer, already holding
+            this frame) saves the best recent frame, a "smile_filter"
+            (SmileConfirmer) only lets stable smiles trigger a capture, a
+            "metrics" (LoopMetrics) counts the captures, and a "detection_config"
+            (DetectionConfig) gives the mouth area used to draw smiles
+        selfie_dir: Directory where selfies are saved
+        overlay: Optional Overlay that receives the annotations; the caller draws it
+            (overlay.draw(frame)) before display. Without it they are drawn onto the
+            frame here, after any selfie has been handed off
+    """
+    draw_now = overlay is None
+    if draw_now:
+        overlay = Overlay()
+    mouth_top = state.get("detection_config", DEFAULT_CONFIG).mouth_top
+
+    # A smile only counts once it is stable over a few frames (if a smile filter is used).
+    # The filter also follows each face across frames, which gives it a track id
+    smile_filter = state.get("smile_filter")
+    if smile_filter is not None:
+        confirmed = smile_filter.update(detections)
+        track_ids = smile_filter.track_ids
+    else:
+        confirmed = [len(smiles) > 0 for _, smiles in detections]
+        track_ids = [None] * len(detections)
+
+    # Every face has its own cooldown, so one person's selfie does not block another's
+    face_saved_times = state.setdefault("face_saved_times", {})  # track id -> last save time
+    current_time = time.time()
+    to_capture = []  # (face, smiles, track id) of the faces that want a selfie this frame
+
+    # STEP 6D: PROCESS EACH DETECTED FACE
+    # Each face rectangle is defined as (x, y, width, height)
+    for ((x, y, w, h), smiles), smile_confirmed, track_id in zip(detections, confirmed, track_ids):
+        
+        # STEP 6D-i: DRAW VISUAL INDICATORS FOR THE DETECTED FACE
+        # Draw a green rectangle around the detected face for user feedback
+        overlay.rectangle((x, y), (x + w, y + h), (0, 255, 0), 2)
+        # Parameters: (top-left corner, bottom-right corner, color (B,G,R), thickness)
+        
+        # Add a text label above the face rectangle
+        overlay.text('Face', (x, y-10), 0.6, (0, 255, 0), 2)
+        # Parameters: (text, position, scale, color, thickness)
+
+        # STEP 6D-ii: MOUTH REGION FOR DRAWING SMILES
+        # Smiles were detected in the lower 2/3 of the face, so their rectangles are
+        # relative to that mouth area
+        mx, my, mw, mh = mouth_region((x, y, w, h), mouth_top)
+        
+        # STEP 6D-v: HANDLE SMILE DETECTION RESULTS
+        # Draw red rectangles around detected smile regions for visual feedback
+        for (sx, sy, sw, sh) in smiles:
+            overlay.rectangle((mx + sx, my + sy), (mx + sx + sw, my + sy + sh), (0, 0, 255), 2)
+
+        if smile_confirmed:
+            # SMILE DETECTED (and held for a few frames) - Process the positive detection
+            
+            # Display "SMILE DETECTED!" message on the video feed
+            overlay.text('SMILE DETECTED!', (x, y + h + 30), 0.8, (0, 0, 255), 2)
+            
+            # STEP 6D-v-a: CHECK TIMING CONSTRAINTS
+            # Prevent rapid-fire selfie captures by enforcing a minimum time interval
+            # for this face (faces without a track share one timer)
+            if track_id is None:
+                last_saved_time = state["last_saved_time"]
+            else:
+                last_saved_time = face_saved_times.get(track_id, 0)
+            time_since_last = current_time - last_saved_time
+            
+            if time_since_last > state["save_interval"]:
+                # ENOUGH TIME HAS PASSED - THIS FACE JOINS THE SELFIE OF THIS FRAME
+                to_capture.append(((x, y, w, h), smiles, track_id))
+                status = "Capturing"
+            else:
+                # NOT ENOUGH TIME HAS PASSED - SHOW COUNTDOWN
+                remaining_time = state["save_interval"] - time_since_last
+                
+                # Display countdown timer on screen
+                status = f'Wait {remaining_time:.1f}s'
+                overlay.text(status, (x, y + h + 60), 0.6, (255, 255, 0), 2)
+        elif len(smiles) > 0:
+            # SMILE SEEN BUT NOT STABLE YET - wait for the next frames to confirm it
+            overlay.text('Hold that smile...', (x, y + h + 30), 0.6, (0, 165, 255), 2)
+            status = "Smile not confirmed yet"
+        else:
+            # NO SMILE DETECTED - Encourage user to smile
+            overlay.text('Please smile!', (x, y + h + 30), 0.6, (255, 255, 0), 2)
+            status = "No smile"
+
+        # STEP 6D-vi: REPORT THE FACE (only shown with --log-level DEBUG; building the
+        # message is skipped entirely otherwise, so it costs nothing in the loop)
+        logger.debug("Face detected at (%d,%d), Smiles found: %d -> %s", x, y, len(smiles), status)
+
+    # STEP 6D-vii: CAPTURE AND SAVE ONE SELFIE FOR THE WHOLE FRAME
+    # However many faces smiled, the frame is saved once (or once per face crop)
+    if to_capture:
+        if capture_selfie(frame, to_capture, state, selfie_dir):
+            # Selfie saved successfully - restart the timer of every face in it
+            state["last_saved_time"] = current_time
+            for _, _, track_id in to_capture:
+                if track_id is not None:
+                    face_saved_times[track_id] = current_time
+            # Forget timers that ran out (their faces may be long gone)
+            for track_id, saved_time in list(face_saved_times.items()):
+                if current_time - saved_time > state["save_interval"]:
+                    del face_saved_times[track_id]
+            
+            # Show visual confirmation on screen
+            overlay.text('SELFIE SAVED!', (50, 50), 1.2, (0, 255, 0), 3)
+            logger.info("Selfie saved! (%d smiling face(s))", len(to_capture))
+            if state.get("metrics") is not None:
+                state["metrics"].count("captures")
+        else:
+            # Selfie saving failed
+            logger.warning("Failed to save selfie")
+
+    # STEP 6D-viii: DRAW THE ANNOTATIONS (only now, after any selfie was handed off)
+    if draw_now:
+        overlay.draw(frame)
+
+
+def capture_selfie(frame, faces, state, selfie_dir="selfies"):
+    """
+    Save the selfie for one frame in which one or more faces smiled.
+    
+    Args:
+        frame: The clean color video frame
+        faces: (face, smiles, track id) of every face that triggered this capture
+        state: The loop state (see draw_detections_and_capture() for the keys used).
+            With state["crop_faces"] each face is saved as its own cropped image
+        selfie_dir: Directory where selfies are saved
+    
+    Returns:
+        bool: True if the selfie (every crop) was handed off or saved
+    """
+    # The face with the most smiles (then the biggest one) describes the selfie in the index
+    face, smiles, _ = max(faces, key=lambda item: (len(item[1]), item[0][2] * item[0][3]))
+    metadata = {"face": face, "smiles": len(smiles)}
+    
+    # Burst mode saves the frames around this one instead
+    if state.get("burst") is not None:
+        return state["burst"].trigger(metadata)
+    
+    # Save the sharpest smiling frame of the last few, if they are kept. Not when
+    # cropping: the crop boxes below are this frame's faces, and the buffered frame
+    # may be several frames older, with the faces somewhere else
+    image, capture_time = frame, None
+    best_frames = state.get("best_frames")
+    best = best_frames.best() if best_frames is not None and not state.get("crop_faces") else None
+    if best is not None:
+        image, capture_time, metadata = best
+    
+    if state.get("crop_faces"):
+        # One image per smiling face, cut out with some margin around it
+        images = []
+        for face, smiles, _ in faces:
+            cx, cy, cw, ch = face_crop_region(face, image.shape)
+            images.append((image[cy:cy + ch, cx:cx + cw], {"face": face, "smiles": len(smiles)}))
+    else:
+        images = [(image, metadata)]
+    
+    # Hand the images to the background writer if there is one, otherwise save them right away
+    writer = state.get("writer")
+    success = True
+    for image, metadata in images:
+        if writer is not None:
+            success &= writer.submit(image, selfie_dir, metadata=metadata, capture_time=capture_time)
+        else:
+            success &= save_selfie(image, selfie_dir, capture_time, counter=state.get("counter"),
+                                   thumbnails=state.get("thumbnails"), index=state.get("index"),
+                                   output_format=state.get("output_format"), **metadata)
+    if success and best_frames is not None:
+        best_frames.clear()  # Never save the same frame twice
+    return success
+
+
+def draw_status_overlay(frame, selfie_dir="selfies", counter=None):
+    """
+    Draw the quit instructions and the live selfie counter onto the frame.
+    
+    Args:
+        frame: The color video frame to draw on
+        selfie_dir: Directory whose selfies are counted
+        counter: Optional SelfieCounter; without it the directory is listed every call
+    """
+    # STEP 6E: ADD USER INTERFACE ELEMENTS TO THE VIDEO FRAME
+    # Display instructions for quitting the application
+    cv2.putText(frame, "Press 'q' to quit", (10, frame.shape[0] - 20), 
+               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    
+    # Display count of saved selfies (live counter)
+    selfie_count = counter.count() if counter is not None else count_selfies(selfie_dir)
+    cv2.putText(frame, f"Selfies saved: {selfie_count}", (10, 30), 
+               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+
+
+def report_writer_results(writer):
+    """
+    Print a message for every background save that failed since the last call.
+    
+    Args:
+        writer: The SelfieWriter to collect results from
+    """
+    for capture_time, success in writer.poll_results():
+        if not success:
+            print("Failed to save selfie captured at " + time.strftime("%H:%M:%S", time.localtime(capture_time)))
+
+
+def save_selfie(image, directory="selfies", capture_time=None, counter=None, camera_id=None,
+                thumbnails=None, index=None, face=None, smiles=0, output_format=None):
+    """
+    Save the current video frame as a selfie image with timestamp.
+    
+    This function:
+    1. Creates a unique filename using the capture date and time (down to milliseconds)
+    2. Saves the image to the specified directory
+    3. Provides error handling and user feedback
+    
+    Args:
+        image: The video frame (numpy array) to save as an image
+        directory: Directory path where the selfie should be saved
+        capture_time: When the frame was captured (time.time() value); defaults to now.
+            The background writer passes this so names match the moment of the smile
+        counter: Optional SelfieCounter to update when a new selfie file is written
+        camera_id: Optional camera name added to the file name (selfie_<camera>_<time>.png)
+            when several cameras save selfies
+        thumbnails: Optional ThumbnailCache that gets the new selfie's thumbnail
+        index: Optional SelfieIndex that gets a row for the new selfie
+        face: Face box (x, y, w, h) that triggered the capture, stored in the index
+        smiles: Number of smiles found in that face, stored in the index
+        output_format: OutputFormat or format string such as "jpeg:90" (see
+            output_formats.py); defaults to PNG
+    
+    Returns:
+        bool: True if the selfie was saved successfully, False if there was an error
+    """
+    try:
+        # STEP 1: CREATE UNIQUE FILENAME WITH TIMESTAMP
+        # The capture time is formatted as YYYYMMDD-HHMMSS-mmm (milliseconds), so names
+        # sort in capture order and several selfies per second never overwrite each other
+        if capture_time is None:
+            capture_time = time.time()
+        output_format = parse_output_format(output_format)
+        file_path = reserve_selfie_path(directory, capture_time, camera_id, output_format.extension)
+        
+        # STEP 2: SAVE THE IMAGE FILE
+        # write() encodes the image array in the chosen format (cv2.imwrite for PNG,
+        # JPEG and WebP) and returns True if successful, False if failed
+        try:
+            success = output_format.write(file_path, image)
+        finally:
+            release_selfie_path(file_path)
+        
+        # STEP 3: PROVIDE USER FEEDBACK
+        if success:
+            if counter is not None:
+                counter.add(file_path)
+            if thumbnails is not None:
+                thumbnails.store_frame(file_path, image)
+            if index is not None:
+                index.add(file_path, capture_time, camera_id, face, smiles)
+            print(f"Selfie saved as {file_path}")
+            return True
+        else:
+            print("Failed to save image")
+            return False
+            
+    except Exception as e:
+        # Handle any file system or permission errors
+        print(f"Error saving selfie: {e}")
+        return False
+
+
+def reserve_selfie_path(directory, capture_time, camera_id=None, extension=".png"):
+    """
+    Pick a selfie file path that no existing file and no other save in progress uses.
+    
+    Names look like selfie_[<camera>_]YYYYMMDD-HHMMSS-mmm.png. If that name is taken
+    (two frames captured in the same millisecond), _1, _2, ... is added before the
+    extension. Call release_selfie_path() once the file is written.
+    
+    Args:
+        directory: Directory the selfie is saved in
+        capture_time: When the frame was captured (time.time() value)
+        camera_id: Optional camera name added to the file name
+        extension: File extension of the output format, e.g. ".png" or ".jpg"
+    
+    Returns:
+        str: The reserved file path
+    """
+    timestamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(capture_time))
+    timestamp += f"-{int(capture_time * 1000) % 1000:03d}"
+    if camera_id is not None:
+        timestamp = f"{camera_id}_{timestamp}"
+    
+    with _name_lock:
+        file_path = os.path.join(directory, f"selfie_{timestamp}{extension}")
+        number = 0
+        while file_path in _reserved_paths or os.path.exists(file_path):
+            number += 1
+            file_path = os.path.join(directory, f"selfie_{timestamp}_{number}{extension}")
+        _reserved_paths.add(file_path)
+    return file_path
+
+
+def release_selfie_path(file_path):
+    """Forget a path reserved by reserve_selfie_path() (the file exists now, or never will)."""
+    with _name_lock:
+        _reserved_paths.discard(file_path)
+
+
+def count_selfies(directory="selfies"):
+    """
+    Count the total number of selfie files in the specified directory.
+    
+    This lists the whole directory, so the live video loop uses a SelfieCounter
+    (selfie_counter.py) instead and only needs this for one-off counts.
+    
+    Args:
+        directory: The directory to search for selfie files
+    
+    Returns:
+        int: The number of selfie files found (files starting with 'selfie_' with an image extension)
+    """
+    try:
+        # Check if the directory exists
+        if not os.path.exists(directory):
+            return 0
+        
+        # List all files in the directory and filter for selfie files
+        # Use list comprehension to count files matching our naming pattern
+        return len([f for f in os.listdir(directory) if is_selfie_file(f)])
+    except:
+        # Return 0 if there's any error accessing the directory
+        return 0
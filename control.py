@@ -0,0 +1,177 @@
+"""
+Remote control for the headless detector (python test.py --headless).
+
+Without a window there are no 'q' and 's' keys, so the detector takes the same
+commands from signals and from a local control socket:
+
+    command   signal    effect
+    capture   SIGUSR1   save the next frame (like 's')
+    stop                pause auto-capture and detection (the camera keeps running)
+    start               resume auto-capture
+    toggle    SIGUSR2   pause or resume
+    status              reply with a JSON line (paused, fps, frames, selfies)
+    quit      SIGTERM   finish pending saves and exit (like 'q')
+
+The socket is a Unix socket path (e.g. /tmp/smile-selfie.sock) or a TCP port on
+127.0.0.1. Every command is one line of text and gets one line back. From a shell:
+
+    python control.py /tmp/smile-selfie.sock capture
+    echo status | nc -U /tmp/smile-selfie.sock
+    kill -USR1 <pid>
+"""
+# Import required libraries
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import sys
+import threading
+
+COMMANDS = ("capture", "stop", "start", "toggle", "status", "quit")
+
+# Signal name -> command (only the signals this platform has are used)
+SIGNAL_COMMANDS = {"SIGTERM": "quit", "SIGUSR1": "capture", "SIGUSR2": "toggle"}
+
+
+class _ControlTCPServer(socketserver.ThreadingTCPServer):
+    # Set on our own subclasses, not on the stdlib classes other code may use
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _ControlUnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+else:
+    _ControlUnixServer = None  # No Unix sockets on this platform (e.g. older Windows)
+
+
+def parse_address(text):
+    """
+    Turn a control address into a socket address.
+
+    Args:
+        text: A TCP port number ("9200") or a Unix socket path
+
+    Returns:
+        tuple or str: ("127.0.0.1", port) for a port, otherwise the path
+    """
+    text = str(text)
+    if text.isdigit():
+        return ("127.0.0.1", int(text))
+    return text
+
+
+class ControlChannel:
+    """
+    Collect control commands from signals and a control socket for the video loop.
+
+    Signal handlers and the socket thread only put commands in a queue. The loop
+    takes them with get_commands() once per frame, so all the real work (saving,
+    pausing, quitting) happens on the loop's own thread.
+    """
+
+    def __init__(self, address=None, status_function=None, use_signals=True):
+        """
+        Args:
+            address: Control socket address (see parse_address()), or None for signals only
+            status_function: Returns a dict for the "status" reply (called on the socket thread)
+            use_signals: Install the SIGTERM/SIGUSR1/SIGUSR2 handlers (main thread only)
+        """
+        self.status_function = status_function or dict
+        self._commands = queue.Queue()
+        self._previous_handlers = {}
+        self._server = None
+        self._socket_path = None
+
+        if use_signals:
+            for name, command in SIGNAL_COMMANDS.items():
+                if hasattr(signal, name):
+                    signum = getattr(signal, name)
+                    self._previous_handlers[signum] = signal.signal(
+                        signum, lambda signum, frame, command=command: self._commands.put(command))
+
+        if address is not None:
+            self._start_server(parse_address(address))
+
+    def get_commands(self):
+        """Return every command received since the last call (never blocks)."""
+        commands = []
+        while True:
+            try:
+                commands.append(self._commands.get_nowait())
+            except queue.Empty:
+                return commands
+
+    def close(self):
+        """Stop the socket server and restore the previous signal handlers."""
+        for signum, handler in self._previous_handlers.items():
+            signal.signal(signum, handler)
+        self._previous_handlers = {}
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._socket_path and os.path.exists(self._socket_path):
+            os.remove(self._socket_path)
+
+    def _start_server(self, address):
+        channel = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    command = line.decode("utf-8", "replace").strip().lower()
+                    if not command:
+                        continue
+                    self.wfile.write((channel._reply(command) + "\n").encode("utf-8"))
+
+        if isinstance(address, tuple):
+            server_class = _ControlTCPServer
+        else:
+            if _ControlUnixServer is None:
+                raise OSError("Unix sockets are not available here; use a port number instead")
+            server_class = _ControlUnixServer
+            if os.path.exists(address):
+                os.remove(address)  # Left over from a previous run that did not exit cleanly
+            self._socket_path = address
+        self._server = server_class(address, Handler)
+        threading.Thread(target=self._server.serve_forever, name="control-socket", daemon=True).start()
+
+    def _reply(self, command):
+        """Queue one command from the socket and return the reply line."""
+        if command not in COMMANDS:
+            return f"error: unknown command {command!r} (use {', '.join(COMMANDS)})"
+        if command == "status":
+            return json.dumps(self.status_function())
+        self._commands.put(command)
+        return "ok"
+
+
+def send_command(address, command, timeout=5.0):
+    """
+    Send one command to a running detector.
+
+    Args:
+        address: Its control socket address (see parse_address())
+        command: One of COMMANDS
+
+    Returns:
+        str: The reply line
+    """
+    address = parse_address(address)
+    family = socket.AF_INET if isinstance(address, tuple) else socket.AF_UNIX
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(address)
+        sock.sendall((command + "\n").encode("utf-8"))
+        return sock.makefile("r", encoding="utf-8").readline().strip()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(f"Usage: python control.py <socket path or port> <{'|'.join(COMMANDS)}>")
+        sys.exit(2)
+    print(send_command(sys.argv[1], sys.argv[2]))
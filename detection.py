@@ -0,0 +1,459 @@
+# Import required libraries
+import json  # Detection settings files
+import math  # Grid size for batched smile detection
+
+import cv2  # OpenCV for face/smile detection with Haar cascades
+import numpy as np
+
+from face_detectors import DEFAULT_BACKEND, find_model, load_face_detector
+
+# DETECTION SETTINGS
+# These are the same values test.main() has always used, kept in one place so every
+# mode (windowed loop, threaded pipeline, ...) detects faces and smiles identically.
+FACE_SCALE_FACTOR = 1.1     # How much the image size is reduced at each scale (1.1 = 10% reduction)
+FACE_MIN_NEIGHBORS = 5      # How many neighbors each candidate rectangle should retain
+FACE_MIN_SIZE = (100, 100)  # Minimum possible face size in pixels
+FACE_BACKEND = DEFAULT_BACKEND  # Face detector: "haar", "lbp" or "yunet" (see face_detectors.py)
+
+SMILE_SCALE_FACTOR = 1.8    # More aggressive scaling for smile detection
+SMILE_MIN_NEIGHBORS = 20    # Higher threshold for smile confidence (reduces false positives)
+SMILE_MIN_SIZE = (20, 20)   # Minimum smile size in pixels
+MOUTH_TOP = 1 / 3           # The mouth area starts this far down the face (fraction of its height)
+
+# Faces are large, so they can be found on a smaller copy of the frame. None keeps the
+# native resolution; e.g. 320 detects faces on a 320-pixel-wide copy.
+DETECTION_WIDTH = None
+
+FACE_CROP_MARGIN = 0.25     # Face crops include this much extra space (fraction of the face size)
+
+# Batched smile detection: with at least SMILE_BATCH_MIN_FACES faces, every mouth area
+# is resized to one common size and they are tiled into one image, SMILE_BATCH_GAP
+# pixels apart, so the smile cascade runs once per frame. Off (None) by default: one
+# small cascade call per face measured faster (benchmarks/bench_batched_smiles.py)
+SMILE_BATCH_MIN_FACES = None
+SMILE_BATCH_GAP = 16
+
+
+class DetectionConfig:
+    """
+    Detection settings for one camera, e.g. a kiosk whose faces always appear in the
+    same part of the frame at about the same size.
+
+    Defaults are the module constants above. A settings file (JSON) only needs the
+    values that differ; calibrate_detection.py writes one from a recorded session:
+
+        {"roi": [320, 80, 640, 560], "face_min_size": [160, 160], "face_max_size": [380, 380]}
+
+    Settings:
+        roi: (x, y, w, h) part of the frame to search for faces, or None for the whole frame
+        face_min_size, face_max_size: Smallest / largest face as (width, height);
+            face_max_size None = no limit
+        face_scale_factor, face_min_neighbors: Face detector settings (cascade backends)
+        smile_scale_factor, smile_min_neighbors, smile_min_size: Smile cascade settings
+        mouth_top: Where the mouth area starts, as a fraction of the face height
+    """
+
+    FIELDS = ("roi", "face_min_size", "face_max_size", "face_scale_factor", "face_min_neighbors",
+              "smile_scale_factor", "smile_min_neighbors", "smile_min_size", "mouth_top")
+    SIZE_FIELDS = ("roi", "face_min_size", "face_max_size", "smile_min_size")  # Stored as int tuples
+    OPTIONAL_FIELDS = ("roi", "face_max_size")  # May be None
+
+    def __init__(self, **settings):
+        """
+        Args:
+            **settings: Any of FIELDS (raises ValueError for unknown names and bad values)
+        """
+        self.roi = None
+        self.face_min_size = FACE_MIN_SIZE
+        self.face_max_size = None
+        self.face_scale_factor = FACE_SCALE_FACTOR
+        self.face_min_neighbors = FACE_MIN_NEIGHBORS
+        self.smile_scale_factor = SMILE_SCALE_FACTOR
+        self.smile_min_neighbors = SMILE_MIN_NEIGHBORS
+        self.smile_min_size = SMILE_MIN_SIZE
+        self.mouth_top = MOUTH_TOP
+        unknown = set(settings) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown detection setting(s): {', '.join(sorted(unknown))}")
+        for name, value in settings.items():
+            setattr(self, name, self._check(name, value))
+
+    @classmethod
+    def _check(cls, name, value):
+        """Return a setting in its stored form, or raise ValueError if it is not valid."""
+        if value is None:
+            if name in cls.OPTIONAL_FIELDS:
+                return None
+            raise ValueError(f"Detection setting {name} cannot be empty")
+        if name in cls.SIZE_FIELDS:
+            length = 4 if name == "roi" else 2
+            if (not isinstance(value, (list, tuple)) or len(value) != length
+                    or not all(_is_number(v) for v in value)):
+                raise ValueError(f"Detection setting {name} must be a list of {length} numbers, not {value!r}")
+            value = tuple(int(v) for v in value)
+            sizes = value[2:] if name == "roi" else value
+            if min(value) < 0 or min(sizes) <= 0:
+                raise ValueError(f"Detection setting {name} must have positive sizes, not {list(value)}")
+            return value
+        if not _is_number(value):
+            raise ValueError(f"Detection setting {name} must be a number, not {value!r}")
+        if name == "mouth_top" and not 0 <= value < 1:
+            raise ValueError(f"Detection setting mouth_top must be between 0 and 1, not {value}")
+        if name.endswith("scale_factor") and value <= 1:
+            raise ValueError(f"Detection setting {name} must be above 1, not {value}")
+        if name.endswith("min_neighbors"):
+            if value < 0:
+                raise ValueError(f"Detection setting {name} cannot be negative, not {value}")
+            return int(value)
+        return value
+
+    def copy(self, **changes):
+        """Return a copy with some settings changed, e.g. config.copy(roi=None)."""
+        settings = self.to_dict()
+        settings.update(changes)
+        return DetectionConfig(**settings)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def save(self, path):
+        """Write the settings to a JSON file."""
+        with open(path, "w") as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    def describe(self):
+        roi = "whole frame" if self.roi is None else "x={} y={} {}x{}".format(*self.roi)
+        max_size = "none" if self.face_max_size is None else "{}x{}".format(*self.face_max_size)
+        return (f"Detection: {roi}, faces {self.face_min_size[0]}x{self.face_min_size[1]} to {max_size}, "
+                f"mouth from {self.mouth_top:.2f} of the face")
+
+
+def _is_number(value):
+    """Return True for an int or float (JSON numbers), but not for True/False."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+DEFAULT_CONFIG = DetectionConfig()
+
+
+def load_detection_config(path):
+    """
+    Read detection settings from a JSON file.
+
+    Args:
+        path: The settings file (see DetectionConfig)
+
+    Returns:
+        DetectionConfig (raises OSError if the file cannot be read, ValueError if it is invalid)
+    """
+    with open(path) as file:
+        settings = json.load(file)
+    if not isinstance(settings, dict):
+        raise ValueError(f"{path} must contain a JSON object")
+    return DetectionConfig(**settings)
+
+
+# Cascades loaded by init_worker() inside a worker process (see batch_score.py and
+# multi_camera.py); each process needs its own copy
+_worker_cascades = (None, None)
+
+
+def load_cascades(face_backend=FACE_BACKEND, config=None):
+    """
+    Load the face detector and the smile Haar cascade.
+
+    The smile cascade is the haarcascade_smile.xml in the project folder (OpenCV's
+    own copy if it is missing); the face detector comes from face_detectors.py.
+
+    Args:
+        face_backend: Face detector to use: "haar", "lbp" or "yunet"
+        config: DetectionConfig with the face detector settings (None = defaults)
+
+    Returns:
+        tuple: (face_detector, smile_cascade), or (None, None) if either model failed to load
+    """
+    config = config or DEFAULT_CONFIG
+    face_detector = load_face_detector(face_backend, config.face_scale_factor, config.face_min_neighbors)
+    smile_path = find_model('haarcascade_smile.xml')
+    smile_cascade = cv2.CascadeClassifier(smile_path) if smile_path else None
+
+    # empty() returns True if the model failed to load
+    if face_detector is None or smile_cascade is None or smile_cascade.empty():
+        return None, None
+    return face_detector, smile_cascade
+
+
+def detection_scale(frame_width, detection_width=None):
+    """
+    Work out how much to shrink a frame before face detection.
+
+    Args:
+        frame_width: Width of the full-resolution frame in pixels
+        detection_width: Width to detect faces at, or None for native resolution
+
+    Returns:
+        float: Scale factor between 0 and 1 (1.0 = no downscaling)
+    """
+    if not detection_width or detection_width >= frame_width:
+        return 1.0
+    return detection_width / frame_width
+
+
+def detect_faces(face_detector, gray_frame, scale=1.0, config=None):
+    """
+    Find all faces in a grayscale frame.
+
+    With a scale below 1 the cascade runs on a shrunken copy of the frame, which
+    skips all the small window sizes that could never match a face of at least
+    FACE_MIN_SIZE. With a region of interest (config.roi) only that part of the
+    frame is searched, and a maximum face size skips the biggest window sizes too.
+    The boxes are mapped back to full-resolution frame coordinates.
+
+    Args:
+        face_detector: Loaded face detector from load_cascades()
+        gray_frame: Grayscale image to scan
+        scale: Downscale factor from detection_scale() (1.0 = native resolution)
+        config: DetectionConfig with the ROI and face sizes (None = defaults)
+
+    Returns:
+        list: Face rectangles as (x, y, w, h) tuples in full-resolution coordinates
+    """
+    config = config or DEFAULT_CONFIG
+    left = top = 0
+    if config.roi is not None:
+        # Only search the region of interest (clipped to the frame); a view, not a copy
+        x, y, w, h = config.roi
+        frame_height, frame_width = gray_frame.shape[:2]
+        left, top = min(max(0, x), frame_width), min(max(0, y), frame_height)
+        gray_frame = gray_frame[top:min(frame_height, y + h), left:min(frame_width, x + w)]
+        if gray_frame.size == 0:
+            return []
+
+    min_size, max_size = config.face_min_size, config.face_max_size
+    if scale >= 1.0:
+        small_frame = gray_frame
+    else:
+        height, width = gray_frame.shape[:2]
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        small_frame = cv2.resize(gray_frame, size, interpolation=cv2.INTER_AREA)
+        min_size = (max(1, int(min_size[0] * scale)), max(1, int(min_size[1] * scale)))
+        if max_size is not None:
+            max_size = (max(1, int(max_size[0] * scale)), max(1, int(max_size[1] * scale)))
+
+    faces = face_detector.detect(small_frame, min_size, max_size)
+    if scale < 1.0:
+        # Map the boxes back to the full-resolution frame
+        faces = [tuple(int(round(v / scale)) for v in face) for face in faces]
+    if left or top:
+        faces = [(x + left, y + top, w, h) for x, y, w, h in faces]
+    return faces
+
+
+def mouth_region(face, top_fraction=MOUTH_TOP):
+    """
+    Get the mouth area of a face: the lower 2/3 of the face rectangle by default.
+
+    Args:
+        face: Face rectangle as (x, y, w, h)
+        top_fraction: Where the mouth area starts, as a fraction of the face height
+
+    Returns:
+        tuple: (x, y, w, h) of the mouth region in frame coordinates
+    """
+    x, y, w, h = face
+    top = y + int(h * top_fraction)
+    return (x, top, w, y + h - top)
+
+
+def face_crop_region(face, frame_shape, margin=FACE_CROP_MARGIN):
+    """
+    Get a face rectangle grown by a margin on every side, clipped to the frame.
+
+    Args:
+        face: Face rectangle as (x, y, w, h)
+        frame_shape: Shape of the frame (height, width, ...)
+        margin: Extra space on each side as a fraction of the face size
+
+    Returns:
+        tuple: (x, y, w, h) of the crop in frame coordinates
+    """
+    x, y, w, h = face
+    frame_height, frame_width = frame_shape[:2]
+    left = max(0, int(x - w * margin))
+    top = max(0, int(y - h * margin))
+    right = min(frame_width, int(x + w * (1 + margin)))
+    bottom = min(frame_height, int(y + h * (1 + margin)))
+    return (left, top, right - left, bottom - top)
+
+
+def detect_smiles(smile_cascade, gray_frame, face, config=None):
+    """
+    Look for smiles inside the mouth area of one face.
+
+    Args:
+        smile_cascade: Loaded smile CascadeClassifier
+        gray_frame: Grayscale frame the face was found in
+        face: Face rectangle as (x, y, w, h)
+        config: DetectionConfig with the smile settings and mouth area (None = defaults)
+
+    Returns:
+        list: Smile rectangles as (x, y, w, h), relative to the mouth region
+    """
+    config = config or DEFAULT_CONFIG
+    mx, my, mw, mh = mouth_region(face, config.mouth_top)
+    roi_gray = gray_frame[my:my + mh, mx:mx + mw]
+    smiles = smile_cascade.detectMultiScale(
+        roi_gray,
+        scaleFactor=config.smile_scale_factor,
+        minNeighbors=config.smile_min_neighbors,
+        minSize=config.smile_min_size
+    )
+    return [tuple(int(v) for v in smile) for smile in smiles]
+
+
+def detect_smiles_batched(smile_cascade, gray_frame, faces, roi_size=None, config=None):
+    """
+    Look for smiles in the mouth areas of several faces with one cascade call.
+
+    Every mouth area is resized to roi_size and placed in a grid on one image, with
+    a blank gap between tiles. By default that is the size of the largest mouth
+    area: shrinking mouths loses smiles, because SMILE_MIN_NEIGHBORS needs enough
+    overlapping hits at full resolution. The cascade scans that image once, and each
+    smile is given back to the face whose tile contains it (smiles that cross a tile
+    edge are dropped) and scaled back to that face's mouth region.
+
+    Args:
+        smile_cascade: Loaded smile CascadeClassifier
+        gray_frame: Grayscale frame the faces were found in
+        faces: Face rectangles as (x, y, w, h)
+        roi_size: (width, height) every mouth area is resized to (None = the largest one)
+        config: DetectionConfig with the smile settings and mouth area (None = defaults)
+
+    Returns:
+        list: One list of smile rectangles per face, relative to its mouth region
+    """
+    if not faces:
+        return []
+    config = config or DEFAULT_CONFIG
+    mouths = [mouth_region(face, config.mouth_top) for face in faces]
+    if roi_size is None:
+        roi_size = (max(m[2] for m in mouths), max(m[3] for m in mouths))
+    tile_w, tile_h = roi_size
+    gap = SMILE_BATCH_GAP
+    columns = math.ceil(math.sqrt(len(faces)))
+    rows = math.ceil(len(faces) / columns)
+    canvas = np.zeros((gap + rows * (tile_h + gap), gap + columns * (tile_w + gap)), np.uint8)
+
+    # STEP 1: TILE THE NORMALIZED MOUTH AREAS
+    regions = []
+    for i, (mx, my, mw, mh) in enumerate(mouths):
+        row, column = divmod(i, columns)
+        left, top = gap + column * (tile_w + gap), gap + row * (tile_h + gap)
+        cv2.resize(gray_frame[my:my + mh, mx:mx + mw], roi_size,
+                   dst=canvas[top:top + tile_h, left:left + tile_w], interpolation=cv2.INTER_AREA)
+        regions.append((left, top, mw / tile_w, mh / tile_h))
+
+    # STEP 2: ONE CASCADE PASS OVER ALL OF THEM
+    found = smile_cascade.detectMultiScale(
+        canvas,
+        scaleFactor=config.smile_scale_factor,
+        minNeighbors=config.smile_min_neighbors,
+        minSize=config.smile_min_size,
+        maxSize=roi_size  # Bigger windows would only cover several tiles
+    )
+
+    # STEP 3: GIVE EACH SMILE BACK TO ITS FACE
+    smiles = [[] for _ in faces]
+    for sx, sy, sw, sh in found:
+        column = (sx - gap) // (tile_w + gap)
+        row = (sy - gap) // (tile_h + gap)
+        i = row * columns + column
+        if not 0 <= i < len(faces):
+            continue
+        left, top, scale_x, scale_y = regions[i]
+        lx, ly = sx - left, sy - top
+        if lx < 0 or ly < 0 or lx + sw > tile_w or ly + sh > tile_h:
+            continue  # Crosses the edge of its tile
+        smiles[i].append((int(lx * scale_x), int(ly * scale_y), int(sw * scale_x), int(sh * scale_y)))
+    return smiles
+
+
+def detect_smiles_for_faces(smile_cascade, gray_frame, faces, batch_min_faces=SMILE_BATCH_MIN_FACES,
+                            config=None):
+    """
+    Run smile detection for faces that were already found (e.g. by a FaceTracker).
+
+    Args:
+        smile_cascade: Loaded smile CascadeClassifier
+        gray_frame: Grayscale frame the faces were found in
+        faces: Face rectangles as (x, y, w, h)
+        batch_min_faces: With at least this many faces, search all mouth areas in one
+            batched cascade call (see detect_smiles_batched()); None = one call per face
+        config: DetectionConfig with the smile settings and mouth area (None = defaults)
+
+    Returns:
+        list: One (face, smiles) pair per face
+    """
+    if batch_min_faces is not None and len(faces) >= batch_min_faces:
+        return list(zip(faces, detect_smiles_batched(smile_cascade, gray_frame, faces, config=config)))
+    return [(face, detect_smiles(smile_cascade, gray_frame, face, config)) for face in faces]
+
+
+def detect_faces_and_smiles(face_detector, smile_cascade, gray_frame, detection_width=DETECTION_WIDTH,
+                            batch_min_faces=SMILE_BATCH_MIN_FACES, config=None):
+    """
+    Run the full face + smile detection pass on one grayscale frame.
+
+    Faces may be found on a downscaled copy (detection_width), but smiles are always
+    searched in the full-resolution mouth area so small smiles are not lost.
+
+    Args:
+        face_detector: Loaded face detector from load_cascades()
+        smile_cascade: Loaded smile CascadeClassifier
+        gray_frame: Grayscale image to scan
+        detection_width: Width to detect faces at, or None for native resolution
+        batch_min_faces: Batch the smile search from this many faces on (None = never)
+        config: DetectionConfig (ROI, sizes, cascade settings, mouth area); None = defaults
+
+    Returns:
+        list: One (face, smiles) pair per detected face
+    """
+    scale = detection_scale(gray_frame.shape[1], detection_width)
+    faces = detect_faces(face_detector, gray_frame, scale, config)
+    return detect_smiles_for_faces(smile_cascade, gray_frame, faces, batch_min_faces, config)
+
+
+def init_worker(face_backend=FACE_BACKEND):
+    """
+    Load one face detector/smile cascade pair for the current worker process.
+
+    Used as the initializer of a multiprocessing pool. Worker processes already run
+    in parallel, so OpenCV is told not to start its own threads in every one of them.
+
+    Args:
+        face_backend: Face detector to use (pass it through the pool's initargs)
+    """
+    global _worker_cascades
+    cv2.setNumThreads(1)
+    _worker_cascades = load_cascades(face_backend)
+
+
+def worker_cascades():
+    """Return the (face_detector, smile_cascade) pair loaded by init_worker()."""
+    return _worker_cascades
+
+
+def detect_in_worker(gray_frame):
+    """
+    Run detect_faces_and_smiles() with the worker process's own cascades.
+
+    Args:
+        gray_frame: Grayscale image to scan
+
+    Returns:
+        list: One (face, smiles) pair per detected face (empty if the cascades failed to load)
+    """
+    face_detector, smile_cascade = _worker_cascades
+    if face_detector is None:
+        return []
+    return detect_faces_and_smiles(face_detector, smile_cascade, gray_frame)
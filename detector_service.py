@@ -0,0 +1,195 @@
+# Import required libraries
+import functools  # partial() binds the selfie counter into save_selfie for the writer
+import os         # Directory handling
+import queue      # Status messages travel from the detection thread to the GUI
+import threading  # The detection loop runs on a background thread
+
+import cv2
+
+from detection import load_cascades, detect_faces_and_smiles
+from frame_sources import open_source
+from selfie_counter import SelfieCounter
+from selfie_writer import SelfieWriter
+from thumbnail_cache import ThumbnailCache, CACHE_DIR_NAME
+from selfie_index import open_selfie_index
+from best_frame import BestFrameBuffer
+from smile_filter import SmileConfirmer
+from capture import draw_detections_and_capture, draw_status_overlay, save_selfie
+
+
+class DetectorService:
+    """
+    The smile detector as a start/stop object that runs inside another program.
+
+    The main.py launcher used to start a fresh `python test.py` process on every
+    button press, paying for the Python + OpenCV import and cascade loading each time.
+    This service loads the cascades once and keeps them; start() only opens the camera.
+
+    The detection loop runs on a background thread. It never touches GUI widgets:
+    the GUI polls latest_frame() and poll_status() from its own event loop
+    (e.g. with Tk's root.after).
+    """
+
+    def __init__(self, selfie_dir="selfies", save_interval=2, output_format=None):
+        """
+        Args:
+            selfie_dir: Directory where selfies are saved
+            save_interval: Minimum seconds between automatic selfies
+            output_format: Selfie file format such as "png" or "jpeg:90" (see output_formats.py)
+        """
+        self.selfie_dir = selfie_dir
+        self.save_interval = save_interval
+        self.output_format = output_format
+        self.face_cascade = None
+        self.smile_cascade = None
+        self.counter = None
+        self.thumbnails = None
+        self.index = None
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._capture_requested = threading.Event()
+        self._frame_lock = threading.Lock()
+        self._latest_frame = None
+        self._status = queue.Queue()
+
+    def load(self):
+        """
+        Load the cascades (only the first time) and count existing selfies.
+
+        Returns:
+            bool: True if the detector is ready to start
+        """
+        if self.face_cascade is None:
+            self.face_cascade, self.smile_cascade = load_cascades()
+            if self.face_cascade is None:
+                self._report("Failed to load detection models", "red")
+                return False
+        os.makedirs(self.selfie_dir, exist_ok=True)
+        if self.counter is None:
+            self.counter = SelfieCounter([self.selfie_dir])
+        if self.thumbnails is None:
+            self.thumbnails = ThumbnailCache(os.path.join(self.selfie_dir, CACHE_DIR_NAME))
+        if self.index is None:
+            self.index = open_selfie_index(self.selfie_dir)
+        return True
+
+    def start(self, source=0, frame_size=(640, 480)):
+        """
+        Open the camera and start the detection loop on a background thread.
+
+        Args:
+            source: Camera index, video file, image folder or "synthetic" (see frame_sources.py)
+            frame_size: Camera resolution as (width, height)
+
+        Returns:
+            bool: True if the camera opened and the loop is running
+        """
+        if self.is_running():
+            return True
+        if not self.load():
+            return False
+
+        cap = open_source(source, frame_size)
+        if not cap.isOpened():
+            self._report("Unable to access the camera", "red")
+            return False
+
+        self._stop_event.clear()
+        self._capture_requested.clear()
+        self._thread = threading.Thread(target=self._run, args=(cap,), name="detector", daemon=True)
+        self._thread.start()
+        self._report("Camera running - smile!", "green")
+        return True
+
+    def stop(self, wait=True):
+        """
+        Stop the detection loop. Pending selfies are still written before it exits.
+
+        Args:
+            wait: Block until the loop has finished cleaning up
+        """
+        self._stop_event.set()
+        if wait and self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def is_running(self):
+        """Return True while the detection loop is active."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def capture_now(self):
+        """Ask the loop to save the next frame (the 's' key of test.main())."""
+        self._capture_requested.set()
+
+    def latest_frame(self):
+        """
+        Return the most recent annotated frame and clear it.
+
+        Returns:
+            The BGR frame (numpy array), or None if there is no new frame since the last call
+        """
+        with self._frame_lock:
+            frame, self._latest_frame = self._latest_frame, None
+        return frame
+
+    def poll_status(self):
+        """
+        Collect status messages produced since the last call.
+
+        Returns:
+            list: (text, color) tuples, oldest first
+        """
+        messages = []
+        while True:
+            try:
+                messages.append(self._status.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def _report(self, text, color):
+        self._status.put((text, color))
+
+    def _run(self, cap):
+        """Background detection loop: the same steps as test.main() without a window."""
+        state = {"last_saved_time": 0, "save_interval": self.save_interval,
+                 "counter": self.counter, "thumbnails": self.thumbnails, "index": self.index,
+                 "output_format": self.output_format}
+        writer = SelfieWriter(functools.partial(save_selfie, counter=self.counter,
+                                                thumbnails=self.thumbnails, index=self.index,
+                                                output_format=self.output_format))
+        state["writer"] = writer
+        best_frames = BestFrameBuffer()
+        state["best_frames"] = best_frames
+        state["smile_filter"] = SmileConfirmer()  # Only stable smiles trigger a capture
+        try:
+            while not self._stop_event.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    self._report("Camera stopped sending frames", "orange")
+                    break
+
+                # Manual capture saves the clean frame, before anything is drawn on it
+                if self._capture_requested.is_set():
+                    self._capture_requested.clear()
+                    writer.submit(frame, self.selfie_dir)
+
+                gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                detections = detect_faces_and_smiles(self.face_cascade, self.smile_cascade, gray_frame)
+                best_frames.push(frame, detections)  # Clean copy, before anything is drawn
+                draw_detections_and_capture(frame, detections, state, self.selfie_dir)
+                draw_status_overlay(frame, self.selfie_dir, self.counter)
+
+                for capture_time, success in writer.poll_results():
+                    if success:
+                        self._report(f"Selfie saved! ({self.counter.count()} photos)", "green")
+                    else:
+                        self._report("Failed to save selfie", "red")
+
+                with self._frame_lock:
+                    self._latest_frame = frame
+        except Exception as e:
+            print(f"Unexpected error: {e}")
+            self._report("Camera error - see console", "red")
+        finally:
+            writer.close()
+            cap.release()
+            self._report(f"Camera session completed - {self.counter.count()} photos saved", "green")
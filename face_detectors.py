@@ -0,0 +1,191 @@
+"""
+Face detector backends.
+
+Every backend has the same detect(gray_frame, min_size, max_size) method that returns face
+boxes as (x, y, w, h) tuples, so detection.detect_faces() and the FaceTracker work
+with any of them:
+
+    haar    Haar cascade (haarcascade_frontalface_default.xml), the original detector
+    lbp     LBP cascade (lbpcascade_frontalface_improved.xml): faster, a little less accurate
+    yunet   OpenCV's YuNet DNN face detector (face_detection_yunet_2023mar.onnx):
+            finds turned and partly hidden faces the cascades miss
+
+Model files are looked up in the project folder, then in its models/ folder, then
+(cascades only) in the folder of cascades that comes with OpenCV, wherever the
+program is started from; a path with a folder in it is used as given. The LBP
+cascade and the YuNet model do not come with opencv-python (or this project) and
+have to be downloaded by hand into models/:
+
+    lbpcascade_frontalface_improved.xml   from opencv/data/lbpcascades
+    face_detection_yunet_2023mar.onnx     from opencv_zoo/models/face_detection_yunet
+
+Usage in code:
+    face_detector = load_face_detector("lbp", scale_factor=1.1, min_neighbors=5)
+    faces = face_detector.detect(gray_frame, (100, 100), (400, 400))
+"""
+# Import required libraries
+import os
+
+import cv2
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIRS = [PROJECT_DIR, os.path.join(PROJECT_DIR, "models")]
+
+DEFAULT_BACKEND = "haar"
+YUNET_SCORE_THRESHOLD = 0.8  # Minimum YuNet confidence (0-1) to keep a face
+YUNET_NMS_THRESHOLD = 0.3    # Boxes overlapping more than this are merged
+
+# Backend name -> model file name
+BACKENDS = {
+    "haar": "haarcascade_frontalface_default.xml",
+    "lbp": "lbpcascade_frontalface_improved.xml",
+    "yunet": "face_detection_yunet_2023mar.onnx",
+}
+
+
+def find_model(file_name):
+    """
+    Find a model file in the project (or, for cascades, in OpenCV's own folder).
+
+    A bare file name is looked up in the project folders first, so a stray file with
+    the same name in the current folder cannot replace the project's model.
+
+    Args:
+        file_name: Name of the model file, or a path to it
+
+    Returns:
+        str: Path to the file, or None if it was not found
+    """
+    if os.path.dirname(file_name):
+        return file_name if os.path.isfile(file_name) else None
+    folders = MODEL_DIRS + [cv2.data.haarcascades]
+    for folder in folders:
+        path = os.path.join(folder, file_name)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+class CascadeFaceDetector:
+    """Face detector for a Haar or LBP cascade (cv2.CascadeClassifier)."""
+
+    def __init__(self, model_path, scale_factor, min_neighbors):
+        """
+        Args:
+            model_path: Path to the cascade XML file
+            scale_factor: How much the image size is reduced at each scale
+            min_neighbors: How many neighbors each candidate rectangle should retain
+        """
+        self.cascade = cv2.CascadeClassifier(model_path)
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+
+    def empty(self):
+        """Return True if the model failed to load (like CascadeClassifier.empty())."""
+        return self.cascade.empty()
+
+    def detect(self, gray_frame, min_size, max_size=None):
+        """
+        Find all faces in a grayscale image.
+
+        Args:
+            gray_frame: Grayscale image to scan
+            min_size: Smallest face to report as (width, height)
+            max_size: Largest face to look for as (width, height), or None for no limit
+
+        Returns:
+            list: Face rectangles as (x, y, w, h) tuples
+        """
+        faces = self.cascade.detectMultiScale(
+            gray_frame,
+            scaleFactor=self.scale_factor,
+            minNeighbors=self.min_neighbors,
+            minSize=min_size,
+            maxSize=max_size or (0, 0)  # (0, 0) = no limit
+        )
+        return [tuple(int(v) for v in face) for face in faces]
+
+
+class YuNetFaceDetector:
+    """Face detector for OpenCV's YuNet model (cv2.FaceDetectorYN, OpenCV 4.5.4 or newer)."""
+
+    def __init__(self, model_path, score_threshold=YUNET_SCORE_THRESHOLD, nms_threshold=YUNET_NMS_THRESHOLD):
+        """
+        Args:
+            model_path: Path to the YuNet .onnx file
+            score_threshold: Minimum confidence (0-1) to keep a face
+            nms_threshold: Boxes overlapping more than this are merged
+        """
+        self.detector = None
+        self._input_size = (320, 320)
+        self._color = None  # Reused BGR copy of the gray frame (YuNet needs 3 channels)
+        try:
+            self.detector = cv2.FaceDetectorYN.create(model_path, "", self._input_size,
+                                                      score_threshold, nms_threshold)
+        except (AttributeError, cv2.error) as e:
+            print(f"Error: Unable to load YuNet model {model_path}: {e}")
+
+    def empty(self):
+        """Return True if the model failed to load."""
+        return self.detector is None
+
+    def detect(self, gray_frame, min_size, max_size=None):
+        """
+        Find all faces in a grayscale image.
+
+        Args:
+            gray_frame: Grayscale image to scan
+            min_size: Smallest face to report as (width, height)
+            max_size: Largest face to report as (width, height), or None for no limit
+
+        Returns:
+            list: Face rectangles as (x, y, w, h) tuples
+        """
+        height, width = gray_frame.shape[:2]
+        if (width, height) != self._input_size:
+            self.detector.setInputSize((width, height))
+            self._input_size = (width, height)
+        if self._color is None or self._color.shape[:2] != (height, width):
+            self._color = cv2.cvtColor(gray_frame, cv2.COLOR_GRAY2BGR)
+        else:
+            cv2.cvtColor(gray_frame, cv2.COLOR_GRAY2BGR, dst=self._color)
+
+        _, found = self.detector.detect(self._color)
+        if found is None:
+            return []
+        faces = []
+        # Each row is x, y, w, h, five facial landmarks and the score
+        for x, y, w, h in found[:, :4]:
+            if w >= min_size[0] and h >= min_size[1] and (
+                    max_size is None or (w <= max_size[0] and h <= max_size[1])):
+                left, top = max(0, int(x)), max(0, int(y))
+                faces.append((left, top, int(x + w) - left, int(y + h) - top))
+        return faces
+
+
+def load_face_detector(backend=DEFAULT_BACKEND, scale_factor=1.1, min_neighbors=5):
+    """
+    Load the face detector of one backend.
+
+    Args:
+        backend: "haar", "lbp" or "yunet"
+        scale_factor: Cascade scale step (cascade backends only)
+        min_neighbors: Cascade neighbor threshold (cascade backends only)
+
+    Returns:
+        CascadeFaceDetector or YuNetFaceDetector, or None if the model could not be loaded
+    """
+    if backend not in BACKENDS:
+        print(f"Error: Unknown face detector {backend!r} (choose from {', '.join(BACKENDS)})")
+        return None
+    model_path = find_model(BACKENDS[backend])
+    if model_path is None:
+        print(f"Error: Model file {BACKENDS[backend]} for the {backend!r} face detector not found. "
+              f"Copy it into {MODEL_DIRS[-1]}")
+        return None
+
+    if backend == "yunet":
+        detector = YuNetFaceDetector(model_path)
+    else:
+        detector = CascadeFaceDetector(model_path, scale_factor, min_neighbors)
+    return None if detector.empty() else detector
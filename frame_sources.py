@@ -0,0 +1,156 @@
+# Import required libraries
+import os          # File and directory handling
+import cv2         # OpenCV for cameras, video files and image loading
+import numpy as np # Building synthetic frames
+
+# Every frame source behaves like cv2.VideoCapture: isOpened(), read() -> (ret, frame)
+# and release(). That way test.main(), the pipeline and the benchmark can run on a
+# camera, a recorded clip, a folder of images or generated frames without changes.
+# Like cv2.VideoCapture, read(image) fills a frame from a previous read() instead of
+# allocating a new one when the size matches.
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".webp")
+
+# The sample face that ships with the repo, used for synthetic frames
+SAMPLE_FACE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "face.jpg")
+
+
+class ImageDirectorySource:
+    """Read frames from the image files in a directory, in file name order."""
+
+    def __init__(self, directory, loop=False):
+        """
+        Args:
+            directory: Directory containing the images
+            loop: Start again from the first image after the last one
+        """
+        self.loop = loop
+        self.paths = sorted(os.path.join(directory, f) for f in os.listdir(directory)
+                            if f.lower().endswith(IMAGE_EXTENSIONS))
+        self._index = 0
+
+    def isOpened(self):
+        return len(self.paths) > 0
+
+    def read(self, image=None):
+        while self._index < len(self.paths):
+            frame = cv2.imread(self.paths[self._index])
+            self._index += 1
+            if self.loop and self._index == len(self.paths):
+                self._index = 0
+            if frame is not None:
+                if image is not None and image.shape == frame.shape:
+                    np.copyto(image, frame)
+                    return True, image
+                return True, frame
+            print(f"Skipping unreadable image {self.paths[self._index - 1]}")
+        return False, None
+
+    def release(self):
+        self.paths = []
+
+
+class SyntheticSource:
+    """
+    Generate frames with the sample face drifting slowly across a plain background.
+
+    Useful for benchmarks and CI boxes that have neither a camera nor a recorded clip.
+    """
+
+    def __init__(self, frame_count=300, frame_size=(640, 480), faces=1):
+        """
+        Args:
+            frame_count: Number of frames to produce before read() reports the end
+            frame_size: (width, height) of each frame
+            faces: How many copies of the face to place side by side
+        """
+        self.frame_count = frame_count
+        self.frame_size = frame_size
+        self.faces = faces
+        self._index = 0
+        width, height = frame_size
+        self._face = None
+        face = cv2.imread(SAMPLE_FACE_PATH)
+        if face is not None:
+            # The sample image is wider than the face itself, so each copy gets a
+            # tile wide enough to keep the face bigger than the detector's minimum
+            tile_width = max(8, int(width * 0.75) // max(1, faces))
+            tile_height = min(height - 4, int(face.shape[0] * tile_width / face.shape[1]))
+            self._face = cv2.resize(face, (tile_width, tile_height))
+
+    def isOpened(self):
+        return self._face is not None
+
+    def read(self, image=None):
+        if self._index >= self.frame_count or self._face is None:
+            return False, None
+        width, height = self.frame_size
+        tile_height, tile_width = self._face.shape[:2]
+        if image is not None and image.shape == (height, width, 3):
+            frame = image
+            frame.fill(90)
+        else:
+            frame = np.full((height, width, 3), 90, np.uint8)
+
+        # Gentle side-to-side and up-and-down motion
+        room_x = max(0, width - tile_width * self.faces)
+        room_y = max(0, height - tile_height)
+        left = int(room_x / 2 + room_x / 2 * np.sin(self._index / 25.0))
+        top = int(room_y / 2 + room_y / 2 * np.cos(self._index / 30.0))
+        for i in range(self.faces):
+            x = left + i * tile_width
+            frame[top:top + tile_height, x:x + tile_width] = self._face
+
+        self._index += 1
+        return True, frame
+
+    def release(self):
+        self._index = self.frame_count
+
+
+def is_live_source(source):
+    """
+    Return True if a source description (see open_source()) is a live camera or
+    network stream, whose frames go stale if they are not taken in time.
+    """
+    if isinstance(source, int):
+        return True
+    source = str(source)
+    return source.isdigit() or "://" in source
+
+
+def open_source(source=0, frame_size=(640, 480), fps=30):
+    """
+    Open a frame source from a simple description.
+
+    Args:
+        source: One of
+            - a camera index (int, or a string of digits such as "0")
+            - a video file path
+            - a directory of images
+            - "synthetic" or "synthetic:N" for N generated frames (default 300)
+        frame_size: (width, height) to request from a camera / to generate
+        fps: Frame rate to request from a camera
+
+    Returns:
+        An object with isOpened(), read() and release(), like cv2.VideoCapture
+    """
+    if isinstance(source, str) and source.isdigit():
+        source = int(source)
+
+    if isinstance(source, int):
+        # Live camera: configure it like test.main() always has
+        cap = cv2.VideoCapture(source)
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, frame_size[0])
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, frame_size[1])
+        cap.set(cv2.CAP_PROP_FPS, fps)
+        return cap
+
+    if source.startswith("synthetic"):
+        _, _, count = source.partition(":")
+        return SyntheticSource(int(count) if count else 300, frame_size)
+
+    if os.path.isdir(source):
+        return ImageDirectorySource(source)
+
+    return cv2.VideoCapture(source)
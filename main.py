@@ -2,8 +2,12 @@ import os
 from tkinter import *
 from tkinter import ttk, messagebox
 from PIL import Image, ImageTk
-import subprocess
 import threading
+import time
+from thumbnail_grid import ThumbnailGrid
+from thumbnail_cache import ThumbnailCache, CACHE_DIR_NAME
+from selfie_index import open_selfie_index, sync_selfie_index, IndexedPhotoList
+from selfie_counter import SelfieCounter
 
 
 class face_recognition_system:
@@ -17,12 +21,37 @@ class face_recognition_system:
         if not os.path.exists(self.selfie_dir):
             os.makedirs(self.selfie_dir)
 
+        # Every saved selfie is recorded in an SQLite index (selfies/index.db), so counting
+        # and listing photos never has to scan and sort the folders. The first time, the
+        # index is built from the selfies already on disk (both folders).
+        self.photo_folders = [self.selfie_dir, "."]
+        self.photo_index = open_selfie_index(self.selfie_dir, self.photo_folders[1:])
+
+        # Selfies added, copied or deleted outside the app are picked up too: the index
+        # is compared with the disk once in the background at startup, and again
+        # whenever the selfie counter sees the folders change (file system events with
+        # watchdog installed, otherwise one cheap modification-time check per folder)
+        self.selfie_counter = SelfieCounter(self.photo_folders)
+        self.selfie_counter.start_watching()
+        self.synced_count = None  # Selfie count at the last sync of the index
+        self.index_lock = threading.Lock()
+        threading.Thread(target=self.sync_photo_index, daemon=True).start()
+
+        # Thumbnails saved on disk (written at capture time), reused by the photo viewer
+        self.thumbnail_cache = ThumbnailCache(os.path.join(self.selfie_dir, CACHE_DIR_NAME))
+
         # Try to load images with error handling
         self.setup_images()
         
         # Setup the GUI elements
         self.setup_gui()
 
+        # Smile detector (detector_service.py), loaded in the background at startup
+        self.detector = None
+        self.detector_lock = threading.Lock()
+        self.camera_window = None
+        threading.Thread(target=self.preload_detector, daemon=True).start()
+
     def setup_images(self):
         """Setup all images with error handling for missing files."""
         try:
@@ -128,111 +157,208 @@ class face_recognition_system:
                     bg="lightcyan", fg="black", cursor="hand2")
         b2.place(x=775, y=100, width=120, height=120)
 
+        # Cameras Button (start/stop several cameras independently)
+        b3 = Button(bg_image, text="Cameras", command=self.manage_cameras,
+                    font=("times new roman", 15, "bold"),
+                    bg="lightyellow", fg="black", cursor="hand2")
+        b3.place(x=915, y=100, width=120, height=120)
+        self.camera_manager = None
+
         # Status label
         self.status_label = Label(bg_image, text="Ready to start", 
                                   font=("times new roman", 14), bg="white", fg="green")
         self.status_label.place(x=600, y=280, width=300, height=30)
 
     def run_test_script(self):
-        """Run the test.py script."""
+        """Start the smile detector and show its video in a window."""
         try:
-            # Get the directory where main.py is located
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            test_py_path = os.path.join(script_dir, "test.py")
-            
-            # Debug information
-            print("Script directory:", script_dir)
-            print("Looking for test.py at:", test_py_path)
-            
-            # Change to the correct directory
-            original_cwd = os.getcwd()
-            os.chdir(script_dir)
-            
-            # Check if test.py exists in the correct directory
-            if not os.path.exists("test.py"):
-                messagebox.showerror("Error", f"test.py file not found in {script_dir}!\n\nPlease make sure test.py is in the same directory as main.py")
-                print("Files in script directory:", os.listdir(script_dir))
-                os.chdir(original_cwd)  # Change back
+            # The detector runs inside this program: the models are loaded once and
+            # stay loaded, so pressing the button again starts the camera right away
+            if not self.load_detector():
+                messagebox.showerror("Error", "Failed to load the smile detection models.\n\nPlease check your OpenCV installation.")
+                self.status_label.config(text="Failed to start camera", fg="red")
                 return
-            
-            print("Found test.py, starting camera...")
+            if self.detector.is_running():
+                return  # Already running
+
             self.status_label.config(text="Starting camera...", fg="orange")
             self.root.update()
+            if not self.detector.start():
+                self.show_detector_status()
+                messagebox.showerror("Error", "Unable to access the camera. Please check your webcam.")
+                return
 
-            # Method 1: Try subprocess first
-            def run_with_subprocess():
-                try:
-                    result = subprocess.run(["python", "test.py"], 
-                                          capture_output=False,  # Let output show in console
-                                          cwd=script_dir)  # Use correct working directory
-                    
-                    # Change back to original directory
-                    os.chdir(original_cwd)
-                    
-                    if result.returncode == 0:
-                        self.status_label.config(text="Camera session completed", fg="green")
-                        self.root.after(1000, self.update_status)
-                    else:
-                        self.status_label.config(text="Camera session ended", fg="orange")
-                        
-                except Exception as e:
-                    print(f"Subprocess error: {e}")
-                    # Fallback to os.system
-                    run_with_os_system()
-
-            # Method 2: Fallback using os.system
-            def run_with_os_system():
-                try:
-                    print("Using os.system fallback...")
-                    # Make sure we're in the right directory
-                    os.chdir(script_dir)
-                    result = os.system('python test.py')
-                    
-                    # Change back to original directory
-                    os.chdir(original_cwd)
-                    
-                    if result == 0:
-                        self.status_label.config(text="Camera session completed", fg="green")
-                    else:
-                        self.status_label.config(text="Camera session ended", fg="orange")
-                    self.root.after(1000, self.update_status)
-                except Exception as e:
-                    print(f"OS system error: {e}")
-                    self.status_label.config(text="Failed to start camera", fg="red")
-                    os.chdir(original_cwd)  # Ensure we change back even on error
-
-            # Start in separate thread to prevent GUI freezing
-            script_thread = threading.Thread(target=run_with_subprocess, daemon=True)
-            script_thread.start()
+            # Window that shows the live video with Take Selfie / Stop buttons
+            # (replacing the 's' and 'q' keys of the OpenCV window)
+            self.camera_window = Toplevel(self.root)
+            self.camera_window.title("Smile Detection - Selfie Camera")
+            self.camera_window.configure(bg="black")
+            self.video_label = Label(self.camera_window, bg="black")
+            self.video_label.pack()
+            controls = Frame(self.camera_window, bg="black")
+            controls.pack(fill=X, pady=5)
+            Button(controls, text="Take Selfie", command=self.detector.capture_now,
+                   font=("times new roman", 12, "bold"), bg="lightgreen", cursor="hand2").pack(side=LEFT, padx=10)
+            Button(controls, text="Stop Camera", command=self.stop_camera,
+                   font=("times new roman", 12, "bold"), bg="mistyrose", cursor="hand2").pack(side=RIGHT, padx=10)
+            self.camera_window.protocol("WM_DELETE_WINDOW", self.stop_camera)
+
+            self.poll_detector()
 
         except Exception as e:
-            print(f"Error running test script: {e}")
+            print(f"Error starting camera: {e}")
             messagebox.showerror("Error", f"Failed to start camera:\n{str(e)}")
             self.status_label.config(text="Failed to start camera", fg="red")
 
+    def load_detector(self):
+        """Create the detector service and load its models (only the first time)."""
+        with self.detector_lock:
+            if self.detector is None:
+                # Imported here so the GUI window appears without waiting for OpenCV
+                from detector_service import DetectorService
+                self.detector = DetectorService(self.selfie_dir)
+            return self.detector.load()
+
+    def preload_detector(self):
+        """Load the detector in the background at startup so the first press is fast too."""
+        try:
+            self.load_detector()
+        except Exception as e:
+            print(f"Could not preload the detector: {e}")
+
+    def poll_detector(self):
+        """Show the newest video frame and status messages; runs on the Tk event loop."""
+        frame = self.detector.latest_frame()
+        if frame is not None and self.camera_window is not None:
+            # OpenCV frames are BGR, PIL expects RGB
+            photo = ImageTk.PhotoImage(Image.fromarray(frame[:, :, ::-1]))
+            self.video_label.config(image=photo)
+            self.video_label.image = photo  # Keep a reference
+
+        self.show_detector_status()
+
+        if self.detector.is_running():
+            self.root.after(15, self.poll_detector)
+        else:
+            # The camera stopped by itself (e.g. unplugged): close the video window
+            self.close_camera_window()
+            self.root.after(1000, self.update_status)
+
+    def show_detector_status(self):
+        """Copy the detector's latest status message into the status label."""
+        for text, color in self.detector.poll_status():
+            self.status_label.config(text=text, fg=color)
+
+    def stop_camera(self):
+        """Stop the detector (pending selfies are still written) and close the video window."""
+        if self.detector is not None:
+            self.detector.stop()
+            self.show_detector_status()
+        self.close_camera_window()
+        self.root.after(1000, self.update_status)
+
+    def close_camera_window(self):
+        """Close the video window if it is open."""
+        if self.camera_window is not None:
+            self.camera_window.destroy()
+            self.camera_window = None
+
     def update_status(self):
         """Update the status with current photo count."""
         photo_count = self.count_photos()
         self.status_label.config(text=f"Ready - {photo_count} photos saved", fg="green")
 
+    def sync_photo_index(self, force=True):
+        """
+        Update the selfie index from the files on disk.
+
+        Args:
+            force: Sync even if the selfie folders look unchanged since the last sync
+        """
+        with self.index_lock:
+            count = self.selfie_counter.refresh_if_changed()
+            if force or count != self.synced_count:
+                sync_selfie_index(self.photo_index, self.selfie_dir, self.photo_folders[1:])
+                self.synced_count = count
+
     def count_photos(self):
         """Count the number of selfies saved."""
         try:
-            # First check in selfies directory
-            if os.path.exists(self.selfie_dir):
-                selfie_photos = [f for f in os.listdir(self.selfie_dir) 
-                               if f.startswith("selfie_") and f.endswith(".png")]
-            else:
-                selfie_photos = []
-            
-            # Also check in current directory (in case test.py saves there)
-            current_dir_photos = [f for f in os.listdir('.') 
-                                if f.startswith("selfie_") and f.endswith(".png")]
-            
-            return len(selfie_photos) + len(current_dir_photos)
+            self.sync_photo_index(force=False)
+            # One COUNT(*) on the selfie index (covers every folder that saves selfies)
+            return self.photo_index.count()
         except:
             return 0
 
+    def manage_cameras(self):
+        """Open a window to add cameras and start/stop each one independently."""
+        try:
+            # Imported here so the GUI starts without loading OpenCV
+            from multi_camera import MultiCameraManager
+            if self.camera_manager is None:
+                self.camera_manager = MultiCameraManager(self.selfie_dir, thumbnails=self.thumbnail_cache)
+
+            window = Toplevel(self.root)
+            window.title("Cameras")
+            window.geometry("520x400")
+            window.configure(bg="white")
+
+            # Entry to add a camera: an index such as 0 or 1, or a video file
+            add_frame = Frame(window, bg="white")
+            add_frame.pack(fill=X, padx=10, pady=10)
+            Label(add_frame, text="Camera / video:", font=("times new roman", 12),
+                  bg="white").pack(side=LEFT)
+            source_entry = Entry(add_frame, font=("times new roman", 12), width=20)
+            source_entry.insert(0, str(len(self.camera_manager.streams)))
+            source_entry.pack(side=LEFT, padx=5)
+
+            rows_frame = Frame(window, bg="white")
+            rows_frame.pack(fill=BOTH, expand=True, padx=10)
+            status_labels = {}
+
+            def add_row(stream):
+                row = Frame(rows_frame, bg="white", relief=RIDGE, borderwidth=1)
+                row.pack(fill=X, pady=3)
+                status = Label(row, text=stream.describe(), font=("arial", 9), bg="white", anchor="w")
+                status.pack(side=LEFT, fill=X, expand=True, padx=5)
+                Button(row, text="Stop", cursor="hand2", bg="mistyrose",
+                       command=lambda: threading.Thread(target=stream.stop, daemon=True).start()
+                       ).pack(side=RIGHT, padx=2)
+                # Start may first clean up an ended stream (joining threads), so like
+                # Stop it runs off the Tk thread to keep the window responsive
+                Button(row, text="Start", cursor="hand2", bg="honeydew",
+                       command=lambda: threading.Thread(target=stream.start, daemon=True).start()
+                       ).pack(side=RIGHT, padx=2)
+                status_labels[stream.camera_id] = status
+
+            def add_camera():
+                source = source_entry.get().strip()
+                if not source:
+                    return
+                camera_id = f"cam{len(self.camera_manager.streams)}"
+                add_row(self.camera_manager.add_camera(camera_id, source))
+                source_entry.delete(0, END)
+                source_entry.insert(0, str(len(self.camera_manager.streams)))
+
+            Button(add_frame, text="Add camera", command=add_camera, cursor="hand2",
+                   bg="lightcyan").pack(side=LEFT, padx=5)
+
+            for stream in self.camera_manager.streams.values():
+                add_row(stream)
+
+            # Refresh each camera's status line once a second while the window is open
+            def refresh():
+                if not window.winfo_exists():
+                    return
+                for camera_id, label in status_labels.items():
+                    label.config(text=self.camera_manager.streams[camera_id].describe())
+                window.after(1000, refresh)
+
+            refresh()
+
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to open camera manager:\n{str(e)}")
+
     def view_photos(self):
         """Open a new window to display clicked photos."""
         try:
@@ -241,110 +367,81 @@ class face_recognition_system:
             viewer.geometry("1000x600")
             viewer.configure(bg="white")
 
-            # Add a canvas and scrollbar for scrolling
-            main_frame = Frame(viewer)
-            main_frame.pack(fill=BOTH, expand=True, padx=10, pady=10)
-
-            canvas = Canvas(main_frame, bg="white")
-            scrollbar = Scrollbar(main_frame, orient=VERTICAL, command=canvas.yview)
-            scrollable_frame = Frame(canvas, bg="white")
-
-            # Configure scrollable content
-            scrollable_frame.bind(
-                "<Configure>",
-                lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-            )
-
-            canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-            canvas.configure(yscrollcommand=scrollbar.set)
-
-            canvas.pack(side=LEFT, fill=BOTH, expand=True)
-            scrollbar.pack(side=RIGHT, fill=Y)
-
-            # Fetch all the saved photos from both directories
-            photos = []
-            
-            # Check selfies directory
-            if os.path.exists(self.selfie_dir):
-                selfie_photos = [(os.path.join(self.selfie_dir, f), f) for f in os.listdir(self.selfie_dir) 
-                               if f.startswith("selfie_") and f.endswith(".png")]
-                photos.extend(selfie_photos)
-            
-            # Check current directory
-            current_photos = [(f, f) for f in os.listdir('.') 
-                            if f.startswith("selfie_") and f.endswith(".png")]
-            photos.extend(current_photos)
+            # Photos come from the selfie index, newest first, one page at a time
+            self.sync_photo_index(force=False)
+            photos = IndexedPhotoList(self.photo_index)
 
             if not photos:
-                no_photos_label = Label(scrollable_frame, 
+                no_photos_label = Label(viewer, 
                                        text="No photos found!\n\nStart the camera and smile to capture selfies.", 
                                        font=("times new roman", 16), 
                                        bg="white", fg="gray")
                 no_photos_label.pack(pady=50)
                 return
 
-            # Sort photos by filename (newest first)
-            photos.sort(key=lambda x: x[1], reverse=True)
-
             # Title
-            title_label = Label(scrollable_frame, 
+            title_label = Label(viewer, 
                                text=f"Your Selfies ({len(photos)} photos)", 
                                font=("times new roman", 20, "bold"), 
                                bg="white", fg="darkblue")
             title_label.pack(pady=10)
 
-            # Create a frame for the photo grid
-            photo_grid = Frame(scrollable_frame, bg="white")
-            photo_grid.pack(pady=10)
+            # Date filter: only show selfies taken between two days (YYYY-MM-DD, both optional)
+            filter_frame = Frame(viewer, bg="white")
+            filter_frame.pack()
+            Label(filter_frame, text="From:", font=("times new roman", 12), bg="white").pack(side=LEFT)
+            from_entry = Entry(filter_frame, font=("times new roman", 12), width=12)
+            from_entry.pack(side=LEFT, padx=5)
+            Label(filter_frame, text="To:", font=("times new roman", 12), bg="white").pack(side=LEFT)
+            to_entry = Entry(filter_frame, font=("times new roman", 12), width=12)
+            to_entry.pack(side=LEFT, padx=5)
+
+            # Photo grid: only the visible rows are built, and thumbnails load in the
+            # background, so the window opens instantly even with thousands of selfies
+            main_frame = Frame(viewer, bg="white")
+            main_frame.pack(fill=BOTH, expand=True, padx=10, pady=10)
+            ThumbnailGrid(main_frame, photos, thumb_size=150, columns=6, disk_cache=self.thumbnail_cache)
 
-            # Display each photo in a grid
-            row = 0
-            column = 0
-            for i, (photo_path, photo_name) in enumerate(photos):
+            def apply_filter():
                 try:
-                    # Load and resize the photo
-                    image = Image.open(photo_path)
-                    image = image.resize((150, 150), Image.Resampling.LANCZOS)
-                    photo_image = ImageTk.PhotoImage(image)
-
-                    # Create a frame for each photo with label
-                    photo_frame = Frame(photo_grid, bg="white", relief=RAISED, borderwidth=2)
-                    photo_frame.grid(row=row, column=column, padx=10, pady=10)
-
-                    # Display the photo
-                    lbl = Label(photo_frame, image=photo_image)
-                    lbl.image = photo_image  # Keep a reference
-                    lbl.pack()
-
-                    # Add photo name/date
-                    name_label = Label(photo_frame, text=photo_name.replace("selfie_", "").replace(".png", ""),
-                                      font=("arial", 8), bg="white", fg="gray")
-                    name_label.pack()
-
-                    column += 1
-                    if column > 5:  # 6 photos per row
-                        column = 0
-                        row += 1
-
-                except Exception as e:
-                    print(f"Error loading photo {photo_name}: {e}")
-                    continue
-
-            # Add mouse wheel scrolling
-            def on_mousewheel(event):
-                canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-            
-            canvas.bind("<MouseWheel>", on_mousewheel)
+                    since = parse_day(from_entry.get())
+                    until = parse_day(to_entry.get())
+                except ValueError:
+                    messagebox.showerror("Error", "Dates must look like 2024-01-31", parent=viewer)
+                    return
+                if until is not None:
+                    until += 24 * 60 * 60  # Include the whole "To" day
+                filtered = IndexedPhotoList(self.photo_index, since, until)
+                title_label.config(text=f"Your Selfies ({len(filtered)} photos)")
+                # Replace the grid with one over the filtered photos
+                for widget in main_frame.winfo_children():
+                    widget.destroy()
+                ThumbnailGrid(main_frame, filtered, thumb_size=150, columns=6, disk_cache=self.thumbnail_cache)
+
+            Button(filter_frame, text="Apply", command=apply_filter, cursor="hand2",
+                   bg="lightcyan").pack(side=LEFT, padx=5)
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to open photo viewer:\n{str(e)}")
 
+def parse_day(text):
+    """Turn "YYYY-MM-DD" into the time.time() value of that day's midnight (None if empty)."""
+    text = text.strip()
+    if not text:
+        return None
+    return time.mktime(time.strptime(text, "%Y-%m-%d"))
+
 
 if __name__ == "__main__":
     try:
         root = Tk()
         obj = face_recognition_system(root)
         root.mainloop()
+        # Stop the detector and any cameras started from the Cameras window
+        if obj.detector is not None:
+            obj.detector.stop()
+        if obj.camera_manager is not None:
+            obj.camera_manager.stop_all()
     except Exception as e:
         print(f"Error starting application: {e}")
         messagebox.showerror("Startup Error", f"Failed to start application:\n{str(e)}")
\ No newline at end of file
@@ -0,0 +1,264 @@
+"""
+Live health metrics for the detection loop.
+
+LoopMetrics collects per-stage timings (a rolling window of the last few hundred
+frames per stage), a rolling frames-per-second figure and counters. Recording a
+timing is one lock and two array writes, cheap enough to do for every stage of
+every frame. The numbers can be read while the camera runs:
+
+    MetricsServer   http://127.0.0.1:PORT/metrics       Prometheus text format
+                    http://127.0.0.1:PORT/metrics.json  the same as JSON
+    MetricsDumper   writes the JSON to a file every few seconds
+
+Usage in code:
+    metrics = LoopMetrics()
+    start = time.perf_counter()
+    ret, frame = cap.read()
+    metrics.record("read", time.perf_counter() - start)
+    ...
+    metrics.frame_done()
+"""
+# Import required libraries
+import http.server  # Small built-in web server for the metrics endpoint
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+# Stages of one frame, in loop order ("save" runs on the selfie writer thread)
+STAGES = ("read", "gray", "faces", "smiles", "capture", "draw", "imshow", "save")
+METRICS_WINDOW = 300         # Samples kept per stage (and frames for the fps), ~10 s at 30 fps
+METRICS_HOST = "127.0.0.1"   # Only reachable from the kiosk itself
+METRICS_DUMP_INTERVAL = 5.0  # Seconds between JSON dumps
+METRIC_PREFIX = "smile_selfie"
+
+
+class LoopMetrics:
+    """Per-stage timers, rolling fps and counters for the detection loop (thread-safe)."""
+
+    def __init__(self, window=METRICS_WINDOW, stages=STAGES):
+        """
+        Args:
+            window: Number of recent samples kept per stage and for the fps
+            stages: Names of the timed stages
+        """
+        self.window = max(2, window)
+        self.stages = tuple(stages)
+        self._stage_index = {name: i for i, name in enumerate(self.stages)}
+        # All storage is allocated once; the newest sample overwrites the oldest
+        self._samples = np.zeros((len(self.stages), self.window))  # Milliseconds
+        self._counts = np.zeros(len(self.stages), np.int64)         # Samples ever recorded
+        self._totals = np.zeros(len(self.stages))                   # Seconds ever recorded
+        self._frame_times = np.zeros(self.window)                   # perf_counter() of recent frames
+        self.counters = {"frames": 0}
+        self._watched = {}  # Counter name -> function that returns its current value
+        self._gauges = {}   # Gauge name -> function that returns its current value
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        """Record how long one stage took for one frame."""
+        i = self._stage_index[stage]
+        with self._lock:
+            self._samples[i, self._counts[i] % self.window] = 1000.0 * seconds
+            self._counts[i] += 1
+            self._totals[i] += seconds
+
+    def frame_done(self):
+        """Mark the end of one frame (for the fps and the frame counter)."""
+        with self._lock:
+            self._frame_times[self.counters["frames"] % self.window] = time.perf_counter()
+            self.counters["frames"] += 1
+
+    def count(self, name, amount=1):
+        """Add to a counter (created on first use), e.g. count("selfies_saved")."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def watch(self, name, function):
+        """
+        Report a counter that another object already keeps, e.g. a queue's drop count.
+
+        Args:
+            name: Counter name
+            function: Called (on the reading thread) to get the current value
+        """
+        self._watched[name] = function
+
+    def watch_gauge(self, name, function):
+        """Report a value that can go up and down (e.g. a ratio), read the same way as watch()."""
+        self._gauges[name] = function
+
+    def timed(self, stage, function):
+        """
+        Wrap a function that returns True on success so every call is timed as a stage.
+
+        Successful calls are counted in "<stage>_ok", failed ones in "<stage>_failed".
+        Used for the selfie writer's save function, which runs on its own thread.
+        """
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            success = function(*args, **kwargs)
+            self.record(stage, time.perf_counter() - start)
+            self.count(f"{stage}_ok" if success else f"{stage}_failed")
+            return success
+        return wrapper
+
+    def fps(self):
+        """Frames per second over the last `window` frames (0.0 before two frames)."""
+        with self._lock:
+            return self._fps()
+
+    def _fps(self):
+        frames = min(self.counters["frames"], self.window)
+        if frames < 2:
+            return 0.0
+        newest = (self.counters["frames"] - 1) % self.window
+        oldest = (self.counters["frames"] - frames) % self.window
+        elapsed = self._frame_times[newest] - self._frame_times[oldest]
+        return (frames - 1) / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self):
+        """
+        Take a consistent copy of every metric.
+
+        Returns:
+            dict: "uptime_seconds", "fps", "counters", "gauges" and "stages" (per stage: count,
+                total seconds and p50/p95/p99/max milliseconds over the window)
+        """
+        with self._lock:
+            counts = self._counts.copy()
+            totals = self._totals.copy()
+            samples = self._samples.copy()
+            counters = dict(self.counters)
+            fps = self._fps()
+        for name, function in self._watched.items():
+            counters[name] = function()
+        gauges = {name: function() for name, function in self._gauges.items()}
+
+        stages = {}
+        for i, name in enumerate(self.stages):
+            recent = samples[i, :min(counts[i], self.window)]
+            stats = {"count": int(counts[i]), "total_seconds": float(totals[i])}
+            if recent.size:
+                p50, p95, p99 = np.percentile(recent, [50, 95, 99])
+                stats.update(p50_ms=float(p50), p95_ms=float(p95), p99_ms=float(p99), max_ms=float(recent.max()))
+            stages[name] = stats
+        return {"uptime_seconds": time.time() - self.started_at, "fps": fps,
+                "counters": counters, "gauges": gauges, "stages": stages}
+
+    def prometheus_text(self):
+        """Return the metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        p = METRIC_PREFIX
+        lines = [f"# TYPE {p}_uptime_seconds gauge", f"{p}_uptime_seconds {snapshot['uptime_seconds']:.3f}",
+                 f"# TYPE {p}_fps gauge", f"{p}_fps {snapshot['fps']:.3f}"]
+        for name, value in sorted(snapshot["counters"].items()):
+            lines += [f"# TYPE {p}_{name}_total counter", f"{p}_{name}_total {value}"]
+        for name, value in sorted(snapshot["gauges"].items()):
+            lines += [f"# TYPE {p}_{name} gauge", f"{p}_{name} {value}"]
+
+        lines.append(f"# TYPE {p}_stage_seconds summary")
+        for name, stats in snapshot["stages"].items():
+            for quantile in ("50", "95", "99"):
+                if f"p{quantile}_ms" in stats:
+                    lines.append(f'{p}_stage_seconds{{stage="{name}",quantile="0.{quantile}"}} '
+                                 f'{stats[f"p{quantile}_ms"] / 1000:.6f}')
+            lines.append(f'{p}_stage_seconds_sum{{stage="{name}"}} {stats["total_seconds"]:.6f}')
+            lines.append(f'{p}_stage_seconds_count{{stage="{name}"}} {stats["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def describe(self):
+        """Return a one-line summary: fps and the median time of every stage that ran."""
+        snapshot = self.snapshot()
+        parts = [f"{name} {stats['p50_ms']:.1f}" for name, stats in snapshot["stages"].items()
+                 if "p50_ms" in stats]
+        return f"Loop: {snapshot['fps']:.1f} fps; median ms: " + ", ".join(parts)
+
+
+class MetricsServer:
+    """Serve LoopMetrics over HTTP on a background thread (/metrics and /metrics.json)."""
+
+    def __init__(self, metrics, port, host=METRICS_HOST):
+        """
+        Args:
+            metrics: The LoopMetrics to serve
+            port: TCP port to listen on (0 picks a free one, see self.port)
+            host: Address to listen on (default: this computer only)
+        """
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, content_type = metrics.prometheus_text(), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body, content_type = json.dumps(metrics.snapshot()), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes every few seconds would otherwise flood the console
+
+        self._server = http.server.ThreadingHTTPServer((host, port), Handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class MetricsDumper:
+    """Write LoopMetrics.snapshot() to a JSON file every few seconds on a background thread."""
+
+    def __init__(self, metrics, path, interval=METRICS_DUMP_INTERVAL):
+        """
+        Args:
+            metrics: The LoopMetrics to dump
+            path: JSON file to (over)write; it is replaced in one step, never half-written
+            interval: Seconds between dumps
+
+        Raises:
+            OSError: If the file cannot be written (checked with a first dump right away)
+        """
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.dump()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-dumper", daemon=True)
+        self._thread.start()
+
+    def dump(self):
+        """Write the current metrics now."""
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump(self.metrics.snapshot(), file, indent=2)
+        os.replace(temp_path, self.path)
+
+    def close(self):
+        """Stop the thread after one last dump."""
+        self._stop_event.set()
+        self._thread.join(timeout=2.0)
+        self._safe_dump()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self._safe_dump()
+
+    def _safe_dump(self):
+        """Dump, reporting a failure instead of raising it (e.g. the disk filled up)."""
+        try:
+            self.dump()
+        except OSError as e:
+            print(f"Error writing metrics to {self.path}: {e}")
@@ -0,0 +1,139 @@
+# Import required libraries
+import time  # Measures how long the gate itself takes
+
+import cv2
+import numpy as np
+
+MOTION_SIZE = (80, 60)      # Frames are shrunk to this size (width, height) before comparing
+MOTION_THRESHOLD = 20       # A small pixel counts as changed if it differs by more than this (0-255)
+MOTION_MIN_FRACTION = 0.005  # Motion = at least this share of the small pixels changed
+IDLE_AFTER = 30             # Static frames without a face before the detection rate is lowered
+MAX_IDLE_INTERVAL = 32      # While idle, detection still runs at least every this many frames
+
+
+class MotionGate:
+    """
+    Skip face detection while the scene is empty and nothing moves.
+
+    Each frame is shrunk to a tiny copy and compared with the previous one, which
+    costs a small fraction of a millisecond. While there is motion, or a face was
+    found recently, every frame is detected as usual. After IDLE_AFTER static frames
+    without a face the gate goes idle: detection only runs every 2nd frame, then
+    every 4th, 8th... up to every MAX_IDLE_INTERVAL frames, so a person who stands
+    very still is still found. Any motion switches back to every frame at once.
+
+    All buffers are allocated once (on the first frame) and reused.
+    """
+
+    def __init__(self, threshold=MOTION_THRESHOLD, min_fraction=MOTION_MIN_FRACTION, idle_after=IDLE_AFTER,
+                 max_interval=MAX_IDLE_INTERVAL):
+        """
+        Args:
+            threshold: Pixel difference (0-255) that counts as a change
+            min_fraction: Share of changed pixels that counts as motion
+            idle_after: Static frames without a face before going idle
+            max_interval: Longest gap between detections while idle (in frames)
+        """
+        self.threshold = threshold
+        self.min_changed = max(1, int(min_fraction * MOTION_SIZE[0] * MOTION_SIZE[1]))
+        self.idle_after = max(1, idle_after)
+        self.max_interval = max(1, max_interval)
+        self._previous = np.zeros((MOTION_SIZE[1], MOTION_SIZE[0]), np.uint8)
+        self._current = np.empty_like(self._previous)
+        self._mask = np.empty_like(self._previous)
+        self._first = True
+        self._static_frames = 0    # Frames since the last motion or face
+        self._interval = 1         # Detect every N frames (1 = every frame)
+        self._since_detection = 0  # Frames since detection last ran
+
+        self.frames = 0            # Frames seen
+        self.idle_frames = 0       # Frames seen while idle
+        self.detected = 0          # Frames that ran detection
+        self.skipped = 0           # Frames where detection was skipped
+        self.gate_seconds = 0.0    # Time spent in the gate itself
+        self.detect_seconds = 0.0  # Time spent in detection (reported through detection_done())
+        self._idle_detected = 0    # Detections run while idle, and their time: an empty scene
+        self._idle_seconds = 0.0   # is cheaper to scan, so these estimate the skipped work
+
+    def should_detect(self, gray_frame):
+        """
+        Check the next frame for motion and decide whether to run detection on it.
+
+        Args:
+            gray_frame: The grayscale frame (any size)
+
+        Returns:
+            bool: True to run face/smile detection on this frame, False to skip it
+        """
+        start = time.perf_counter()
+        self.frames += 1
+        cv2.resize(gray_frame, MOTION_SIZE, dst=self._current, interpolation=cv2.INTER_AREA)
+        if self._first:
+            motion, self._first = True, False
+        else:
+            cv2.absdiff(self._current, self._previous, dst=self._mask)
+            cv2.threshold(self._mask, self.threshold, 255, cv2.THRESH_BINARY, dst=self._mask)
+            motion = cv2.countNonZero(self._mask) >= self.min_changed
+        # Swap buffers instead of copying: this frame is the next one's "previous"
+        self._previous, self._current = self._current, self._previous
+
+        if motion:
+            # Something moved: back to full rate straight away
+            self._static_frames = 0
+            self._interval = 1
+        else:
+            self._static_frames += 1
+        idle = self._static_frames >= self.idle_after
+        self.idle_frames += idle
+
+        self._since_detection += 1
+        run = not idle or self._since_detection >= self._interval
+        if run:
+            self._since_detection = 0
+            if idle:
+                # Still nothing: wait twice as long before the next idle check
+                self._interval = min(self.max_interval, max(2, self._interval * 2))
+        else:
+            self.skipped += 1
+        self.gate_seconds += time.perf_counter() - start
+        return run
+
+    def detection_done(self, face_count, seconds=0.0):
+        """
+        Report the result of a detection the gate allowed.
+
+        Args:
+            face_count: Number of faces found (any face keeps the gate active)
+            seconds: How long the detection took, for the CPU savings estimate
+        """
+        self.detected += 1
+        self.detect_seconds += seconds
+        if self.is_idle():
+            self._idle_detected += 1
+            self._idle_seconds += seconds
+        if face_count:
+            self._static_frames = 0
+            self._interval = 1
+
+    def is_idle(self):
+        """Return True while the detection rate is lowered."""
+        return self._static_frames >= self.idle_after
+
+    def idle_ratio(self):
+        """Share of frames seen while idle (0.0-1.0)."""
+        return self.idle_frames / self.frames if self.frames else 0.0
+
+    def saved_seconds(self):
+        """Estimated detection time saved: skipped frames times the average idle detection time."""
+        if self._idle_detected:
+            return self.skipped * self._idle_seconds / self._idle_detected
+        if self.detected:
+            return self.skipped * self.detect_seconds / self.detected
+        return 0.0
+
+    def describe(self):
+        """Return a one-line summary of the gate counters."""
+        active = self.frames - self.idle_frames
+        return (f"Motion gate: {active} active / {self.idle_frames} idle frames "
+                f"({100 * self.idle_ratio():.0f}% idle), detection skipped on {self.skipped} frames, "
+                f"~{self.saved_seconds():.1f}s of detection saved for {self.gate_seconds:.2f}s of gating")
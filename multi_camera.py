@@ -0,0 +1,262 @@
+"""
+Drive several cameras from one process.
+
+Each camera stream has its own capture thread and its own detection worker process
+(so OpenCV work that holds the GIL in one stream cannot slow down the others). Selfies
+are saved to a per-camera folder, selfies/<camera id>/, with the camera id in the file
+name. Streams can be started and stopped independently, e.g. from the main.py launcher.
+
+Usage:
+    python multi_camera.py 0 1 entrance.mp4
+"""
+# Import required libraries
+import concurrent.futures  # One detection worker process per stream
+import functools
+import os
+import sys
+import threading
+import time
+
+import cv2
+
+from detection import init_worker, detect_in_worker
+from frame_sources import is_live_source, open_source
+from pipeline import END_OF_STREAM, FrameQueue
+from selfie_writer import SelfieWriter
+from thumbnail_cache import ThumbnailCache, CACHE_DIR_NAME
+from selfie_index import SelfieIndex, default_index_path
+from smile_filter import SmileConfirmer
+from capture import save_selfie
+
+
+class CameraStream:
+    """One camera: capture thread, detection worker process and background selfie writer."""
+
+    def __init__(self, camera_id, source, selfie_root="selfies", save_interval=2, frame_size=(640, 480),
+                 thumbnails=None):
+        """
+        Args:
+            camera_id: Short name used for the folder and file names (e.g. "cam0")
+            source: Camera index, video file, image folder or "synthetic" (see frame_sources.py)
+            selfie_root: Folder that holds one sub-folder per camera
+            save_interval: Minimum seconds between selfies from this camera
+            frame_size: Camera resolution as (width, height)
+            thumbnails: ThumbnailCache to share with other streams; by default the
+                stream opens the one in selfie_root that the viewer (main.py) reads
+        """
+        self.camera_id = str(camera_id)
+        self.source = source
+        self.selfie_root = selfie_root
+        self.selfie_dir = os.path.join(selfie_root, self.camera_id)
+        self.save_interval = save_interval
+        self.frame_size = frame_size
+        self.thumbnails = thumbnails
+        self.status = "stopped"
+        self.frames = 0   # Frames that went through detection
+        self.smiles = 0   # Frames with a confirmed (stable) smile
+        self.saved = 0    # Selfies handed to the writer
+        self._stop_event = threading.Event()
+        self._threads = []
+        self._frame_queue = None
+        self._cap = None
+        self._executor = None
+        self._writer = None
+        self._index = None
+        self._last_saved_time = 0
+        self._smile_filter = SmileConfirmer()  # Only stable smiles trigger a capture
+
+    def start(self):
+        """
+        Open the camera and start capturing and detecting.
+
+        Returns:
+            bool: True if the stream is running, False if the camera could not be opened
+        """
+        if self.is_running():
+            return True
+        # A stream that ended or failed on its own still holds its camera, worker and writer
+        self.stop()
+        self._cap = open_source(self.source, self.frame_size)
+        if not self._cap.isOpened():
+            self._cap.release()
+            self._cap = None
+            self.status = "camera unavailable"
+            print(f"[{self.camera_id}] Error: Unable to open {self.source!r}")
+            return False
+
+        os.makedirs(self.selfie_dir, exist_ok=True)
+        self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=1, initializer=init_worker)
+        if self.thumbnails is None:
+            self.thumbnails = ThumbnailCache(os.path.join(self.selfie_root, CACHE_DIR_NAME))
+        # All cameras share the index of the selfies root folder; the camera id is a column
+        self._index = SelfieIndex(default_index_path(self.selfie_root))
+        self._writer = SelfieWriter(functools.partial(save_selfie, camera_id=self.camera_id,
+                                                      thumbnails=self.thumbnails, index=self._index))
+        self._stop_event.clear()
+        # A camera's detection always gets the newest frame; a video file or image
+        # folder waits for detection instead, so no frame is skipped
+        frame_queue = FrameQueue(self.camera_id, maxsize=1, drop_oldest=is_live_source(self.source))
+        self._frame_queue = frame_queue
+        self._threads = [
+            threading.Thread(target=self._capture_loop, args=(frame_queue,),
+                             name=f"{self.camera_id}-capture", daemon=True),
+            threading.Thread(target=self._detect_loop, args=(frame_queue,),
+                             name=f"{self.camera_id}-detect", daemon=True),
+        ]
+        # Set before the threads start, so a source that ends at once can report "ended"
+        self.status = "running"
+        for thread in self._threads:
+            thread.start()
+        print(f"[{self.camera_id}] Started ({self.source})")
+        return True
+
+    def stop(self):
+        """Stop the stream, flush its pending selfies and release the camera."""
+        self._stop_event.set()
+        if self._frame_queue is not None:
+            self._frame_queue.close()  # Release a capture thread waiting for room
+            self._frame_queue = None
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=2.0)
+        self._threads = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._writer is not None:
+            self._writer.close()  # Write every queued selfie before returning
+            self._writer = None
+        if self._index is not None:
+            self._index.close()  # After the writer, which adds the last selfies to it
+            self._index = None
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+        if self.status == "running":
+            self.status = "stopped"
+
+    def is_running(self):
+        """Return True while the capture and detection threads are active."""
+        return any(thread.is_alive() for thread in self._threads)
+
+    def describe(self):
+        """Return a one-line status summary of this stream."""
+        return (f"{self.camera_id}: {self.status}, {self.frames} frames, "
+                f"{self.smiles} smiling, {self.saved} selfies")
+
+    def _capture_loop(self, frame_queue):
+        while not self._stop_event.is_set():
+            ret, frame = self._cap.read()
+            if not ret:
+                # Detection finishes the frame still queued, then marks the stream ended
+                frame_queue.put(END_OF_STREAM)
+                break
+            frame_queue.put(frame)
+
+    def _detect_loop(self, frame_queue):
+        while not self._stop_event.is_set():
+            frame = frame_queue.get()
+            if frame is None:
+                continue
+            if frame is END_OF_STREAM:
+                self.status = "ended"
+                print(f"[{self.camera_id}] No more frames from {self.source!r}")
+                self._stop_event.set()
+                break
+            gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            try:
+                # Detection runs in this stream's own worker process
+                detections = self._executor.submit(detect_in_worker, gray_frame).result()
+            except Exception as e:
+                print(f"[{self.camera_id}] Detection error: {e}")
+                self.status = "detection failed"
+                self._stop_event.set()
+                frame_queue.close()  # Release the capture thread if it waits for room
+                break
+            self.frames += 1
+
+            confirmed = self._smile_filter.update(detections)
+            smiling = [(face, smiles) for (face, smiles), ok in zip(detections, confirmed) if ok]
+            if smiling:
+                self.smiles += 1
+                current_time = time.time()
+                if current_time - self._last_saved_time > self.save_interval:
+                    face, smiles = smiling[0]
+                    metadata = {"face": face, "smiles": len(smiles)}
+                    if self._writer.submit(frame, self.selfie_dir, metadata=metadata):
+                        self._last_saved_time = current_time
+                        self.saved += 1
+
+
+class MultiCameraManager:
+    """Keep track of several CameraStreams and start/stop them by camera id."""
+
+    def __init__(self, selfie_root="selfies", save_interval=2, thumbnails=None):
+        """
+        Args:
+            selfie_root: Folder that holds one sub-folder per camera
+            save_interval: Minimum seconds between selfies from each camera
+            thumbnails: ThumbnailCache of selfie_root to share (e.g. the viewer's);
+                opened on the first add_camera() if not given
+        """
+        self.selfie_root = selfie_root
+        self.save_interval = save_interval
+        self.streams = {}  # camera id -> CameraStream
+        self.thumbnails = thumbnails  # One thumbnail cache for all cameras, like the selfie index
+
+    def add_camera(self, camera_id, source):
+        """
+        Register a camera without starting it.
+
+        Returns:
+            CameraStream: The new (or already registered) stream
+        """
+        camera_id = str(camera_id)
+        if camera_id not in self.streams:
+            if self.thumbnails is None:
+                self.thumbnails = ThumbnailCache(os.path.join(self.selfie_root, CACHE_DIR_NAME))
+            self.streams[camera_id] = CameraStream(camera_id, source, self.selfie_root, self.save_interval,
+                                                   thumbnails=self.thumbnails)
+        return self.streams[camera_id]
+
+    def start(self, camera_id):
+        """Start one camera. Returns True if it is running."""
+        return self.streams[str(camera_id)].start()
+
+    def stop(self, camera_id):
+        """Stop one camera."""
+        self.streams[str(camera_id)].stop()
+
+    def stop_all(self):
+        """Stop every camera."""
+        for stream in self.streams.values():
+            stream.stop()
+
+    def any_running(self):
+        """Return True if at least one camera is running."""
+        return any(stream.is_running() for stream in self.streams.values())
+
+
+def main(sources):
+    """Run one stream per source until Ctrl+C or until every source has ended."""
+    manager = MultiCameraManager()
+    for i, source in enumerate(sources):
+        manager.add_camera(f"cam{i}", source)
+        manager.start(f"cam{i}")
+
+    try:
+        while manager.any_running():
+            time.sleep(5)
+            for stream in manager.streams.values():
+                print(stream.describe())
+    except KeyboardInterrupt:
+        print("\nInterrupted by user")
+    finally:
+        print("Stopping cameras...")
+        manager.stop_all()
+        for stream in manager.streams.values():
+            print(stream.describe())
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or ["0"])
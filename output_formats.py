@@ -0,0 +1,99 @@
+"""
+How selfies are written to disk.
+
+A format is given as "name" or "name:level", for example:
+
+    png        PNG with OpenCV's default compression (lossless)
+    png:0      PNG without compression (fastest PNG, biggest files); up to png:9 (smallest, slowest)
+    jpeg:90    JPEG with quality 90 (0-100); "jpg" works too
+    webp:80    WebP with quality 80 (1-100; 101 is lossless)
+    npy        Raw NumPy array (.npy): no encoding at all, for processing pipelines
+
+Usage in code:
+    output_format = parse_output_format("jpeg:90")
+    output_format.write("selfies/selfie_20240131-154500-250.jpg", frame)
+"""
+# Import required libraries
+import cv2
+import numpy as np
+
+DEFAULT_FORMAT = "png"
+
+# Format name -> (file extension, OpenCV quality flag, default level, allowed levels)
+# A default level of None keeps OpenCV's own default; allowed levels of None means the
+# format takes no level
+FORMATS = {
+    "png": (".png", cv2.IMWRITE_PNG_COMPRESSION, None, (0, 9)),
+    "jpeg": (".jpg", cv2.IMWRITE_JPEG_QUALITY, 95, (0, 100)),
+    "webp": (".webp", cv2.IMWRITE_WEBP_QUALITY, 90, (1, 101)),
+    "npy": (".npy", None, None, None),
+}
+
+
+class OutputFormat:
+    """One output format (PNG, JPEG, WebP or raw .npy) with its compression level or quality."""
+
+    def __init__(self, name=DEFAULT_FORMAT, level=None):
+        """
+        Args:
+            name: "png", "jpeg" (or "jpg"), "webp" or "npy"
+            level: PNG compression level (0-9), JPEG quality (0-100) or WebP quality
+                (1-101); None uses the default. Raises ValueError outside the range
+        """
+        name = name.lower()
+        if name == "jpg":
+            name = "jpeg"
+        if name not in FORMATS:
+            raise ValueError(f"Unknown output format {name!r} (choose from {', '.join(FORMATS)})")
+        self.name = name
+        self.extension, flag, default_level, levels = FORMATS[name]
+        if level is not None:
+            # OpenCV would clamp a bad level with only a warning, so reject it here
+            if levels is None:
+                raise ValueError(f"The {name} format does not take a level")
+            level = int(level)
+            if not levels[0] <= level <= levels[1]:
+                raise ValueError(f"{name} level must be between {levels[0]} and {levels[1]}, not {level}")
+        self.level = default_level if level is None else level
+        # Parameters for cv2.imwrite, worked out once instead of for every selfie
+        self.params = [flag, self.level] if flag is not None and self.level is not None else []
+
+    def write(self, path, image):
+        """
+        Encode and save one image.
+
+        Args:
+            path: File path (should end with self.extension)
+            image: The BGR frame (numpy array)
+
+        Returns:
+            bool: True if the file was written
+        """
+        if self.name == "npy":
+            # np.save would add ".npy" to a name without it; open the file ourselves
+            with open(path, "wb") as file:
+                np.save(file, image)
+            return True
+        return cv2.imwrite(path, image, self.params)
+
+    def __str__(self):
+        return self.name if self.level is None else f"{self.name}:{self.level}"
+
+
+def parse_output_format(text):
+    """
+    Turn "name" or "name:level" (e.g. "jpeg:90") into an OutputFormat.
+
+    Args:
+        text: The format string, or an OutputFormat (returned unchanged), or None
+            for the default format
+
+    Returns:
+        OutputFormat (raises ValueError for an unknown name or a bad level)
+    """
+    if isinstance(text, OutputFormat):
+        return text
+    if not text:
+        return OutputFormat()
+    name, _, level = text.partition(":")
+    return OutputFormat(name, int(level) if level else None)
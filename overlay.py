@@ -0,0 +1,46 @@
+# Import required libraries
+import cv2
+
+
+class Overlay:
+    """
+    Rectangles and text labels to draw on a frame, kept as a list until display time.
+
+    The capture code describes what it wants to show (face boxes, "SMILE DETECTED!",
+    countdowns) instead of drawing into the camera frame straight away. Selfies are
+    handed to the writer first, so they are saved without any annotations, and the
+    overlay is drawn onto the frame only afterwards, just before it is shown. No
+    extra copy of the frame is needed.
+
+    One Overlay can be reused for every frame: call clear() before filling it again.
+    """
+
+    def __init__(self):
+        self.items = []  # ("rectangle", args) or ("text", args) in drawing order
+
+    def rectangle(self, top_left, bottom_right, color, thickness=2):
+        """Add a rectangle (same arguments as cv2.rectangle without the image)."""
+        self.items.append(("rectangle", (top_left, bottom_right, color, thickness)))
+
+    def text(self, text, position, scale, color, thickness=2):
+        """Add a text label in cv2.FONT_HERSHEY_SIMPLEX at position (bottom-left corner)."""
+        self.items.append(("text", (text, position, scale, color, thickness)))
+
+    def clear(self):
+        """Remove every item, ready for the next frame."""
+        self.items.clear()
+
+    def draw(self, image):
+        """
+        Draw every item onto an image (in place).
+
+        Args:
+            image: The frame to annotate, usually right before cv2.imshow()
+        """
+        for kind, args in self.items:
+            if kind == "rectangle":
+                top_left, bottom_right, color, thickness = args
+                cv2.rectangle(image, top_left, bottom_right, color, thickness)
+            else:
+                text, position, scale, color, thickness = args
+                cv2.putText(image, text, position, cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
@@ -0,0 +1,257 @@
+# Import required libraries
+import collections  # deque gives us a fast bounded queue
+import threading    # Each pipeline stage runs on its own thread
+import time         # For throughput measurements
+import cv2          # OpenCV for color conversion
+
+# Passed down the queues after the last frame of a file or synthetic source, so the
+# later stages finish the frames still waiting before the pipeline stops
+END_OF_STREAM = object()
+
+
+class FrameQueue:
+    """
+    A small bounded queue that drops the OLDEST item when it is full.
+
+    Camera frames go stale quickly, so when a later stage falls behind we would rather
+    throw away an old frame than make the camera wait. This keeps every stage working
+    on the freshest frame available.
+
+    A recorded clip has no such hurry and every frame counts, so with drop_oldest=False
+    put() waits for room instead of dropping.
+    """
+
+    def __init__(self, name, maxsize=2, drop_oldest=True):
+        self.name = name
+        self.maxsize = maxsize
+        self.drop_oldest = drop_oldest
+        self.dropped = 0         # How many items were thrown away because the queue was full
+        self.max_depth_seen = 0  # Highest number of items waiting at once
+        self._items = collections.deque()
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def put(self, item):
+        """
+        Add an item, dropping the oldest one if the queue is full (or waiting for room
+        when drop_oldest is False).
+
+        Returns:
+            bool: False if the queue was closed and the item was not added
+        """
+        with self._condition:
+            while not self.drop_oldest and len(self._items) >= self.maxsize and not self._closed:
+                self._condition.wait()
+            if self._closed:
+                return False
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self.max_depth_seen = max(self.max_depth_seen, len(self._items))
+            self._condition.notify_all()
+            return True
+
+    def get(self, timeout=0.1):
+        """
+        Take the next item from the queue.
+
+        Args:
+            timeout: Seconds to wait for an item
+
+        Returns:
+            The next item, or None if nothing arrived before the timeout
+        """
+        with self._condition:
+            if not self._items:
+                self._condition.wait(timeout)
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._condition.notify_all()  # Wake a put() waiting for room
+            return item
+
+    def depth(self):
+        """Return how many items are currently waiting."""
+        with self._condition:
+            return len(self._items)
+
+    def close(self):
+        """Stop accepting items and wake any put() that is waiting for room."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class StageStats:
+    """Throughput counters for one pipeline stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.frames = 0          # Frames this stage has finished
+        self.busy_seconds = 0.0  # Time spent actually working (not waiting on a queue)
+        self.started_at = time.perf_counter()
+
+    def record(self, seconds):
+        """Record one processed frame that took the given number of seconds."""
+        self.frames += 1
+        self.busy_seconds += seconds
+
+    def fps(self):
+        """Frames per second finished by this stage since it started."""
+        elapsed = time.perf_counter() - self.started_at
+        return self.frames / elapsed if elapsed > 0 else 0.0
+
+    def avg_ms(self):
+        """Average working time per frame, in milliseconds."""
+        return 1000.0 * self.busy_seconds / self.frames if self.frames else 0.0
+
+
+def format_report(stages, queues):
+    """
+    Build a one-line-per-item text report of stage throughput and queue depth.
+
+    The stage with the highest average time per frame is the bottleneck.
+
+    Args:
+        stages: List of StageStats
+        queues: List of FrameQueue
+
+    Returns:
+        str: Human readable report
+    """
+    lines = []
+    for stage in stages:
+        lines.append(f"  {stage.name:<8} {stage.fps():6.1f} fps  {stage.avg_ms():7.2f} ms/frame  "
+                     f"({stage.frames} frames)")
+    for queue in queues:
+        lines.append(f"  {queue.name:<8} queue depth {queue.depth()}/{queue.maxsize}  "
+                     f"max {queue.max_depth_seen}  dropped {queue.dropped}")
+    busiest = max(stages, key=lambda s: s.avg_ms())
+    lines.append(f"  bottleneck: {busiest.name}")
+    return "\n".join(lines)
+
+
+def run_pipeline(cap, detect_frame, render_frame, report_interval=5.0, metrics=None, live=True):
+    """
+    Run capture, detection and rendering as three separate stages.
+
+    Capture and detection run on background threads; rendering runs on the calling
+    thread because OpenCV windows must be driven from the main thread. The stages are
+    connected by drop-oldest queues, so a slow detection pass never stalls the camera
+    and the display always shows the most recent result.
+
+    For a video file, image folder or synthetic source (live=False) the queues wait
+    instead of dropping, so every frame is detected and rendered. When the source ends,
+    the frames still in the queues are finished before the pipeline stops.
+
+    Args:
+        cap: An opened cv2.VideoCapture
+        detect_frame: Function called as detect_frame(gray_frame) on the detection
+            thread; returns a list of (face, smiles) pairs
+        render_frame: Function called as render_frame(frame, detections) on the main
+            thread; it draws, saves and displays, and returns False to stop the pipeline
+        report_interval: Seconds between printed stage reports (0 disables them)
+        metrics: Optional LoopMetrics (metrics.py) that also gets the read and gray
+            timings and the number of frames dropped by the queues
+        live: True for a camera (drop stale frames), False for a recorded or generated
+            source (process every frame; see frame_sources.is_live_source())
+
+    Returns:
+        dict: Final stats with "stages" (list of StageStats) and "queues" (list of FrameQueue)
+
+    Raises:
+        Whatever a background stage raised (e.g. a detector error), after the pipeline
+        has stopped, just like the serial loop would
+    """
+    # STEP 1: CREATE THE QUEUES AND STATS THAT CONNECT THE STAGES
+    frame_queue = FrameQueue("frames", maxsize=2, drop_oldest=live)     # capture -> detect
+    result_queue = FrameQueue("results", maxsize=2, drop_oldest=live)   # detect -> render
+    capture_stats = StageStats("capture")
+    detect_stats = StageStats("detect")
+    render_stats = StageStats("render")
+    stages = [capture_stats, detect_stats, render_stats]
+    queues = [frame_queue, result_queue]
+    stop_event = threading.Event()
+    errors = []  # Exceptions raised by the background stages
+    if metrics is not None:
+        metrics.watch("dropped_frames", lambda: frame_queue.dropped + result_queue.dropped)
+
+    # STEP 2: DEFINE THE BACKGROUND STAGES
+    def capture_worker():
+        while not stop_event.is_set():
+            start = time.perf_counter()
+            ret, frame = cap.read()
+            if not ret:
+                if live:
+                    print("Error: Unable to read from the camera.")
+                # Let detection and rendering finish the frames already queued
+                frame_queue.put(END_OF_STREAM)
+                break
+            capture_stats.record(time.perf_counter() - start)
+            if metrics is not None:
+                metrics.record("read", time.perf_counter() - start)
+            frame_queue.put(frame)
+
+    def detect_worker():
+        while not stop_event.is_set():
+            frame = frame_queue.get()
+            if frame is None:
+                continue  # Nothing new yet, check the stop flag again
+            if frame is END_OF_STREAM:
+                result_queue.put(END_OF_STREAM)
+                break
+            start = time.perf_counter()
+            gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            if metrics is not None:
+                metrics.record("gray", time.perf_counter() - start)
+            detections = detect_frame(gray_frame)
+            detect_stats.record(time.perf_counter() - start)
+            result_queue.put((frame, detections))
+
+    def guarded(worker, next_queue):
+        """Run a stage; if it fails, stop the pipeline instead of leaving the others waiting."""
+        def run():
+            try:
+                worker()
+            except Exception as e:
+                errors.append(e)
+                stop_event.set()
+                next_queue.put(END_OF_STREAM)
+        return run
+
+    threads = [threading.Thread(target=guarded(capture_worker, frame_queue), name="capture", daemon=True),
+               threading.Thread(target=guarded(detect_worker, result_queue), name="detect", daemon=True)]
+    for thread in threads:
+        thread.start()
+
+    # STEP 3: RENDER ON THE MAIN THREAD UNTIL ASKED TO STOP
+    last_report = time.perf_counter()
+    try:
+        while not stop_event.is_set():
+            item = result_queue.get()
+            if item is END_OF_STREAM:
+                break
+            if item is not None:
+                start = time.perf_counter()
+                frame, detections = item
+                keep_running = render_frame(frame, detections)
+                render_stats.record(time.perf_counter() - start)
+                if not keep_running:
+                    break
+
+            if report_interval and time.perf_counter() - last_report >= report_interval:
+                print("Pipeline stats:\n" + format_report(stages, queues))
+                last_report = time.perf_counter()
+    finally:
+        # STEP 4: STOP THE BACKGROUND STAGES
+        stop_event.set()
+        for queue in queues:
+            queue.close()  # Release a stage waiting for room in a full queue
+        for thread in threads:
+            thread.join(timeout=1.0)
+        print("Final pipeline stats:\n" + format_report(stages, queues))
+
+    if errors:
+        raise errors[0]
+    return {"stages": stages, "queues": queues}
@@ -0,0 +1,173 @@
+# Import required libraries
+import os         # Directory listing and modification times
+import threading  # The counter is shared between the camera loop, writer and watcher threads
+
+# watchdog is optional: with it the counter reacts to file system events, without it
+# refresh_if_changed() falls back to a cheap directory modification-time check
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+# File extensions of every output format save_selfie() can write (see output_formats.py)
+SELFIE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".npy")
+
+
+def is_selfie_file(file_name):
+    """Return True if the file name matches our selfie naming pattern."""
+    return file_name.startswith("selfie_") and file_name.lower().endswith(SELFIE_EXTENSIONS)
+
+
+def scan_selfies(directory):
+    """
+    Count selfie files in one directory with a full listing.
+
+    Args:
+        directory: The directory to search
+
+    Returns:
+        int: Number of selfie files, 0 if the directory does not exist
+    """
+    try:
+        with os.scandir(directory) as entries:
+            return sum(1 for entry in entries if is_selfie_file(entry.name))
+    except OSError:
+        return 0
+
+
+class SelfieCounter:
+    """
+    Keep a running count of saved selfies without listing directories every frame.
+
+    The count is taken once with a full scan when the counter is created. After that
+    it is updated by add() whenever we save a selfie ourselves, and optionally by a
+    file system watcher or refresh_if_changed() for selfies written by other processes.
+    """
+
+    def __init__(self, directories):
+        """
+        Args:
+            directories: List of directories whose selfies are counted
+        """
+        # Absolute paths, so a later os.chdir() does not change what we count
+        self.directories = [os.path.abspath(d) for d in directories]
+        self._counts = {}  # directory -> number of selfies
+        self._mtimes = {}  # directory -> modification time at the last scan
+        self._lock = threading.Lock()
+        self._observer = None
+        self.rescan()
+
+    def count(self):
+        """Return the total number of selfies across all directories."""
+        with self._lock:
+            return sum(self._counts.values())
+
+    def add(self, file_path):
+        """
+        Record a newly saved selfie.
+
+        Do not combine with start_watching() in the same process, or the selfie is
+        counted twice.
+
+        Args:
+            file_path: Path of the selfie that was just written
+        """
+        self._adjust(file_path, +1)
+
+    def rescan(self):
+        """Recount every directory with a full listing."""
+        for directory in self.directories:
+            self._rescan_directory(directory)
+
+    def refresh_if_changed(self):
+        """
+        Rescan only the directories whose modification time changed.
+
+        Adding or removing a file changes its directory's modification time, so one
+        os.stat() per directory tells us whether the cached count can still be trusted.
+
+        Returns:
+            int: The (possibly updated) total count
+        """
+        for directory in self.directories:
+            if self._mtime(directory) != self._mtimes.get(directory):
+                self._rescan_directory(directory)
+        return self.count()
+
+    def start_watching(self):
+        """
+        Keep the count up to date with file system events (requires watchdog).
+
+        Returns:
+            bool: True if the watcher started, False if watchdog is not installed
+        """
+        if Observer is None:
+            return False
+        if self._observer is not None:
+            return True
+        self._observer = Observer()
+        handler = _SelfieEventHandler(self)
+        for directory in self.directories:
+            if os.path.isdir(directory):
+                self._observer.schedule(handler, directory, recursive=False)
+        self._observer.daemon = True
+        self._observer.start()
+        return True
+
+    def stop_watching(self):
+        """Stop the file system watcher if it is running."""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=1.0)
+            self._observer = None
+
+    def is_watching(self):
+        """Return True if a file system watcher keeps the count up to date."""
+        return self._observer is not None
+
+    def _mtime(self, directory):
+        try:
+            return os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
+
+    def _rescan_directory(self, directory):
+        mtime = self._mtime(directory)
+        count = scan_selfies(directory)
+        with self._lock:
+            self._counts[directory] = count
+            self._mtimes[directory] = mtime
+
+    def _adjust(self, file_path, delta):
+        directory = os.path.dirname(os.path.abspath(file_path))
+        if not is_selfie_file(os.path.basename(file_path)):
+            return
+        with self._lock:
+            if directory in self._counts:
+                self._counts[directory] = max(0, self._counts[directory] + delta)
+                # Our count already includes this change, so the next
+                # refresh_if_changed() does not need to rescan
+                self._mtimes[directory] = self._mtime(directory)
+
+
+class _SelfieEventHandler(FileSystemEventHandler):
+    """Translate watchdog file events into counter updates."""
+
+    def __init__(self, counter):
+        super().__init__()
+        self.counter = counter
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.counter._adjust(event.src_path, +1)
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.counter._adjust(event.src_path, -1)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.counter._adjust(event.src_path, -1)
+            self.counter._adjust(event.dest_path, +1)
@@ -0,0 +1,315 @@
+"""
+A small SQLite index of saved selfies.
+
+save_selfie() adds one row per selfie (time, camera, face box, smile count, file
+size), so the GUI can count photos and fetch newest-first pages or date ranges
+without listing and sorting folders. The index can always be rebuilt from the
+files on disk:
+
+    python selfie_index.py --rebuild selfies
+"""
+# Import required libraries
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from selfie_counter import is_selfie_file
+
+INDEX_FILE_NAME = "index.db"  # Created inside the selfies folder
+
+# selfie_[<camera>_]<YYYYMMDD-HHMMSS>[-<milliseconds>][_<n>].png
+_NAME_PATTERN = re.compile(r"^selfie_(?:(?P<camera>.+)_)?(?P<stamp>\d{8}-\d{6})(?:-(?P<millis>\d{3}))?")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS selfies (
+    path        TEXT PRIMARY KEY,
+    name        TEXT NOT NULL,
+    captured_at REAL NOT NULL,
+    camera      TEXT,
+    face_x      INTEGER,
+    face_y      INTEGER,
+    face_w      INTEGER,
+    face_h      INTEGER,
+    smiles      INTEGER NOT NULL DEFAULT 0,
+    file_size   INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS selfies_by_time ON selfies (captured_at);
+"""
+
+
+class SelfieIndex:
+    """Store and query selfie metadata in an SQLite database."""
+
+    def __init__(self, db_path):
+        """
+        Args:
+            db_path: Database file (created if missing)
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # One connection shared by our threads (writer, GUI, thumbnail loader), guarded by a lock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=5.0)
+        # WAL lets the camera process add rows while the GUI process reads
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    def add(self, path, captured_at, camera=None, face=None, smiles=0, file_size=None):
+        """
+        Add (or replace) the row for one saved selfie.
+
+        Args:
+            path: Path of the selfie file
+            captured_at: Capture time as a time.time() value
+            camera: Optional camera id
+            face: Optional face box (x, y, w, h) that triggered the capture
+            smiles: Number of smiles detected in that face
+            file_size: Size of the file in bytes (read from disk if not given)
+        """
+        path = os.path.abspath(path)
+        if file_size is None:
+            try:
+                file_size = os.path.getsize(path)
+            except OSError:
+                file_size = 0
+        # Boxes from OpenCV hold numpy integers, which sqlite3 cannot store
+        x, y, w, h = (int(v) for v in face) if face is not None else (None, None, None, None)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO selfies VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, os.path.basename(path), captured_at, camera, x, y, w, h, int(smiles), file_size))
+            self._db.commit()
+
+    def remove(self, path):
+        """Remove the row for a selfie that was deleted."""
+        with self._lock:
+            self._db.execute("DELETE FROM selfies WHERE path = ?", (os.path.abspath(path),))
+            self._db.commit()
+
+    def count(self, since=None, until=None):
+        """
+        Count selfies, optionally only those captured in [since, until).
+
+        Args:
+            since: Earliest capture time (time.time() value) or None
+            until: Latest capture time (exclusive) or None
+
+        Returns:
+            int: Number of selfies
+        """
+        where, params = self._time_filter(since, until)
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM selfies {where}", params).fetchone()[0]
+
+    def page(self, offset=0, limit=60, since=None, until=None, newest_first=True):
+        """
+        Fetch one page of selfies ordered by capture time.
+
+        Args:
+            offset: Number of selfies to skip
+            limit: Maximum number of selfies to return
+            since: Earliest capture time or None
+            until: Latest capture time (exclusive) or None
+            newest_first: Newest selfies first (default) or oldest first
+
+        Returns:
+            list: (path, name) tuples
+        """
+        where, params = self._time_filter(since, until)
+        order = "DESC" if newest_first else "ASC"
+        with self._lock:
+            return self._db.execute(
+                f"SELECT path, name FROM selfies {where} ORDER BY captured_at {order}, name {order} "
+                "LIMIT ? OFFSET ?", params + [limit, offset]).fetchall()
+
+    def rebuild(self, directories, recursive=True):
+        """
+        Re-create the index from the selfie files found on disk.
+
+        Existing rows for files that are still present keep their metadata; new files
+        are added using the time in their name (or their modification time), and rows
+        for files that no longer exist are removed. Sub-folders are scanned too, so the
+        per-camera folders of multi_camera.py (selfies/<camera id>/) are included;
+        hidden folders such as the thumbnail cache are skipped. Rows for files in other
+        folders are kept while the file exists.
+
+        Args:
+            directories: Folders to scan
+            recursive: Also scan their sub-folders
+
+        Returns:
+            int: Number of selfies in the index afterwards
+        """
+        found = {}
+        for directory in directories:
+            if not os.path.isdir(directory):
+                continue
+            folders = [directory]
+            while folders:
+                with os.scandir(folders.pop()) as entries:
+                    for entry in entries:
+                        if recursive and entry.is_dir() and not entry.name.startswith("."):
+                            folders.append(entry.path)
+                        elif entry.is_file() and is_selfie_file(entry.name):
+                            found[os.path.abspath(entry.path)] = entry
+
+        with self._lock:
+            known = {row[0] for row in self._db.execute("SELECT path FROM selfies")}
+            missing = [(path,) for path in known if path not in found and not os.path.exists(path)]
+            self._db.executemany("DELETE FROM selfies WHERE path = ?", missing)
+            rows = []
+            for path, entry in found.items():
+                if path in known:
+                    continue
+                stat = entry.stat()
+                captured_at, camera = parse_selfie_name(entry.name, stat.st_mtime)
+                rows.append((path, entry.name, captured_at, camera, None, None, None, None, 0, stat.st_size))
+            self._db.executemany("INSERT INTO selfies VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._db.commit()
+        return self.count()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _time_filter(self, since, until):
+        conditions, params = [], []
+        if since is not None:
+            conditions.append("captured_at >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("captured_at < ?")
+            params.append(until)
+        return ("WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+
+class IndexedPhotoList:
+    """
+    A read-only list of (path, name) tuples backed by a SelfieIndex.
+
+    Looks like a normal list to the ThumbnailGrid (len() and [index]), but only
+    fetches the pages that are actually looked at.
+    """
+
+    def __init__(self, index, since=None, until=None, page_size=120, max_pages=20):
+        self.index = index
+        self.since = since
+        self.until = until
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._length = index.count(since, until)
+        self._pages = {}  # page number -> list of rows
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, position):
+        if not 0 <= position < self._length:
+            raise IndexError(position)
+        page_number, offset = divmod(position, self.page_size)
+        with self._lock:
+            page = self._pages.get(page_number)
+            if page is None:
+                page = self.index.page(page_number * self.page_size, self.page_size, self.since, self.until)
+                if len(self._pages) >= self.max_pages:
+                    self._pages.pop(next(iter(self._pages)))  # Forget the oldest fetched page
+                self._pages[page_number] = page
+        if offset >= len(page):
+            raise IndexError(position)  # Rows were deleted since the count was taken
+        return page[offset]
+
+
+def parse_selfie_name(file_name, default_time):
+    """
+    Read the capture time and camera id from a selfie file name.
+
+    Args:
+        file_name: e.g. selfie_20240131-154500-250.png or selfie_cam1_20240131-154500.png
+        default_time: Time to use if the name has no timestamp (e.g. the file's mtime)
+
+    Returns:
+        tuple: (captured_at as a time.time() value, camera id or None)
+    """
+    match = _NAME_PATTERN.match(file_name)
+    if not match:
+        return default_time, None
+    try:
+        captured_at = time.mktime(time.strptime(match.group("stamp"), "%Y%m%d-%H%M%S"))
+        if match.group("millis"):
+            captured_at += int(match.group("millis")) / 1000
+    except ValueError:
+        captured_at = default_time
+    return captured_at, match.group("camera")
+
+
+def default_index_path(selfie_dir="selfies"):
+    """Return the index file that belongs to a selfies folder."""
+    return os.path.join(selfie_dir, INDEX_FILE_NAME)
+
+
+def sync_selfie_index(index, selfie_dir="selfies", extra_directories=()):
+    """
+    Bring an index up to date with the files on disk, e.g. after selfies were copied
+    into or deleted from the folder outside the app.
+
+    Args:
+        index: The SelfieIndex to update
+        selfie_dir: The selfies folder (scanned with its camera sub-folders)
+        extra_directories: Other folders whose selfies belong in the same index
+            (e.g. "." for selfies saved before the selfies folder existed; their
+            sub-folders are not scanned)
+
+    Returns:
+        int: Number of selfies in the index afterwards
+    """
+    count = index.rebuild([selfie_dir])
+    if extra_directories:
+        count = index.rebuild(extra_directories, recursive=False)
+    return count
+
+
+def open_selfie_index(selfie_dir="selfies", extra_directories=()):
+    """
+    Open the index of a selfies folder, building it from disk the first time.
+
+    Args:
+        selfie_dir: The selfies folder (the index file lives inside it)
+        extra_directories: Other folders whose selfies belong in the same index
+            (see sync_selfie_index())
+
+    Returns:
+        SelfieIndex
+    """
+    db_path = default_index_path(selfie_dir)
+    is_new = not os.path.exists(db_path)
+    index = SelfieIndex(db_path)
+    if is_new:
+        sync_selfie_index(index, selfie_dir, extra_directories)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or inspect the selfie index.")
+    parser.add_argument("directories", nargs="*", default=["selfies"], help="selfie folders (default: selfies)")
+    parser.add_argument("--index", default=None, help="index file (default: <first folder>/index.db)")
+    parser.add_argument("--rebuild", action="store_true", help="re-create the index from the files on disk")
+    args = parser.parse_args()
+
+    index = SelfieIndex(args.index or default_index_path(args.directories[0]))
+    if args.rebuild:
+        print(f"Indexed {index.rebuild(args.directories)} selfies")
+    print(f"{index.count()} selfies in {index.db_path}")
+    for path, name in index.page(0, 5):
+        print(f"  {name}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
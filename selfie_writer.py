@@ -0,0 +1,118 @@
+# Import required libraries
+import queue      # Thread-safe bounded queue between the camera loop and the writer
+import threading  # The writer runs on its own background thread
+import time       # Capture timestamps
+
+
+class SelfieWriter:
+    """
+    Encode and write selfies on a background thread.
+
+    Saving a PNG takes tens of milliseconds, which causes a visible hitch when it runs
+    inside the camera loop. The loop instead hands frames to this writer, which saves
+    them in the background and reports back whether each save worked.
+    """
+
+    def __init__(self, save_function, max_pending=8):
+        """
+        Start the background writer thread.
+
+        Args:
+            save_function: Function called as save_function(image, directory, capture_time,
+                **metadata) that writes one image and returns True on success
+                (e.g. capture.save_selfie)
+            max_pending: Maximum number of frames waiting to be written
+        """
+        self.save_function = save_function
+        self.saved = 0    # Number of selfies written successfully
+        self.failed = 0   # Number of selfies that could not be written
+        self.dropped = 0  # Number of selfies rejected because the queue stayed full
+        self._jobs = queue.Queue(maxsize=max_pending)
+        self._results = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="selfie-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, image, directory="selfies", timeout=0, metadata=None, capture_time=None,
+               copy=True):
+        """
+        Queue a frame to be saved.
+
+        The image is copied so the caller can keep drawing on its frame. The capture
+        time is taken now (unless given), so the file name matches when the smile
+        happened rather than when the file was written.
+
+        Args:
+            image: The video frame (numpy array) to save
+            directory: Directory path where the selfie should be saved
+            timeout: Seconds to wait for room in the queue before giving up; the
+                default 0 never waits, so a full queue cannot stall the camera loop
+            metadata: Optional dict of extra keyword arguments for save_function
+                (e.g. the face box and smile count for the selfie index)
+            capture_time: When the frame was captured (time.time() value); defaults to now
+            copy: Set to False to hand over an image the caller will not touch again
+
+        Returns:
+            bool: True if the frame was queued, False if the queue was full
+        """
+        try:
+            if capture_time is None:
+                capture_time = time.time()
+            if copy:
+                image = image.copy()
+            job = (image, directory, capture_time, metadata or {})
+            if timeout:
+                self._jobs.put(job, timeout=timeout)
+            else:
+                self._jobs.put_nowait(job)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            print("Selfie writer is busy, frame dropped")
+            return False
+
+    def poll_results(self):
+        """
+        Collect the results of saves that finished since the last call.
+
+        Returns:
+            list: (capture_time, success) tuples, oldest first
+        """
+        results = []
+        while True:
+            try:
+                results.append(self._results.get_nowait())
+            except queue.Empty:
+                return results
+
+    def pending(self):
+        """Return how many frames are still waiting to be written."""
+        return self._jobs.qsize()
+
+    def close(self):
+        """
+        Write every queued frame and stop the background thread.
+
+        This blocks until the queue is empty so no capture is lost on exit.
+        """
+        if not self._thread.is_alive():
+            return
+        self._jobs.put(None)  # Sentinel: tells the worker to stop after the queued frames
+        self._thread.join()
+
+    def _run(self):
+        """Background loop: save queued frames until the stop sentinel arrives."""
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            image, directory, capture_time, metadata = job
+            try:
+                success = bool(self.save_function(image, directory, capture_time, **metadata))
+            except Exception as e:
+                print(f"Error saving selfie: {e}")
+                success = False
+            if success:
+                self.saved += 1
+            else:
+                self.failed += 1
+            self._results.put((capture_time, success))
@@ -0,0 +1,192 @@
+# Import required libraries
+import collections  # deque keeps the last few smile results of each face
+
+SMILE_WINDOW = 5      # Frames of smile history kept per face
+SMILE_CONFIRM = 3     # A smile counts once it was seen in this many of the last SMILE_WINDOW frames
+SMILE_RELEASE = 1     # ...and stops counting when it drops to this many
+IOU_THRESHOLD = 0.3   # Minimum box overlap to treat two detections as the same face
+MAX_MISSED = 5        # Forget a face after this many frames without it
+
+
+def box_iou(a, b):
+    """
+    Intersection over union of two (x, y, w, h) boxes.
+
+    Returns:
+        float: 0.0 (no overlap) to 1.0 (identical boxes)
+    """
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    overlap_w = min(ax + aw, bx + bw) - max(ax, bx)
+    overlap_h = min(ay + ah, by + bh) - max(ay, by)
+    if overlap_w <= 0 or overlap_h <= 0:
+        return 0.0
+    overlap = overlap_w * overlap_h
+    return overlap / float(aw * ah + bw * bh - overlap)
+
+
+class DetectionScore:
+    """Frame-level true/false positive counts against hand-made labels."""
+
+    def __init__(self):
+        self.true_positive = 0
+        self.false_positive = 0
+        self.false_negative = 0
+        self.true_negative = 0
+
+    def add(self, predicted, actual):
+        """Count one frame: predicted and actual are True when there is a smile."""
+        if predicted and actual:
+            self.true_positive += 1
+        elif predicted:
+            self.false_positive += 1
+        elif actual:
+            self.false_negative += 1
+        else:
+            self.true_negative += 1
+
+    def precision(self):
+        """Share of smile frames we reported that really had a smile (1.0 if none reported)."""
+        reported = self.true_positive + self.false_positive
+        return self.true_positive / reported if reported else 1.0
+
+    def recall(self):
+        """Share of real smile frames we reported (1.0 if there were none)."""
+        actual = self.true_positive + self.false_negative
+        return self.true_positive / actual if actual else 1.0
+
+    def describe(self):
+        return (f"precision {self.precision():.2f}, recall {self.recall():.2f} "
+                f"(TP {self.true_positive}, FP {self.false_positive}, FN {self.false_negative})")
+
+
+class _FaceTrack:
+    """Smile history of one face, followed across frames by box overlap."""
+
+    def __init__(self, track_id, box, window):
+        self.track_id = track_id
+        self.box = box
+        self.history = collections.deque(maxlen=window)
+        self.confirmed = False
+        self.missed = 0
+
+
+class SmileConfirmer:
+    """
+    Only report a smile once it has been stable for a few frames.
+
+    The smile cascade often fires on a single frame (a shadow, an open mouth),
+    and every such flicker used to trigger a selfie. This filter keeps the last
+    `window` smile results of every face (faces are matched across frames by box
+    overlap) and confirms a smile once it was seen in `confirm` of them. A
+    confirmed smile only ends when it drops to `release` frames, so a single
+    missed frame does not break it (hysteresis).
+
+    It also counts what it did, and when the true answer is passed to update()
+    (e.g. labels for a recorded clip) how precise the raw and the confirmed smile
+    decisions were, so the settings can be tuned.
+    """
+
+    def __init__(self, window=SMILE_WINDOW, confirm=SMILE_CONFIRM, release=SMILE_RELEASE,
+                 iou_threshold=IOU_THRESHOLD, max_missed=MAX_MISSED):
+        """
+        Args:
+            window: Frames of smile history kept per face
+            confirm: Smiling frames (out of window) needed to confirm a smile
+            release: A confirmed smile ends when the smiling frames drop to this many
+            iou_threshold: Minimum box overlap to match a face to the previous frame
+            max_missed: Frames a face may be missing before its history is dropped
+        """
+        self.window = max(1, window)
+        self.confirm = min(max(1, confirm), self.window)
+        self.release = min(max(0, release), self.confirm - 1)
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self._tracks = []
+        self._next_id = 0
+        self.track_ids = []  # Track id of each detection passed to the last update()
+
+        self.frames = 0            # Frames processed
+        self.raw_smiles = 0        # Face-frames where the cascade found a smile
+        self.confirmed_smiles = 0  # Face-frames with a confirmed smile
+        self.suppressed = 0        # Face-frames with a raw smile that was not (yet) confirmed
+        self.events = 0            # Smiles that became confirmed (one per stable smile)
+        self.raw_score = DetectionScore()        # Only filled when labels are given
+        self.confirmed_score = DetectionScore()
+
+    def update(self, detections, actual_smile=None):
+        """
+        Feed the detections of the next frame.
+
+        Args:
+            detections: List of (face, smiles) pairs from detect_faces_and_smiles()
+            actual_smile: Optional label: True if someone really smiles in this frame
+
+        Returns:
+            list: One bool per detection, True if that face has a confirmed smile
+        """
+        self.frames += 1
+        matches = self._match([face for face, _ in detections])
+        self.track_ids = [track.track_id for track in matches]
+        confirmed = []
+        for (face, smiles), track in zip(detections, matches):
+            smiling = len(smiles) > 0
+            track.history.append(smiling)
+            track.missed = 0
+            smiling_frames = sum(track.history)
+            if not track.confirmed and smiling_frames >= self.confirm:
+                track.confirmed = True
+                self.events += 1
+            elif track.confirmed and smiling_frames <= self.release:
+                track.confirmed = False
+
+            self.raw_smiles += smiling
+            self.confirmed_smiles += track.confirmed
+            self.suppressed += smiling and not track.confirmed
+            confirmed.append(track.confirmed)
+
+        if actual_smile is not None:
+            self.raw_score.add(any(len(smiles) > 0 for _, smiles in detections), actual_smile)
+            self.confirmed_score.add(any(confirmed), actual_smile)
+        return confirmed
+
+    def reset(self):
+        """Forget every face (e.g. when the camera changes)."""
+        self._tracks = []
+
+    def describe(self):
+        """Return a one-line summary of the filter counters."""
+        text = (f"Smile filter: {self.events} confirmed smiles, {self.raw_smiles} raw smile frames, "
+                f"{self.suppressed} suppressed")
+        if self.raw_score.true_positive + self.raw_score.false_positive + self.raw_score.false_negative:
+            text += f"; raw {self.raw_score.describe()}; confirmed {self.confirmed_score.describe()}"
+        return text
+
+    def _match(self, faces):
+        """Pair every face with the track it overlaps most (new tracks for the rest)."""
+        pairs = sorted(((box_iou(face, track.box), i, t) for i, face in enumerate(faces)
+                        for t, track in enumerate(self._tracks)), reverse=True)
+        matched = [None] * len(faces)
+        used = set()
+        for iou, i, t in pairs:
+            if iou < self.iou_threshold:
+                break
+            if matched[i] is None and t not in used:
+                matched[i] = self._tracks[t]
+                used.add(t)
+
+        # Faces that were not seen this frame age; drop the ones missing for too long
+        kept = []
+        for t, track in enumerate(self._tracks):
+            if t not in used:
+                track.missed += 1
+            if track.missed <= self.max_missed:
+                kept.append(track)
+        for i, face in enumerate(faces):
+            if matched[i] is None:
+                matched[i] = _FaceTrack(self._next_id, face, self.window)
+                self._next_id += 1
+                kept.append(matched[i])
+            matched[i].box = tuple(face)
+        self._tracks = kept
+        return matched
@@ -3,8 +3,37 @@ import cv2         # OpenCV for computer vision tasks (camera, image processing,
 import time        # For timestamps and timing control
 import numpy as np # NumPy for numerical operations (though not heavily used in this script)
 import os          # Operating system interface for file/directory operations
+import argparse    # Command line options (e.g. --pipeline)
+import functools   # partial() binds the selfie counter into save_selfie for the writer
+import logging     # --log-level sets up the detection log messages
 
-def main():
+from detection import (DETECTION_WIDTH, FACE_BACKEND, SMILE_BATCH_MIN_FACES, DEFAULT_CONFIG, load_cascades,
+                       load_detection_config, detect_faces, detection_scale, detect_smiles_for_faces)
+from face_detectors import BACKENDS
+from selfie_writer import SelfieWriter
+from selfie_counter import SelfieCounter
+from tracking import FaceTracker, SEARCH_MARGIN
+from frame_sources import is_live_source, open_source
+from thumbnail_cache import ThumbnailCache, CACHE_DIR_NAME
+from selfie_index import open_selfie_index
+from burst import BurstRecorder
+from best_frame import BestFrameBuffer, BEST_FRAME_WINDOW
+from overlay import Overlay
+from output_formats import DEFAULT_FORMAT, parse_output_format
+from smile_filter import SmileConfirmer, SMILE_WINDOW, SMILE_CONFIRM
+from metrics import LoopMetrics, MetricsServer, MetricsDumper, METRICS_DUMP_INTERVAL
+from control import ControlChannel
+from motion_gate import MotionGate
+# Saving selfies and the per-face feedback are shared with the launcher and multi_camera.py
+from capture import draw_detections_and_capture, draw_status_overlay, report_writer_results, save_selfie
+
+def main(use_pipeline=False, keyframe_interval=1, search_margin=SEARCH_MARGIN,
+         frame_size=(640, 480), detection_width=DETECTION_WIDTH, source=0,
+         save_interval=2, burst_size=0, best_of=BEST_FRAME_WINDOW, output_format=DEFAULT_FORMAT,
+         smile_window=SMILE_WINDOW, smile_confirm=SMILE_CONFIRM, crop_faces=False,
+         batch_min_faces=SMILE_BATCH_MIN_FACES, face_backend=FACE_BACKEND,
+         metrics_port=None, metrics_json=None, metrics_interval=METRICS_DUMP_INTERVAL,
+         headless=False, control_address=None, motion_gating=True, detection_config=None):
     """
     Main function that runs the complete smile detection and selfie capture system.
     
@@ -15,197 +44,309 @@ def main():
     4. Automatically captures and saves selfies when a smile is detected
     5. Provides visual feedback and user interface elements
     
+    Args:
+        use_pipeline: If True, run capture, detection and display as separate threaded
+            stages (see pipeline.py) instead of one serial loop
+        keyframe_interval: Run a full-frame face detection only every N frames and
+            track faces in between (see tracking.py); 1 scans the full frame every time
+        search_margin: How far around the last face box to search between keyframes,
+            as a fraction of the face size
+        frame_size: Camera resolution as (width, height)
+        detection_width: Detect faces on a copy of the frame shrunk to this width
+            (boxes are mapped back to full resolution); None uses the full frame
+        source: Where frames come from: a camera index, video file, image folder or
+            "synthetic" (see frame_sources.py); defaults to the first webcam
+        save_interval: Minimum seconds between automatic selfies (or bursts)
+        burst_size: Save this many consecutive frames around each smile instead of a
+            single frame (see burst.py); 0 turns burst mode off
+        best_of: Keep this many recent raw frames and save the sharpest smiling one
+            of them (see best_frame.py); 1 saves the frame the smile was found in
+        output_format: How selfies are written, e.g. "png", "png:1", "jpeg:90", "webp"
+            or "npy" (see output_formats.py)
+        smile_window, smile_confirm: A smile only triggers a capture once it was seen in
+            smile_confirm of the last smile_window frames (see smile_filter.py);
+            1 and 1 capture on the first smiling frame
+        crop_faces: Save a cropped image of each smiling face instead of the whole frame
+        batch_min_faces: Search the mouths of this many or more faces with one batched
+            smile cascade call (see detection.detect_smiles_batched()); None = per face
+        face_backend: Face detector: "haar", "lbp" or "yunet" (see face_detectors.py)
+        metrics_port: Serve the loop metrics (stage timings, fps, counters) on
+            http://127.0.0.1:<port>/metrics (see metrics.py); None = no server
+        metrics_json: Also write the metrics to this JSON file every metrics_interval seconds
+        headless: Run without a window: nothing is drawn or shown, and the loop is
+            controlled by signals and the control socket instead of keys (see control.py)
+        control_address: Control socket (Unix socket path or TCP port on 127.0.0.1)
+            taking capture/stop/start/status/quit commands; None = signals only
+        motion_gating: Skip detection while the scene is static and empty, checking
+            less and less often the longer it stays that way (see motion_gate.py)
+        detection_config: DetectionConfig (detection.py) with the region of interest,
+            face sizes, cascade settings and mouth area, e.g. from a file written by
+            calibrate_detection.py; None = the defaults (whole frame)
+    
     Returns:
         bool: True if the application ran successfully, False if there were errors
     """
     
-    # STEP 1: LOAD PRE-TRAINED AI MODELS (Haar Cascades)
+    # STEP 1: LOAD PRE-TRAINED AI MODELS (face detector + smile Haar cascade)
     # These are machine learning models that can detect specific patterns in images
-    
-    # Get the full path to the face detection model file
-    # cv2.data.haarcascades contains the directory where OpenCV stores these models
-    face_cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-    
-    # Get the full path to the smile detection model file
-    smile_cascade_path = cv2.data.haarcascades + 'haarcascade_smile.xml'
-
-    # Load the AI models into memory
-    # CascadeClassifier is OpenCV's class for using Haar cascade models
-    face_cascade = cv2.CascadeClassifier(face_cascade_path)
-    smile_cascade = cv2.CascadeClassifier(smile_cascade_path)
-
-    # Verify that both models loaded successfully
-    # empty() returns True if the model failed to load
-    if face_cascade.empty() or smile_cascade.empty():
-        print("Error: Unable to load Haar cascade files. Please check your OpenCV installation.")
+    # load_cascades() returns (None, None) if either model failed to load
+    detection_config = detection_config or DEFAULT_CONFIG
+    face_cascade, smile_cascade = load_cascades(face_backend, detection_config)
+    if face_cascade is None:
+        print("Error: Unable to load the detector models. Please check your OpenCV installation.")
         return False  # Exit the function if models can't be loaded
 
     # STEP 2: INITIALIZE CAMERA
-    # VideoCapture(0) opens the default camera (usually built-in webcam)
-    # The parameter 0 refers to the first camera device
-    cap = cv2.VideoCapture(0)
+    # source 0 opens the default camera (usually built-in webcam); a video file, image
+    # folder or "synthetic" can be used instead for testing without a webcam
+    # STEP 3: CONFIGURE CAMERA SETTINGS FOR OPTIMAL PERFORMANCE
+    # Cameras are set to frame_size (640x480 by default: good balance of quality and
+    # speed) at 30 frames per second. Higher resolutions give better selfies; use
+    # detection_width to keep detection fast
+    cap = open_source(source, frame_size, fps=30)
     
     # Check if camera opened successfully
     if not cap.isOpened():
         print("Error: Unable to access the camera. Please check your webcam.")
         return False
 
-    # STEP 3: CONFIGURE CAMERA SETTINGS FOR OPTIMAL PERFORMANCE
-    # Set camera resolution to 640x480 pixels (good balance of quality and speed)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-    
-    # Set frame rate to 30 frames per second for smooth video
-    cap.set(cv2.CAP_PROP_FPS, 30)
-
     # STEP 4: INITIALIZE VARIABLES FOR TIMING AND PHOTO MANAGEMENT
-    last_saved_time = 0    # Timestamp of when the last selfie was saved
-    save_interval = 2      # Minimum seconds between consecutive selfie captures (prevents spam)
+    # state is shared with render_frame() below, which may run inside the pipeline
+    state = {
+        "last_saved_time": 0,  # Timestamp of when the last selfie was saved
+        "save_interval": save_interval,  # Minimum seconds between consecutive selfie captures (prevents spam)
+        "crop_faces": crop_faces,        # Save each smiling face as its own cropped image
+        "detection_config": detection_config,  # Where faces are searched, and where their mouths are
+    }
     
     # Create a dedicated directory for storing selfies
     selfie_dir = "selfies"
     if not os.path.exists(selfie_dir):
         os.makedirs(selfie_dir)  # Create the directory if it doesn't exist
+
+    # Count existing selfies once; after that save_selfie() keeps the count up to date
+    # so the on-screen counter never has to list the directory again
+    counter = SelfieCounter([selfie_dir])
+    state["counter"] = counter
+
+    # Thumbnails for the photo viewer are made once, when each selfie is saved
+    thumbnails = ThumbnailCache(os.path.join(selfie_dir, CACHE_DIR_NAME))
+    state["thumbnails"] = thumbnails
+
+    # Selfies are encoded in the chosen output format (PNG, JPEG, WebP or raw .npy)
+    output_format = parse_output_format(output_format)
+    state["output_format"] = output_format
+
+    # Every selfie is also recorded in the selfie index (time, face box, smile count)
+    # so the photo viewer never has to list and sort the folder
+    index = open_selfie_index(selfie_dir)
+    state["index"] = index
+
+    # Stage timings, fps and counters of the loop, for watching a kiosk's health
+    metrics = LoopMetrics()
+    state["metrics"] = metrics
+    metrics_server = None
+    if metrics_port is not None:
+        try:
+            metrics_server = MetricsServer(metrics, metrics_port)
+        except OSError as e:
+            print(f"Error: Unable to serve metrics on port {metrics_port}: {e}")
+            index.close()
+            cap.release()
+            return False
+    metrics_dumper = None
+    if metrics_json:
+        try:
+            metrics_dumper = MetricsDumper(metrics, metrics_json, metrics_interval)
+        except OSError as e:
+            print(f"Error: Unable to write metrics to {metrics_json}: {e}")
+            for service in (metrics_server, index):
+                if service is not None:
+                    service.close()
+            cap.release()
+            return False
+    if metrics_server is not None:
+        print(f"Metrics at http://127.0.0.1:{metrics_server.port}/metrics")
+
+    # Selfies are encoded and written on a background thread so saving never stalls
+    # the video loop; the writer is flushed in the cleanup step below
+    # (room for two whole bursts, so a burst is buffered in memory rather than dropped)
+    save_function = functools.partial(save_selfie, counter=counter, thumbnails=thumbnails, index=index,
+                                      output_format=output_format)
+    writer = SelfieWriter(metrics.timed("save", save_function), max_pending=max(8, 2 * burst_size))
+    state["writer"] = writer
+    metrics.watch("selfies_dropped", lambda: writer.dropped)
+
+    # Burst mode keeps the last few clean frames in memory so a smile saves the
+    # frames just before it as well as the ones right after it
+    burst = BurstRecorder(writer, selfie_dir, burst_size) if burst_size > 0 else None
+    state["burst"] = burst
+
+    # The last few raw frames are kept so a smile saves the best of them, not just the current one
+    best_frames = BestFrameBuffer(best_of)
+    state["best_frames"] = best_frames
+
+    # Annotations are collected here and drawn only after the frame has been saved,
+    # so selfies never contain boxes or labels (one Overlay is reused for every frame)
+    overlay = Overlay()
+
+    # Single-frame smile flickers are ignored: a smile must hold for a few frames
+    smile_filter = SmileConfirmer(smile_window, smile_confirm)
+    state["smile_filter"] = smile_filter
     
+    # Commands from signals or the control socket replace the 'q' and 's' keys when
+    # there is no window (they also work next to the keys when there is one)
+    control = None
+    if headless or control_address is not None:
+        def control_status():
+            return {"paused": state.get("paused", False), "fps": metrics.fps(),
+                    "frames": metrics.counters["frames"], "selfies": counter.count()}
+        try:
+            control = ControlChannel(control_address, control_status)
+        except OSError as e:
+            print(f"Error: Unable to open control socket {control_address}: {e}")
+            writer.close()
+            for service in (metrics_server, metrics_dumper, index):
+                if service is not None:
+                    service.close()
+            cap.release()
+            return False
+
     # STEP 5: DISPLAY STARTUP MESSAGES
-    print("Smile detection started! Press 'q' to quit.")
-    print("Make sure to smile for the camera to capture selfies!")
+    if headless:
+        print(f"Smile detection started without a window (pid {os.getpid()}). "
+              "Send SIGTERM or 'quit' to stop, SIGUSR1 or 'capture' for a selfie.")
+    else:
+        print("Smile detection started! Press 'q' to quit.")
+        print("Make sure to smile for the camera to capture selfies!")
+
+    # While nobody is in front of the camera and nothing moves, detection runs only
+    # now and then; the first motion brings it back to every frame
+    motion_gate = MotionGate() if motion_gating else None
+    if motion_gate is not None:
+        metrics.watch("motion_idle_frames", lambda: motion_gate.idle_frames)
+        metrics.watch("detections_skipped", lambda: motion_gate.skipped)
+        metrics.watch_gauge("motion_idle_ratio", motion_gate.idle_ratio)
+        metrics.watch_gauge("detection_seconds_saved", motion_gate.saved_seconds)
+
+    # Pick how faces are found: a full-frame scan every frame, or a tracker that
+    # only scans the full frame on keyframes
+    tracker = None
+    if keyframe_interval > 1:
+        tracker = FaceTracker(face_cascade, keyframe_interval, search_margin, detection_width, detection_config)
+
+    def detect_frame(gray_frame):
+        """Find faces, then smiles in their mouth areas; both stages are timed."""
+        if state.get("paused"):
+            return []  # Paused by a "stop" command: skip detection, nothing is captured
+        if motion_gate is not None and not motion_gate.should_detect(gray_frame):
+            return []  # Empty, static scene: no faces to find
+        start = time.perf_counter()
+        if tracker is not None:
+            faces = tracker.update(gray_frame)
+        else:
+            faces = detect_faces(face_cascade, gray_frame, detection_scale(gray_frame.shape[1], detection_width),
+                                 detection_config)
+        faces_done = time.perf_counter()
+        detections = detect_smiles_for_faces(smile_cascade, gray_frame, faces, batch_min_faces, detection_config)
+        done = time.perf_counter()
+        metrics.record("faces", faces_done - start)
+        metrics.record("smiles", done - faces_done)
+        if motion_gate is not None:
+            motion_gate.detection_done(len(faces), done - start)
+        return detections
+
+    def render_frame(frame, detections):
+        """Draw, save and display one processed frame. Returns False when the user quits."""
+        # Report selfies the background writer finished since the last frame
+        report_writer_results(writer)
+
+        # Manual capture ('s' on the previous frame) saves this frame before anything is drawn on it
+        if state.pop("capture_requested", False):
+            # The writer saves it in the background (report_writer_results() prints a
+            # failed save); when its queue is full the frame is dropped with a message
+            if writer.submit(frame, selfie_dir):
+                print("Manual selfie queued!")
+
+        # Remember the clean frame (before anything is drawn on it) for burst captures
+        if burst is not None:
+            burst.feed(frame)
+        best_frames.push(frame, detections)
+
+        # Auto-capture selfies and collect the face/smile feedback to draw
+        start = time.perf_counter()
+        overlay.clear()
+        if detection_config.roi is not None:
+            # Show the part of the frame where faces are searched
+            x, y, w, h = detection_config.roi
+            overlay.rectangle((x, y), (x + w, y + h), (128, 128, 128), 1)
+        draw_detections_and_capture(frame, detections, state, selfie_dir, overlay)
+        captured = time.perf_counter()
+
+        # Without a window nobody sees the frame: skip drawing and display entirely
+        if headless:
+            metrics.record("capture", captured - start)
+            metrics.frame_done()
+            return handle_commands(control.get_commands(), state)
+
+        # Every save is done, so the annotations can now go onto the frame itself
+        overlay.draw(frame)
+
+        # Add user interface elements (instructions and live counter)
+        draw_status_overlay(frame, selfie_dir, counter)
+        drawn = time.perf_counter()
+
+        # Show the video feed with all annotations and rectangles
+        cv2.imshow('Smile Detection - Selfie Camera', frame)
+
+        # Check for keyboard controls
+        key = cv2.waitKey(1) & 0xFF
+        shown = time.perf_counter()
+        metrics.record("capture", captured - start)
+        metrics.record("draw", drawn - captured)
+        metrics.record("imshow", shown - drawn)
+        metrics.frame_done()
+        if control is not None and not handle_commands(control.get_commands(), state):
+            return False
+        return handle_key(key, frame, selfie_dir, writer, state)
     
     try:
-        # STEP 6: MAIN VIDEO PROCESSING LOOP
-        # This loop runs continuously, processing each frame from the camera
-        while True:
-            # STEP 6A: CAPTURE A FRAME FROM THE CAMERA
-            # ret = return value (True if frame captured successfully, False otherwise)
-            # frame = the actual image data captured from the camera
-            ret, frame = cap.read()
-            
-            # If frame capture failed, exit the loop
-            if not ret:
-                print("Error: Unable to read from the camera.")
-                break
-
-            # STEP 6B: PREPARE THE FRAME FOR FACE DETECTION
-            # Convert color image to grayscale because Haar cascades work on grayscale images
-            # This also improves processing speed significantly
-            gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-            # STEP 6C: DETECT FACES IN THE CURRENT FRAME
-            # detectMultiScale() scans the image for face patterns at different sizes and positions
-            faces = face_cascade.detectMultiScale(
-                gray_frame,         # The grayscale image to scan
-                scaleFactor=1.1,    # How much the image size is reduced at each scale (1.1 = 10% reduction)
-                minNeighbors=5,     # How many neighbors each candidate rectangle should retain (higher = more strict)
-                minSize=(100, 100)  # Minimum possible face size in pixels (filters out very small detections)
-            )
-
-            # STEP 6D: PROCESS EACH DETECTED FACE
-            # faces is a list of rectangles, each representing a detected face
-            # Each rectangle is defined as (x, y, width, height)
-            for (x, y, w, h) in faces:
-                
-                # STEP 6D-i: DRAW VISUAL INDICATORS FOR THE DETECTED FACE
-                # Draw a green rectangle around the detected face for user feedback
-                cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-                # Parameters: (image, top-left corner, bottom-right corner, color (B,G,R), thickness)
-                
-                # Add a text label above the face rectangle
-                cv2.putText(frame, 'Face', (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-                # Parameters: (image, text, position, font, scale, color, thickness)
-
-                # STEP 6D-ii: DEFINE REGION OF INTEREST (ROI) FOR SMILE DETECTION
-                # Focus on the lower 2/3 of the face where the mouth is located
-                # This improves smile detection accuracy and reduces false positives
-                roi_gray = gray_frame[y + int(h/3):y + h, x:x + w]  # Grayscale ROI for detection
-                roi_color = frame[y + int(h/3):y + h, x:x + w]      # Color ROI for drawing rectangles
-
-                # STEP 6D-iii: DETECT SMILES WITHIN THE FACE ROI
-                # Only look for smiles in the mouth area of detected faces
-                smiles = smile_cascade.detectMultiScale(
-                    roi_gray,           # The grayscale mouth region to scan
-                    scaleFactor=1.8,    # More aggressive scaling for smile detection
-                    minNeighbors=20,    # Higher threshold for smile confidence (reduces false positives)
-                    minSize=(20, 20)    # Minimum smile size in pixels
-                )
-                
-                # STEP 6D-iv: PROVIDE DEBUG INFORMATION
-                # Print detection status to console for debugging and monitoring
-                print(f"Face detected at ({x},{y}), Smiles found: {len(smiles)}", end="")
+        if use_pipeline:
+            # STEP 6 (PIPELINE MODE): capture, detection and display run as separate
+            # stages so a slow detection pass never stalls the camera
+            from pipeline import run_pipeline
+            run_pipeline(cap, detect_frame, render_frame, metrics=metrics, live=is_live_source(source))
+        else:
+            # STEP 6: MAIN VIDEO PROCESSING LOOP
+            # This loop runs continuously, processing each frame from the camera
+            while True:
+                # STEP 6A: CAPTURE A FRAME FROM THE CAMERA
+                # ret = return value (True if frame captured successfully, False otherwise)
+                # frame = the actual image data captured from the camera
+                start = time.perf_counter()
+                ret, frame = cap.read()
+                read_done = time.perf_counter()
                 
-                # STEP 6D-v: HANDLE SMILE DETECTION RESULTS
-                if len(smiles) > 0:
-                    # SMILE DETECTED - Process the positive detection
-                    
-                    # Draw red rectangles around detected smile regions for visual feedback
-                    for (sx, sy, sw, sh) in smiles:
-                        cv2.rectangle(roi_color, (sx, sy), (sx + sw, sy + sh), (0, 0, 255), 2)
-                    
-                    # Display "SMILE DETECTED!" message on the video feed
-                    cv2.putText(frame, 'SMILE DETECTED!', (x, y + h + 30), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
-                    
-                    # STEP 6D-v-a: CHECK TIMING CONSTRAINTS
-                    # Prevent rapid-fire selfie captures by enforcing a minimum time interval
-                    current_time = time.time()  # Get current timestamp
-                    time_since_last = current_time - last_saved_time
-                    
-                    if time_since_last > save_interval:
-                        # ENOUGH TIME HAS PASSED - CAPTURE AND SAVE SELFIE
-                        
-                        # Call the selfie saving function
-                        success = save_selfie(frame, selfie_dir)
-                        
-                        if success:
-                            # Selfie saved successfully
-                            last_saved_time = current_time  # Update timestamp
-                            
-                            # Show visual confirmation on screen
-                            cv2.putText(frame, 'SELFIE SAVED!', (50, 50), 
-                                       cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 3)
-                            print(" -> Selfie saved!")
-                        else:
-                            # Selfie saving failed
-                            print(" -> Failed to save selfie")
-                    else:
-                        # NOT ENOUGH TIME HAS PASSED - SHOW COUNTDOWN
-                        remaining_time = save_interval - time_since_last
-                        
-                        # Display countdown timer on screen
-                        cv2.putText(frame, f'Wait {remaining_time:.1f}s', (x, y + h + 60), 
-                                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
-                        print(f" -> Waiting {remaining_time:.1f}s")
-                else:
-                    # NO SMILE DETECTED - Encourage user to smile
-                    cv2.putText(frame, 'Please smile!', (x, y + h + 30), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
-                    print(" -> No smile")
-
-            # STEP 6E: ADD USER INTERFACE ELEMENTS TO THE VIDEO FRAME
-            # Display instructions for quitting the application
-            cv2.putText(frame, "Press 'q' to quit", (10, frame.shape[0] - 20), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-            
-            # Display count of saved selfies (live counter)
-            cv2.putText(frame, f"Selfies saved: {count_selfies(selfie_dir)}", (10, 30), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-
-            # STEP 6F: DISPLAY THE PROCESSED VIDEO FRAME
-            # Show the video feed with all annotations and rectangles
-            cv2.imshow('Smile Detection - Selfie Camera', frame)
-
-            # STEP 6G: CHECK FOR USER INPUT (KEYBOARD CONTROLS)
-            # waitKey(1) waits for keyboard input for 1 millisecond
-            # 0xFF masks the result to get only the lower 8 bits
-            key = cv2.waitKey(1) & 0xFF
-            
-            if key == ord('q'):
-                # User pressed 'q' to quit
-                print("\nExiting smile detection...")
-                break
-            elif key == ord('s'):
-                # User pressed 's' for manual selfie capture (bonus feature)
-                save_selfie(frame, selfie_dir)
-                print("Manual selfie saved!")
+                # If frame capture failed, exit the loop
+                if not ret:
+                    print("Error: Unable to read from the camera.")
+                    break
+
+                # STEP 6B: PREPARE THE FRAME FOR FACE DETECTION
+                # Convert color image to grayscale because Haar cascades work on grayscale images
+                # This also improves processing speed significantly
+                gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                metrics.record("read", read_done - start)
+                metrics.record("gray", time.perf_counter() - read_done)
+
+                # STEP 6C: DETECT FACES AND SMILES IN THE CURRENT FRAME
+                # Returns one (face, smiles) pair per face; smiles are searched only in the
+                # mouth area (lower 2/3) of each face
+                detections = detect_frame(gray_frame)
+
+                # STEP 6D-6G: DRAW, SAVE, DISPLAY AND HANDLE KEYBOARD INPUT
+                if not render_frame(frame, detections):
+                    break
 
     except KeyboardInterrupt:
         # Handle Ctrl+C gracefully
@@ -217,88 +358,96 @@ def main():
         # STEP 7: CLEANUP RESOURCES (ALWAYS EXECUTES)
         # This cleanup code runs whether the program exits normally or due to an error
         print("Cleaning up resources...")
+
+        # Finish writing every selfie that is still queued so no capture is lost
+        if writer.pending():
+            print(f"Writing {writer.pending()} pending selfie(s)...")
+        writer.close()
+        report_writer_results(writer)
+        if burst is not None:
+            print(burst.describe())
+        print(smile_filter.describe())
+        if motion_gate is not None:
+            print(motion_gate.describe())
+        print(metrics.describe())
+        if metrics_server is not None:
+            metrics_server.close()
+        if metrics_dumper is not None:
+            metrics_dumper.close()
+        if control is not None:
+            control.close()
+        index.close()
         
         # Release the camera so other applications can use it
         cap.release()
         
         # Close all OpenCV windows
-        cv2.destroyAllWindows()
+        if not headless:
+            cv2.destroyAllWindows()
         print("Cleanup complete!")
 
     return True  # Indicate successful completion
 
 
-def save_selfie(image, directory="selfies"):
+def handle_key(key, frame, selfie_dir="selfies", writer=None, state=None):
     """
-    Save the current video frame as a selfie image with timestamp.
-    
-    This function:
-    1. Creates a unique filename using current date and time
-    2. Saves the image to the specified directory
-    3. Provides error handling and user feedback
+    React to a key pressed in the OpenCV window.
     
     Args:
-        image: The video frame (numpy array) to save as an image
-        directory: Directory path where the selfie should be saved
+        key: Key code from cv2.waitKey() masked with 0xFF
+        frame: The current frame (saved on manual capture when there is no state)
+        selfie_dir: Directory where selfies are saved
+        writer: Optional SelfieWriter used to save in the background
+        state: Optional loop state; manual capture then sets state["capture_requested"]
+            so the loop saves the next frame before anything is drawn on it
     
     Returns:
-        bool: True if the selfie was saved successfully, False if there was an error
+        bool: False if the user asked to quit, True to keep running
     """
-    try:
-        # STEP 1: CREATE UNIQUE FILENAME WITH TIMESTAMP
-        # strftime formats the current time as: YYYYMMDD-HHMMSS
-        timestamp = time.strftime("%Y%m%d-%H%M%S")
-        file_name = f"selfie_{timestamp}.png"
-        
-        # Create the full file path by joining directory and filename
-        file_path = os.path.join(directory, file_name)
-        
-        # STEP 2: SAVE THE IMAGE FILE
-        # imwrite() saves the image array to disk as a PNG file
-        # Returns True if successful, False if failed
-        success = cv2.imwrite(file_path, image)
-        
-        # STEP 3: PROVIDE USER FEEDBACK
-        if success:
-            print(f"Selfie saved as {file_path}")
-            return True
-        else:
-            print("Failed to save image")
-            return False
-            
-    except Exception as e:
-        # Handle any file system or permission errors
-        print(f"Error saving selfie: {e}")
+    # STEP 6G: CHECK FOR USER INPUT (KEYBOARD CONTROLS)
+    if key == ord('q'):
+        # User pressed 'q' to quit
+        print("\nExiting smile detection...")
         return False
+    elif key == ord('s'):
+        # User pressed 's' for manual selfie capture (bonus feature)
+        if state is not None:
+            state["capture_requested"] = True
+            return True
+        if writer is not None:
+            if writer.submit(frame, selfie_dir):
+                print("Manual selfie queued!")
+        elif save_selfie(frame, selfie_dir):
+            print("Manual selfie saved!")
+    return True
 
 
-def count_selfies(directory="selfies"):
+def handle_commands(commands, state):
     """
-    Count the total number of selfie files in the specified directory.
-    
-    This function is used to display a running count of captured selfies.
+    React to commands from the control channel (see control.py).
     
     Args:
-        directory: The directory to search for selfie files
+        commands: Command names from ControlChannel.get_commands()
+        state: The loop state; "capture" sets state["capture_requested"] and
+            "stop"/"start"/"toggle" set state["paused"]
     
     Returns:
-        int: The number of selfie files found (files starting with 'selfie_' and ending with '.png')
+        bool: False if a "quit" command arrived, True to keep running
     """
-    try:
-        # Check if the directory exists
-        if not os.path.exists(directory):
-            return 0
-        
-        # List all files in the directory and filter for selfie files
-        # Use list comprehension to count files matching our naming pattern
-        return len([f for f in os.listdir(directory) 
-                   if f.startswith('selfie_') and f.endswith('.png')])
-    except:
-        # Return 0 if there's any error accessing the directory
-        return 0
+    for command in commands:
+        if command == "quit":
+            print("\nExiting smile detection...")
+            return False
+        elif command == "capture":
+            state["capture_requested"] = True
+        elif command in ("stop", "start", "toggle"):
+            paused = not state.get("paused", False) if command == "toggle" else command == "stop"
+            state["paused"] = paused
+            print("Auto-capture paused" if paused else "Auto-capture resumed")
+    return True
 
 
-def test_smile_detection():
+def test_smile_detection(source=0):
     """
     Test function to verify that smile detection is working properly.
     
@@ -312,6 +461,9 @@ def test_smile_detection():
     - Face detection is functioning
     - Smile detection is responsive
     
+    Args:
+        source: Camera index, video file, image folder or "synthetic" (see frame_sources.py)
+    
     Returns:
         bool: True if test completed successfully, False if there were errors
     """
@@ -327,7 +479,7 @@ def test_smile_detection():
         return False
     
     # STEP 2: INITIALIZE CAMERA
-    cap = cv2.VideoCapture(0)
+    cap = open_source(source)
     if not cap.isOpened():
         print("Error opening camera")
         return False
@@ -376,8 +528,96 @@ if __name__ == "__main__":
     # UNCOMMENT THE NEXT LINE TO RUN DETECTION TEST FIRST
     # test_smile_detection()
     
+    # Read command line options
+    parser = argparse.ArgumentParser(description="Auto-capture selfies by detecting smiles.")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="run capture, detection and display as separate threaded stages")
+    parser.add_argument("--track-every", type=int, default=1, metavar="N",
+                        help="full-frame face detection only every N frames, tracking in between (default: 1)")
+    parser.add_argument("--search-margin", type=float, default=SEARCH_MARGIN,
+                        help="search window around the last face box between keyframes, "
+                             f"as a fraction of the face size (default: {SEARCH_MARGIN})")
+    parser.add_argument("--resolution", default="640x480", metavar="WxH",
+                        help="camera resolution (default: 640x480)")
+    parser.add_argument("--detect-width", type=int, default=DETECTION_WIDTH, metavar="PIXELS",
+                        help="detect faces on a copy shrunk to this width, e.g. 320 (default: full frame)")
+    parser.add_argument("--source", default="0",
+                        help="camera index, video file, image folder or synthetic[:N] (default: 0)")
+    parser.add_argument("--save-interval", type=float, default=2, metavar="SECONDS",
+                        help="minimum time between automatic selfies or bursts (default: 2)")
+    parser.add_argument("--burst", type=int, default=0, metavar="K",
+                        help="save K consecutive frames around each smile (default: 0, single frames)")
+    parser.add_argument("--format", default=DEFAULT_FORMAT, type=parse_output_format,
+                        metavar="FORMAT[:LEVEL]",
+                        help="selfie file format: png[:0-9], jpeg[:quality], webp[:quality] or npy "
+                             f"(default: {DEFAULT_FORMAT})")
+    parser.add_argument("--smile-confirm", default=f"{SMILE_CONFIRM}/{SMILE_WINDOW}", metavar="M/N",
+                        help="capture once a smile was seen in M of the last N frames "
+                             f"(default: {SMILE_CONFIRM}/{SMILE_WINDOW}; 1/1 = first smiling frame)")
+    parser.add_argument("--face-detector", choices=list(BACKENDS), default=FACE_BACKEND,
+                        help="face detector backend; lbp and yunet need their model file in models/ "
+                             f"(default: {FACE_BACKEND})")
+    parser.add_argument("--batch-smiles", type=int, default=SMILE_BATCH_MIN_FACES, metavar="N",
+                        help="search for smiles in one batched pass when there are N or more faces "
+                             "(default: off, one pass per face)")
+    parser.add_argument("--crop-faces", action="store_true",
+                        help="save a cropped image of each smiling face instead of the whole frame")
+    parser.add_argument("--metrics-port", type=int, default=None, metavar="PORT",
+                        help="serve loop metrics on http://127.0.0.1:PORT/metrics (Prometheus) "
+                             "and /metrics.json")
+    parser.add_argument("--metrics-json", default=None, metavar="FILE",
+                        help=f"write loop metrics to FILE every {METRICS_DUMP_INTERVAL:g} seconds")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="DEBUG also logs every detected face on every frame (default: INFO)")
+    parser.add_argument("--headless", action="store_true",
+                        help="run without a window as a long-lived service, controlled by signals "
+                             "and --control (see control.py)")
+    parser.add_argument("--control", default=None, metavar="SOCKET",
+                        help="control socket: a Unix socket path or a TCP port on 127.0.0.1 "
+                             "(commands: capture, stop, start, toggle, status, quit)")
+    parser.add_argument("--no-motion-gate", action="store_true",
+                        help="run face detection on every frame, even when the scene is empty and static")
+    parser.add_argument("--config", default=None, metavar="FILE",
+                        help="detection settings (region of interest, face sizes, cascade settings, "
+                             "mouth area) as JSON, e.g. written by calibrate_detection.py")
+    parser.add_argument("--best-of", type=int, default=BEST_FRAME_WINDOW, metavar="N",
+                        help="save the sharpest smiling frame of the last N frames "
+                             f"(default: {BEST_FRAME_WINDOW}; 1 = the current frame; "
+                             "not used with --crop-faces)")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level, format="%(asctime)s %(levelname)s %(message)s")
+    detection_config = None
+    if args.config:
+        try:
+            detection_config = load_detection_config(args.config)
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot use detection settings {args.config}: {e}")
+        print(detection_config.describe())
+    frame_width, frame_height = (int(v) for v in args.resolution.lower().split("x"))
+    smile_confirm, smile_window = (int(v) for v in args.smile_confirm.split("/"))
+
     # Run the main smile detection application
-    success = main()
+    success = main(use_pipeline=args.pipeline,
+                   keyframe_interval=args.track_every,
+                   search_margin=args.search_margin,
+                   frame_size=(frame_width, frame_height),
+                   detection_width=args.detect_width,
+                   source=args.source,
+                   save_interval=args.save_interval,
+                   burst_size=args.burst,
+                   best_of=args.best_of,
+                   output_format=args.format,
+                   smile_window=smile_window,
+                   smile_confirm=smile_confirm,
+                   crop_faces=args.crop_faces,
+                   batch_min_faces=args.batch_smiles,
+                   face_backend=args.face_detector,
+                   metrics_port=args.metrics_port,
+                   metrics_json=args.metrics_json,
+                   headless=args.headless,
+                   control_address=args.control,
+                   motion_gating=not args.no_motion_gate,
+                   detection_config=detection_config)
     
     # Provide final status message
     if success:
@@ -0,0 +1,169 @@
+# Import required libraries
+import hashlib    # Cache keys
+import os         # File sizes, modification times and cache files
+import threading  # The cache is used from the writer thread and the viewer's loader thread
+import numpy as np  # Selfies saved in the raw .npy format
+from PIL import Image
+
+THUMBNAIL_SIZE = 150                # Thumbnails are THUMBNAIL_SIZE x THUMBNAIL_SIZE pixels
+MAX_CACHE_BYTES = 64 * 1024 * 1024  # Size cap for the whole cache folder
+JPEG_QUALITY = 85                   # Small files that still look sharp at 150x150
+CACHE_DIR_NAME = ".thumbnails"      # Cache folder created inside the selfies folder
+
+
+class ThumbnailCache:
+    """
+    Thumbnails of saved selfies, stored as small JPEG files so they survive restarts.
+
+    A thumbnail's key is made from the photo's path, modification time and size, so
+    a photo that is replaced or edited simply gets a new key and its old thumbnail
+    is never used again. When the folder grows past max_bytes the least recently
+    used thumbnails are deleted (each hit refreshes the thumbnail file's
+    modification time, which is used as its "last used" time).
+    """
+
+    def __init__(self, cache_dir, thumb_size=THUMBNAIL_SIZE, max_bytes=MAX_CACHE_BYTES):
+        """
+        Args:
+            cache_dir: Folder that holds the cached thumbnails (created if missing)
+            thumb_size: Width and height of each thumbnail in pixels
+            max_bytes: Size cap for the cache folder; older thumbnails are evicted above it
+        """
+        self.cache_dir = cache_dir
+        self.thumb_size = thumb_size
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._total_bytes = sum(size for _, size, _ in self._entries())
+
+    def load(self, photo_path):
+        """
+        Get the cached thumbnail of a photo.
+
+        Args:
+            photo_path: Path of the full-size photo
+
+        Returns:
+            PIL.Image or None if the photo has no (up to date) thumbnail yet
+        """
+        cache_path = self._cache_path(photo_path)
+        if cache_path is None:
+            return None
+        try:
+            thumbnail = Image.open(cache_path)
+            thumbnail.load()
+            os.utime(cache_path)  # Mark as recently used for LRU eviction
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return thumbnail
+
+    def load_or_create(self, photo_path):
+        """
+        Get a photo's thumbnail, decoding the full photo and caching it on a miss.
+
+        Args:
+            photo_path: Path of the full-size photo
+
+        Returns:
+            PIL.Image: The thumbnail (raises OSError if the photo cannot be read)
+        """
+        thumbnail = self.load(photo_path)
+        if thumbnail is None:
+            if photo_path.lower().endswith(".npy"):
+                # Raw BGR array saved by the "npy" output format
+                image = Image.fromarray(np.load(photo_path)[:, :, ::-1])
+            else:
+                image = Image.open(photo_path)
+                image.draft("RGB", (self.thumb_size, self.thumb_size))  # Fast JPEG downscale while decoding
+            thumbnail = self.make_thumbnail(image)
+            self.store(photo_path, thumbnail)
+        return thumbnail
+
+    def store_frame(self, photo_path, frame):
+        """
+        Cache the thumbnail of a frame that was just saved as photo_path.
+
+        Called at capture time by save_selfie(), so the viewer never has to decode
+        the full-size photo.
+
+        Args:
+            photo_path: Path the frame was saved to
+            frame: The saved frame as a BGR numpy array (OpenCV layout)
+        """
+        self.store(photo_path, self.make_thumbnail(Image.fromarray(frame[:, :, ::-1])))
+
+    def make_thumbnail(self, image):
+        """Shrink a PIL image to the thumbnail size (same look as the photo viewer)."""
+        return image.convert("RGB").resize((self.thumb_size, self.thumb_size), Image.Resampling.LANCZOS)
+
+    def store(self, photo_path, thumbnail):
+        """
+        Write a thumbnail for a photo into the cache.
+
+        Args:
+            photo_path: Path of the full-size photo (must exist)
+            thumbnail: PIL image of size thumb_size x thumb_size
+        """
+        cache_path = self._cache_path(photo_path)
+        if cache_path is None:
+            return
+        try:
+            # Write to a temporary name first so a reader never sees half a file
+            temp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+            thumbnail.save(temp_path, "JPEG", quality=JPEG_QUALITY)
+            size = os.path.getsize(temp_path)
+            try:
+                size -= os.path.getsize(cache_path)  # Replacing a thumbnail that is already counted
+            except OSError:
+                pass
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            print(f"Could not cache thumbnail for {photo_path}: {e}")
+            return
+        with self._lock:
+            self._total_bytes += size
+            over_limit = self._total_bytes > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def evict(self):
+        """Delete the least recently used thumbnails until the cache is under 90% of max_bytes."""
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda entry: entry[2])  # Oldest use first
+            total = sum(size for _, size, _ in entries)
+            target = self.max_bytes * 0.9
+            for path, size, _ in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+            self._total_bytes = total
+
+    def _cache_path(self, photo_path):
+        """Return the cache file for the current version of a photo, or None if it is missing."""
+        try:
+            stat = os.stat(photo_path)
+        except OSError:
+            return None
+        key = f"{os.path.abspath(photo_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".jpg")
+
+    def _entries(self):
+        """List (path, size, last used time) for every cached thumbnail."""
+        entries = []
+        with os.scandir(self.cache_dir) as files:
+            for entry in files:
+                if entry.name.endswith(".jpg"):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((entry.path, stat.st_size, stat.st_mtime_ns))
+        return entries
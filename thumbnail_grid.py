@@ -0,0 +1,181 @@
+# Import required libraries
+import collections  # OrderedDict works as a small LRU cache
+import queue        # Requests/results between the GUI and the loader thread
+import threading    # Thumbnails are decoded on a background thread
+from tkinter import Canvas, Scrollbar, VERTICAL, LEFT, RIGHT, BOTH, Y
+from PIL import Image, ImageTk
+
+
+class ThumbnailGrid:
+    """
+    A scrollable grid of photo thumbnails that only builds what is on screen.
+
+    Opening every photo and creating a widget for each one before the window appears
+    gets slow and memory hungry with thousands of selfies. This grid draws directly
+    on a Canvas and only creates items for the rows that are visible (plus one row
+    above and below). Thumbnails are decoded on a background thread; a gray
+    placeholder is shown until each one is ready. Decoded thumbnails are kept in a
+    small LRU cache, so memory stays bounded no matter how big the archive is.
+    """
+
+    def __init__(self, parent, photos, thumb_size=150, columns=6, cache_size=300, disk_cache=None):
+        """
+        Args:
+            parent: Tk widget to place the grid in
+            photos: List of (photo_path, photo_name) tuples in display order
+            thumb_size: Width and height of each thumbnail in pixels
+            columns: Number of thumbnails per row
+            cache_size: Maximum number of decoded thumbnails kept in memory
+            disk_cache: Optional ThumbnailCache; thumbnails found there are used
+                instead of decoding the full photo, and new ones are added to it
+        """
+        self.photos = photos
+        self.thumb_size = thumb_size
+        self.columns = columns
+        self.cache_size = cache_size
+        self.disk_cache = disk_cache
+        self.cell_width = thumb_size + 20
+        self.cell_height = thumb_size + 40
+        self.rows = (len(photos) + columns - 1) // columns
+
+        self.canvas = Canvas(parent, bg="white", highlightthickness=0)
+        self.scrollbar = Scrollbar(parent, orient=VERTICAL, command=self._on_scrollbar)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set,
+                              scrollregion=(0, 0, columns * self.cell_width, self.rows * self.cell_height))
+        self.canvas.pack(side=LEFT, fill=BOTH, expand=True)
+        self.scrollbar.pack(side=RIGHT, fill=Y)
+
+        self._cells = {}       # photo index -> {"image_item": id, "photo": PhotoImage or None, "items": [ids]}
+        self._cache = collections.OrderedDict()  # photo index -> decoded PIL thumbnail
+        self._wanted = frozenset()                # photo indexes currently on screen
+        self._requests = queue.LifoQueue()        # newest request first: what the user looks at now
+        self._results = queue.Queue()
+        self._closed = threading.Event()
+        self._loader = threading.Thread(target=self._load_thumbnails, name="thumbnail-loader", daemon=True)
+        self._loader.start()
+
+        # Rebuild the visible rows whenever the view moves or changes size
+        self.canvas.bind("<Configure>", lambda e: self.refresh())
+        self.canvas.bind("<MouseWheel>", self._on_mousewheel)
+        self.canvas.bind("<Button-4>", lambda e: self._scroll(-1))  # Linux scroll up
+        self.canvas.bind("<Button-5>", lambda e: self._scroll(1))   # Linux scroll down
+        self.canvas.bind("<Destroy>", lambda e: self.close())
+        self.canvas.after(30, self._poll_results)
+
+    def refresh(self):
+        """Create cells for rows that came into view and delete the ones that left."""
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        first_row = max(0, int(top // self.cell_height) - 1)
+        last_row = min(self.rows - 1, int(bottom // self.cell_height) + 1)
+        wanted = set()
+        for row in range(first_row, last_row + 1):
+            for column in range(self.columns):
+                index = row * self.columns + column
+                if index < len(self.photos):
+                    wanted.add(index)
+        self._wanted = frozenset(wanted)
+
+        for index in list(self._cells):
+            if index not in wanted:
+                self._remove_cell(index)
+        for index in sorted(wanted):
+            if index not in self._cells:
+                self._add_cell(index)
+
+    def close(self):
+        """Stop the loader thread (called automatically when the canvas is destroyed)."""
+        self._closed.set()
+        self._requests.put(None)
+
+    def _add_cell(self, index):
+        if not 0 <= index < len(self.photos):
+            return
+        try:
+            path, name = self.photos[index]
+        except IndexError:
+            return  # The photo was deleted since the list was counted
+        row, column = divmod(index, self.columns)
+        x = column * self.cell_width + 10
+        y = row * self.cell_height + 10
+        placeholder = self.canvas.create_rectangle(x, y, x + self.thumb_size, y + self.thumb_size,
+                                                   fill="#e8e8e8", outline="#c0c0c0")
+        image_item = self.canvas.create_image(x, y, anchor="nw")
+        label = self.canvas.create_text(x + self.thumb_size / 2, y + self.thumb_size + 12,
+                                        text=name.replace("selfie_", "").rsplit(".", 1)[0],
+                                        font=("arial", 8), fill="gray")
+        self._cells[index] = {"image_item": image_item, "photo": None, "items": [placeholder, image_item, label]}
+
+        if index in self._cache:
+            self._cache.move_to_end(index)
+            self._show_thumbnail(index, self._cache[index])
+        else:
+            self._requests.put(index)
+
+    def _remove_cell(self, index):
+        cell = self._cells.pop(index)
+        for item in cell["items"]:
+            self.canvas.delete(item)
+        # Dropping the cell releases its PhotoImage; the PIL thumbnail stays in the LRU cache
+
+    def _show_thumbnail(self, index, thumbnail):
+        cell = self._cells.get(index)
+        if cell is None:
+            return
+        cell["photo"] = ImageTk.PhotoImage(thumbnail)  # Keep a reference in the cell
+        self.canvas.itemconfig(cell["image_item"], image=cell["photo"])
+
+    def _load_thumbnails(self):
+        """Background thread: decode and shrink photos that are still on screen."""
+        while not self._closed.is_set():
+            index = self._requests.get()
+            if index is None or self._closed.is_set():
+                break
+            if index not in self._wanted:
+                continue  # Scrolled away before we got to it
+            name = f"#{index}"  # Until the lookup below succeeds
+            try:
+                # Inside the try: photos may have been deleted since the count was taken
+                path, name = self.photos[index]
+                if self.disk_cache is not None:
+                    thumbnail = self.disk_cache.load_or_create(path)
+                else:
+                    image = Image.open(path)
+                    image.draft("RGB", (self.thumb_size, self.thumb_size))  # Fast JPEG downscale while decoding
+                    thumbnail = image.convert("RGB").resize((self.thumb_size, self.thumb_size),
+                                                            Image.Resampling.LANCZOS)
+            except IndexError:
+                continue  # The photo was deleted; leave its placeholder
+            except Exception as e:
+                print(f"Error loading photo {name}: {e}")
+                continue
+            self._results.put((index, thumbnail))
+
+    def _poll_results(self):
+        """Tk event loop: turn finished thumbnails into PhotoImages (Tk is not thread-safe)."""
+        if self._closed.is_set():
+            return
+        while True:
+            try:
+                index, thumbnail = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if not 0 <= index < len(self.photos):
+                continue  # The list got shorter while the thumbnail was loading
+            self._cache[index] = thumbnail
+            self._cache.move_to_end(index)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            self._show_thumbnail(index, thumbnail)
+        self.canvas.after(30, self._poll_results)
+
+    def _on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+        self.refresh()
+
+    def _on_mousewheel(self, event):
+        self._scroll(int(-1 * (event.delta / 120)))
+
+    def _scroll(self, units):
+        self.canvas.yview_scroll(units, "units")
+        self.refresh()
@@ -0,0 +1,105 @@
+# Import required libraries
+from detection import DETECTION_WIDTH, DEFAULT_CONFIG, detect_faces, detection_scale
+
+# TRACKING SETTINGS
+KEYFRAME_INTERVAL = 10  # Run a full-frame face detection every N frames
+SEARCH_MARGIN = 0.5     # Extra space around the last face box to search, as a fraction of its size
+
+
+class FaceTracker:
+    """
+    Find faces without scanning the whole frame every time.
+
+    A full-frame face detection only runs on keyframes (every keyframe_interval
+    frames). In between, each face is re-detected inside a window around where it
+    was last seen, which is much smaller than the full frame because a face barely
+    moves from one frame to the next. If a face is not found in its window, the
+    tracker treats it as lost and runs a full detection on the next frame.
+    """
+
+    def __init__(self, face_detector, keyframe_interval=KEYFRAME_INTERVAL, search_margin=SEARCH_MARGIN,
+                 detection_width=DETECTION_WIDTH, config=None):
+        """
+        Args:
+            face_detector: Loaded face detector from detection.load_cascades()
+            keyframe_interval: Run a full-frame detection every N frames (1 = every frame)
+            search_margin: How far to expand the last face box on each side when
+                searching for it again, as a fraction of the box width/height
+            detection_width: Width to detect faces at, or None for native resolution.
+                Search windows are shrunk by the same factor as full frames
+            config: DetectionConfig (ROI and face sizes); the ROI limits keyframe scans,
+                search windows already follow the faces found inside it
+        """
+        self.face_detector = face_detector
+        self.keyframe_interval = max(1, int(keyframe_interval))
+        self.search_margin = search_margin
+        self.detection_width = detection_width
+        self.config = config or DEFAULT_CONFIG
+        self._window_config = self.config.copy(roi=None)  # Windows are cut out of the frame already
+        self.faces = []              # Face boxes found in the last frame
+        self.full_detections = 0     # Frames that used a full-frame detection
+        self.window_detections = 0   # Frames that only searched around known faces
+        self._frames_since_keyframe = 0
+        self._need_keyframe = True
+
+    def update(self, gray_frame):
+        """
+        Find the faces in the next frame.
+
+        Args:
+            gray_frame: Grayscale frame to search
+
+        Returns:
+            list: Face rectangles as (x, y, w, h) tuples
+        """
+        scale = detection_scale(gray_frame.shape[1], self.detection_width)
+        if (self._need_keyframe or not self.faces
+                or self._frames_since_keyframe >= self.keyframe_interval - 1):
+            # KEYFRAME: scan the whole frame
+            self.faces = detect_faces(self.face_detector, gray_frame, scale, self.config)
+            self.full_detections += 1
+            self._frames_since_keyframe = 0
+            self._need_keyframe = False
+            return self.faces
+
+        # BETWEEN KEYFRAMES: search only around the faces we already know
+        self.window_detections += 1
+        self._frames_since_keyframe += 1
+        tracked = []
+        for face in self.faces:
+            found = self._search_window(gray_frame, face, scale)
+            if found is None:
+                # Tracking confidence dropped: this face was lost, so do a full scan next frame
+                self._need_keyframe = True
+            else:
+                tracked.append(found)
+        self.faces = tracked
+        return self.faces
+
+    def reset(self):
+        """Forget all tracked faces so the next frame is a keyframe."""
+        self.faces = []
+        self._need_keyframe = True
+
+    def _search_window(self, gray_frame, face, scale=1.0):
+        """Re-detect one face inside an expanded window around its last position."""
+        x, y, w, h = face
+        frame_h, frame_w = gray_frame.shape[:2]
+        dx, dy = int(w * self.search_margin), int(h * self.search_margin)
+        left, top = max(0, x - dx), max(0, y - dy)
+        right, bottom = min(frame_w, x + w + dx), min(frame_h, y + h + dy)
+
+        candidates = detect_faces(self.face_detector, gray_frame[top:bottom, left:right], scale,
+                                  self._window_config)
+        if not candidates:
+            return None
+
+        # Keep the candidate whose center is closest to the last known center
+        center_x, center_y = x + w / 2, y + h / 2
+
+        def distance(candidate):
+            cx, cy, cw, ch = candidate
+            return (left + cx + cw / 2 - center_x) ** 2 + (top + cy + ch / 2 - center_y) ** 2
+
+        cx, cy, cw, ch = min(candidates, key=distance)
+        return (left + cx, top + cy, cw, ch)
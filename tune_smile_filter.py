@@ -0,0 +1,127 @@
+"""
+Tune the smile confirmation filter (smile_filter.py) against a recorded clip.
+
+Runs face + smile detection over every frame of a clip once, then replays the
+detections through SmileConfirmer with different settings and prints, for each,
+how many confirmed smiles (capture events) it reports and - if a labels file is
+given - the frame-level precision and recall of the raw cascade and of the filter.
+
+The labels file lists the frames where someone really smiles, one range per line
+(frame numbers start at 0, both ends included; lines starting with # are ignored):
+
+    # clip.mp4
+    40-95
+    210-260
+
+Usage:
+    python tune_smile_filter.py --source clip.mp4 --labels clip_labels.txt
+    python tune_smile_filter.py --source recorded_frames/ --settings 2/3 3/5 4/6
+"""
+# Import required libraries
+import argparse
+
+import cv2
+
+from detection import DETECTION_WIDTH, load_cascades, detect_faces_and_smiles
+from frame_sources import open_source
+from smile_filter import SmileConfirmer, SMILE_WINDOW, SMILE_CONFIRM
+
+DEFAULT_SETTINGS = ["1/1", "2/3", f"{SMILE_CONFIRM}/{SMILE_WINDOW}", "4/6", "5/8"]
+
+
+def load_labels(path):
+    """
+    Read smile frame ranges from a labels file.
+
+    Returns:
+        set: Frame numbers where someone smiles
+    """
+    frames = set()
+    with open(path) as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            start, _, end = line.partition("-")
+            frames.update(range(int(start), int(end or start) + 1))
+    return frames
+
+
+def record_detections(source, max_frames=None, detection_width=DETECTION_WIDTH):
+    """
+    Run detection over a clip once.
+
+    Returns:
+        list: The detections of every frame (see detect_faces_and_smiles()), or None on error
+    """
+    face_cascade, smile_cascade = load_cascades()
+    if face_cascade is None:
+        print("Error: Unable to load Haar cascade files. Please check your OpenCV installation.")
+        return None
+    cap = open_source(source)
+    if not cap.isOpened():
+        print(f"Error: Unable to open frame source {source!r}")
+        return None
+
+    recorded = []
+    try:
+        while max_frames is None or len(recorded) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            recorded.append(detect_faces_and_smiles(face_cascade, smile_cascade, gray_frame, detection_width))
+    finally:
+        cap.release()
+    return recorded
+
+
+def evaluate(recorded, confirm, window, labels=None):
+    """
+    Replay recorded detections through one filter setting.
+
+    Returns:
+        SmileConfirmer: The filter, with its counters filled in
+    """
+    smile_filter = SmileConfirmer(window, confirm)
+    for frame_number, detections in enumerate(recorded):
+        actual = frame_number in labels if labels is not None else None
+        smile_filter.update(detections, actual)
+    return smile_filter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune the smile confirmation filter on a recorded clip.")
+    parser.add_argument("--source", required=True, help="video file or image folder")
+    parser.add_argument("--labels", help="file with the frame ranges where someone smiles")
+    parser.add_argument("--settings", nargs="+", default=DEFAULT_SETTINGS, metavar="M/N",
+                        help=f"filter settings to compare (default: {' '.join(DEFAULT_SETTINGS)})")
+    parser.add_argument("--frames", type=int, default=None, help="stop after this many frames")
+    parser.add_argument("--detect-width", type=int, default=DETECTION_WIDTH, metavar="PIXELS")
+    args = parser.parse_args()
+
+    recorded = record_detections(args.source, args.frames, args.detect_width)
+    if recorded is None:
+        return
+    labels = load_labels(args.labels) if args.labels else None
+    print(f"{len(recorded)} frames, {sum(1 for d in recorded if d)} with faces")
+
+    header = f"{'setting':<8} {'smiles':>8} {'suppressed':>10}"
+    if labels is not None:
+        header += f" {'precision':>9} {'recall':>6}"
+    print(header)
+    for setting in args.settings:
+        confirm, window = (int(v) for v in setting.split("/"))
+        smile_filter = evaluate(recorded, confirm, window, labels)
+        line = f"{setting:<8} {smile_filter.events:>8} {smile_filter.suppressed:>10}"
+        if labels is not None:
+            score = smile_filter.confirmed_score
+            line += f" {score.precision():>9.2f} {score.recall():>6.2f}"
+        print(line)
+    if labels is not None:
+        raw = evaluate(recorded, 1, 1, labels).raw_score
+        print(f"raw cascade: {raw.describe()}")
+
+
+if __name__ == "__main__":
+    main()